@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU cost of the decimation chains.
+
+Streams one second of white noise in 10 ms blocks, as the audio backend
+delivers it, and in 100 ms blocks, through Ndec decimations by 2. The previous implementation
+filtered each stage at its full input rate and dropped every other
+sample; the streaming decimator only computes the retained samples.
+The IIR is the filter of the delay estimator, the gaussian FIR the one of
+the long-term levels.
+"""
+
+import numpy as np
+
+from friture import generated_filters
+from friture.audiobackend import SAMPLING_RATE
+from friture.longlevels import gauss
+from friture.signal.decimate import Decimator
+from friture.signal.lfilter import lfilter_float64_1D
+from benchmarks.timing import time_per_call
+
+BLOCK_LENGTHS = [SAMPLING_RATE // 100, SAMPLING_RATE // 10]
+NDECS = range(1, 7)
+
+
+class FullRateDecimator:
+
+    def __init__(self, Ndec, bdec, adec):
+        self.Ndec = Ndec
+        self.bdec = bdec
+        self.adec = adec
+        self.zis = [np.zeros(len(bdec) - 1) for _ in range(Ndec)]
+
+    def push(self, x):
+        for i in range(self.Ndec):
+            x, self.zis[i] = lfilter_float64_1D(self.bdec, self.adec, x, self.zis[i])
+            x = x[::2]
+        return x
+
+
+def filters():
+    b, a = generated_filters.PARAMS['dec']
+    yield "IIR", np.array(b), np.array(a)
+
+    b = np.array(gauss(11, 2.))
+    a = np.zeros(b.shape)
+    a[0] = 1.
+    yield "gaussian", b, a
+
+
+def cost(decimator, blocks):
+    # CPU time per second of audio, in ms
+    def run():
+        for block in blocks:
+            decimator.push(block)
+
+    return 1e3 * time_per_call(run, min_duration=0.2, repeat=3)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(SAMPLING_RATE)
+
+    print("%10s %6s %5s %20s %20s %8s" % ("filter", "block", "Ndec", "full rate (ms/s)", "decimator (ms/s)", "saving"))
+
+    for name, b, a in filters():
+        for block_length in BLOCK_LENGTHS:
+            blocks = [x[i:i + block_length] for i in range(0, SAMPLING_RATE, block_length)]
+            for Ndec in NDECS:
+                previous = cost(FullRateDecimator(Ndec, b, a), blocks)
+                current = cost(Decimator(Ndec, b, a), blocks)
+                print("%10s %6d %5d %20.2f %20.2f %7.0f%%" % (
+                    name, block_length, Ndec, previous, current, 100. * (1. - current / previous)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU cost of the delay estimation, per second of audio.
+
+The subsampled signals of the delay estimator (12 kHz) are cut in
+half-overlapped frames twice as long as the delay range. The previous
+estimator computed a PHAT cross-correlation per frame and smoothed it in
+the lag domain; the accumulating estimator smooths the cross-spectrum of
+a batch of frames and runs a single inverse FFT for the estimate, once
+per display update. In real time, the display updates (10 ms) are more
+frequent than the frames, which then arrive one at a time; when the
+analysis lags behind, all the pending frames make a single batch.
+"""
+
+import numpy as np
+
+from friture.audiobackend import SAMPLING_RATE
+from friture.signal.correlation import Accumulating_GCC_PHAT, generalized_cross_correlation
+from benchmarks.timing import time_per_call
+
+SUBSAMPLED_RATE = SAMPLING_RATE // 4
+DELAY_RANGES = [0.1, 1., 5.]
+
+
+def per_frame(d0, d1):
+    alpha = 0.3
+    smoothed = None
+    for f0, f1 in zip(d0, d1):
+        if np.std(f0) > 0. and np.std(f1) > 0.:
+            Xcorr = generalized_cross_correlation(f0.copy(), f1.copy())
+            smoothed = Xcorr if smoothed is None else alpha * Xcorr + (1. - alpha) * smoothed
+            i = np.argmax(np.abs(smoothed))
+            _ = np.abs(smoothed[i]) / (3 * np.std(smoothed))
+
+
+def accumulating_real_time(d0, d1):
+    gcc = Accumulating_GCC_PHAT()
+    for k in range(d0.shape[0]):
+        gcc.push(d0[k:k + 1], d1[k:k + 1])
+        gcc.estimate()
+
+
+def accumulating_batch(d0, d1):
+    gcc = Accumulating_GCC_PHAT()
+    gcc.push(d0, d1)
+    gcc.estimate()
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("%10s %8s %18s %18s %18s" % ("range (s)", "frames", "per frame (ms/s)", "real time (ms/s)", "batch (ms/s)"))
+
+    for delay_range in DELAY_RANGES:
+        length = int(2 * delay_range * SUBSAMPLED_RATE)
+        hop = length // 2
+        # enough frames for ten seconds of audio, at least
+        count = max(int(10 * SUBSAMPLED_RATE / hop), 2)
+        x0 = rng.standard_normal(hop * (count + 1))
+        x1 = np.roll(x0, 100)
+        d0 = np.stack([x0[k * hop:k * hop + length] for k in range(count)])
+        d1 = np.stack([x1[k * hop:k * hop + length] for k in range(count)])
+
+        seconds = count * hop / SUBSAMPLED_RATE
+        previous = 1e3 * time_per_call(lambda: per_frame(d0, d1), repeat=3) / seconds
+        real_time = 1e3 * time_per_call(lambda: accumulating_real_time(d0, d1), repeat=3) / seconds
+        batch = 1e3 * time_per_call(lambda: accumulating_batch(d0, d1), repeat=3) / seconds
+        print("%10.1f %8d %18.3f %18.3f %18.3f" % (delay_range, count, previous, real_time, batch))
+
+
+if __name__ == "__main__":
+    main()
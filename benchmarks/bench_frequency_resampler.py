@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Cost of the spectrogram frequency-axis resampling.
+
+Resamples blocks of spectrogram columns onto the screen pixels, with one
+np.interp call per column (the previous implementation) or with the
+precomputed interpolation table.
+"""
+
+import numpy as np
+
+import friture.plotting.frequency_scales as fscales
+from friture.audiobackend import SAMPLING_RATE
+from friture.signal.frequency_resampler import Frequency_Resampler
+from benchmarks.timing import time_per_call
+
+# screen height of the spectrogram, in pixels
+HEIGHT = 600
+
+SCALES = [fscales.Logarithmic, fscales.Mel, fscales.Erb]
+FFT_SIZES = [1024, 8192]
+COLUMNS = [1, 8, 32]
+
+
+def per_column(resampler, data):
+    return np.array([np.interp(resampler.xscaled, resampler.freq, data[:, j]) for j in range(data.shape[1])]).T
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("%12s %8s %8s %16s %16s %8s" % ("scale", "fft_size", "columns", "per-column (us)", "table (us)", "speedup"))
+
+    for scale in SCALES:
+        for fft_size in FFT_SIZES:
+            resampler = Frequency_Resampler(scale, 20., 20000., HEIGHT)
+            resampler.setfreq(np.linspace(0, SAMPLING_RATE // 2, fft_size // 2 + 1))
+
+            for columns in COLUMNS:
+                data = rng.random((fft_size // 2 + 1, columns))
+                np.testing.assert_allclose(resampler.push(data), per_column(resampler, data), rtol=1e-12)
+
+                t_loop = time_per_call(lambda: per_column(resampler, data))
+                t_table = time_per_call(lambda: resampler.push(data))
+
+                print("%12s %8d %8d %16.1f %16.1f %7.1fx" % (scale.NAME, fft_size, columns, 1e6 * t_loop, 1e6 * t_table, t_loop / t_table))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU cost of the level meter for a block of audio.
+
+Updates the peak, RMS and ballistic peak levels of a 512-sample block,
+channel by channel with scalar code (the previous implementation) or with
+the LevelMeter, all the channels at once.
+"""
+
+import numpy as np
+
+from friture.audiobackend import SAMPLING_RATE, FRAMES_PER_BUFFER
+from friture.iec import dB_to_IEC
+from friture.signal.exp_smoothing import exp_smoothed_value
+from friture.signal.level_meter import LevelMeter, PEAK_DECAY_RATE, PEAK_FALLOFF
+from benchmarks.timing import time_per_call
+
+CHANNELS = [1, 2, 8, 32]
+
+
+def per_channel(meter, data, states):
+    """The scalar code that Levels_Widget and BallisticPeak ran for each channel."""
+    for y, state in zip(data, states):
+        value_max = np.abs(y).max()
+        if value_max > state["max"] * (1. - meter.peak_alpha):
+            state["max"] = value_max
+        else:
+            state["max"] *= (1. - meter.peak_alpha)
+
+        state["rms"] = exp_smoothed_value(meter.kernel, meter.alpha, y ** 2, state["rms"])
+
+        level_rms = 10. * np.log10(state["rms"])
+        level_max = 20. * np.log10(state["max"])
+        peak_iec = dB_to_IEC(max(level_max, level_rms))
+
+        # peak-hold-then-decay mechanism
+        if peak_iec > state["peak"]:
+            state["peak"] = peak_iec
+            state["hold"] = 0
+            state["decay"] = PEAK_DECAY_RATE
+        elif state["hold"] + 1 <= PEAK_FALLOFF:
+            state["hold"] += 1
+        else:
+            new_peak_iec = state["decay"] * float(state["peak"])
+            if new_peak_iec < peak_iec:
+                new_peak_iec = peak_iec
+                state["hold"] = 0
+                state["decay"] = PEAK_DECAY_RATE
+            else:
+                state["decay"] *= state["decay"]
+            state["peak"] = new_peak_iec
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("%9s %18s %18s %8s" % ("channels", "per channel (us)", "vectorized (us)", "speedup"))
+
+    for channels in CHANNELS:
+        data = rng.standard_normal((channels, FRAMES_PER_BUFFER))
+        meter = LevelMeter(SAMPLING_RATE)
+        meter.push(data)
+        states = [dict(rms=1e-30, max=1e-30, peak=0., hold=0, decay=PEAK_DECAY_RATE) for _ in range(channels)]
+
+        previous_cost = 1e6 * time_per_call(lambda: per_channel(meter, data, states))
+        current_cost = 1e6 * time_per_call(lambda: meter.push(data))
+        print("%9d %18.1f %18.1f %8.1f" % (channels, previous_cost, current_cost, previous_cost / current_cost))
+
+
+if __name__ == "__main__":
+    main()
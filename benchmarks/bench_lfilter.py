@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput of the IIR filter.
+
+Filters blocks of white noise, with the state carried from one block to
+the next, through the sample-by-sample filter (the previous implementation)
+and the block state-space engine. The decimation filter is the 12th-order
+IIR of the delay estimator and the octave filter bank, the gaussian filter
+is the FIR smoothing of the long-term levels.
+"""
+
+import numpy as np
+
+from friture import generated_filters
+from friture.audiobackend import SAMPLING_RATE
+from friture.longlevels import gauss
+from friture.signal.lfilter import lfilter_float64_1D
+from friture.test.test_lfilter import lfilter_reference
+from benchmarks.timing import time_per_call
+
+# 10 ms blocks, as delivered by the audio backend, and 1 s blocks
+BLOCK_LENGTHS = [SAMPLING_RATE // 100, SAMPLING_RATE]
+
+
+def decimation_filter():
+    b, a = generated_filters.PARAMS['dec']
+    return np.array(b), np.array(a)
+
+
+def gaussian_filter():
+    b = np.array(gauss(41, 8.))
+    a = np.zeros(b.shape)
+    a[0] = 1.
+    return b, a
+
+
+def samples_per_second(lfilter, b, a, x, block_length):
+    def run():
+        zi = np.zeros(len(b) - 1)
+        for i in range(0, len(x), block_length):
+            _, zi = lfilter(b, a, x[i:i + block_length], zi)
+
+    return len(x) / time_per_call(run, min_duration=0.2, repeat=3)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(SAMPLING_RATE)
+
+    print("%12s %8s %18s %18s %10s" % ("filter", "block", "previous (MS/s)", "block (MS/s)", "speedup"))
+
+    for name, (b, a) in (("decimation", decimation_filter()), ("gaussian", gaussian_filter())):
+        for block_length in BLOCK_LENGTHS:
+            previous = samples_per_second(lfilter_reference, b, a, x, block_length)
+            current = samples_per_second(lfilter_float64_1D, b, a, x, block_length)
+            print("%12s %8d %18.2f %18.2f %10.1f" % (name, block_length, previous / 1e6, current / 1e6, current / previous))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU cost of the multichannel octave filter bank.
+
+Streams one second of white noise in 10 ms blocks through the FFT octave
+filter bank, for 1, 2 and 8 channels: one channel at a time (one filter
+bank per channel), all the channels in one batched pass of the
+octave_filter_bank_decimation_fft function, which allocates its arrays on
+every block, and with the preallocated OctaveFilterBank engine.
+"""
+
+import numpy as np
+
+from friture.audiobackend import SAMPLING_RATE
+from friture.filter import octave_filter_bank_decimation_fft, NOCTAVE
+from friture.octavefilters import Octave_Filters
+from benchmarks.timing import time_per_call
+
+BLOCK_LENGTH = SAMPLING_RATE // 100
+BANDS_PER_OCTAVE = [1, 3, 12]
+CHANNELS = [1, 2, 8]
+
+
+def cost(run):
+    # CPU time per second of audio, in ms
+    return 1e3 * time_per_call(run, min_duration=0.2, repeat=3)
+
+
+class FunctionFilters:
+    """The batched filter bank function, with its state."""
+
+    def __init__(self, bpo, channels):
+        bank = Octave_Filters(bpo).filter_bank
+        bank.filter(np.zeros((channels, 1)))
+        self.boct = list(bank.boct_fir)
+        self.fft_sizes = bank._fft_sizes
+        self.H_oct = [np.ascontiguousarray(np.moveaxis(H[:, 0], 0, -1)) for H in bank._H_oct]
+        self.H_dec = [H[:, 0].copy() for H in bank._H_dec] + [np.zeros(self.fft_sizes[-1] // 2 + 1)]
+        self.fir_length = bank.fir_length
+        self.overlaps_oct = [np.zeros((channels, bpo, self.fir_length - 1)) for _ in range(NOCTAVE)]
+        self.overlaps_dec = [np.zeros((channels, self.fir_length - 1)) for _ in range(NOCTAVE)]
+
+    def filter(self, x):
+        y, dec, self.overlaps_oct, self.overlaps_dec = octave_filter_bank_decimation_fft(
+            self.boct, self.H_oct, self.H_dec, self.fft_sizes, self.fir_length,
+            x, self.overlaps_oct, self.overlaps_dec)
+        return y
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("%4s %9s %20s %16s %14s" % ("bpo", "channels", "per channel (ms/s)", "function (ms/s)", "engine (ms/s)"))
+
+    for bpo in BANDS_PER_OCTAVE:
+        for channels in CHANNELS:
+            x = rng.standard_normal((channels, SAMPLING_RATE))
+            blocks = [x[:, i:i + BLOCK_LENGTH] for i in range(0, SAMPLING_RATE, BLOCK_LENGTH)]
+
+            banks = [Octave_Filters(bpo) for _ in range(channels)]
+            function = FunctionFilters(bpo, channels)
+            bank = Octave_Filters(bpo)
+
+            def per_channel():
+                for block in blocks:
+                    for channel, channel_bank in enumerate(banks):
+                        channel_bank.filter_bank.filter(block[channel])
+
+            def batched_function():
+                for block in blocks:
+                    function.filter(block)
+
+            def batched_engine():
+                for block in blocks:
+                    bank.filter_bank.filter(block)
+
+            print("%4d %9d %20.1f %16.1f %14.1f" % (
+                bpo, channels, cost(per_channel), cost(batched_function), cost(batched_engine)))
+
+
+if __name__ == "__main__":
+    main()
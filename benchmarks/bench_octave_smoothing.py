@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU cost of the band energy smoothing of the octave spectrum.
+
+Smooths the outputs of the octave filter bank for a 10 ms block, one call
+per band (the previous implementation) or with the BandEnergyIntegrator,
+one call per decimation stage.
+"""
+
+import numpy as np
+
+from friture.audiobackend import SAMPLING_RATE
+from friture.octavefilters import Octave_Filters
+from friture.signal.exp_smoothing import BandEnergyIntegrator, exp_smoothed_value_2d
+from benchmarks.timing import time_per_call
+
+BLOCK_LENGTH = SAMPLING_RATE // 100
+BANDS_PER_OCTAVE = [1, 3, 12, 24]
+CHANNELS = [1, 2]
+
+
+def smoothing(bpo, response_time=1.):
+    """The smoothing factors and kernel lengths of OctaveSpectrum_Widget."""
+    decs = np.array(Octave_Filters(bpo).get_decs())
+    ns = response_time * SAMPLING_RATE / decs
+    alphas = 1. - (1. - 0.65) ** (1. / (ns + 1))
+    Ns = 2 * 4096 // decs
+    return alphas, Ns
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("%4s %9s %16s %16s %8s" % ("bpo", "channels", "per band (us)", "batched (us)", "speedup"))
+
+    for bpo in BANDS_PER_OCTAVE:
+        alphas, Ns = smoothing(bpo)
+        kernels = [(1. - alpha) ** np.arange(N - 1, -1, -1) for alpha, N in zip(alphas, Ns)]
+        integrator = BandEnergyIntegrator(alphas, Ns)
+
+        for channels in CHANNELS:
+            filters = Octave_Filters(bpo)
+            stages = [stage.copy() for stage in filters.filter_stages(rng.standard_normal((channels, BLOCK_LENGTH)))]
+            bands = [stage[:, i, :] for stage in stages for i in range(bpo)]
+            previous = [np.zeros(channels)] * len(bands)
+
+            def per_band():
+                return [exp_smoothed_value_2d(kernel, alpha, band ** 2, old)
+                        for band, kernel, alpha, old in zip(bands, kernels, alphas, previous)]
+
+            previous_cost = 1e6 * time_per_call(per_band, repeat=3)
+            current_cost = 1e6 * time_per_call(lambda: integrator.push(stages), repeat=3)
+            print("%4d %9d %16.1f %16.1f %8.1f" % (bpo, channels, previous_cost, current_cost, previous_cost / current_cost))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Cost of the SWIPE kernels of the pitch tracker.
+
+Compares the dense (candidates, log-spaced freqs) kernel matrix, built
+candidate by candidate (the previous implementation), with the lag profiles
+applied by FFT: memory, construction time when the settings change, and
+throughput of the kernel correlation for a batch of spectra.
+"""
+
+import time
+
+import numpy as np
+
+from friture.pitch_tracker import PitchTracker
+from friture.ringbuffer import RingBuffer
+from friture.test.test_pitch_tracker import calcCosineKernel_reference
+from benchmarks.timing import time_per_call
+
+# pitch resolutions, in cents
+CRES = [5, 10, 20]
+# highest pitch candidate, in Hz
+MAX_FREQS = [1000, 8000]
+BATCH = 16
+
+
+def dense_kernels(tracker):
+    return np.stack([calcCosineKernel_reference(freq, tracker.logSpacedFreqs) for freq in tracker.pitchCandidates])
+
+
+def main():
+    print("%6s %8s %10s %10s %10s %10s %12s %12s" % (
+        "cres", "max_freq", "dense MB", "MB", "dense init", "init", "dense fr/s", "fr/s"))
+
+    for cres in CRES:
+        for max_freq in MAX_FREQS:
+            tracker = PitchTracker(RingBuffer(), cres=cres, max_freq=max_freq)
+
+            t0 = time.perf_counter()
+            kernels = dense_kernels(tracker)
+            dense_init = time.perf_counter() - t0
+            init = time_per_call(tracker._init_swipe, repeat=3)
+
+            dense_memory = kernels.nbytes / 1e6
+            memory = (tracker.kernelNormalization.nbytes
+                      + sum(profileFFT.nbytes for _, profileFFT in tracker.kernelGroups)) / 1e6
+
+            specLog = np.random.default_rng(0).random((BATCH, len(tracker.logSpacedFreqs)))
+            dense_rate = BATCH / time_per_call(lambda: specLog @ kernels.T, repeat=3)
+            rate = BATCH / time_per_call(lambda: tracker.correlate_kernels(specLog), repeat=3)
+
+            print("%6d %8d %10.2f %10.2f %9.0fms %8.1fms %12.0f %12.0f" % (
+                cres, max_freq, dense_memory, memory, dense_init * 1e3, init * 1e3, dense_rate, rate))
+
+
+if __name__ == "__main__":
+    main()
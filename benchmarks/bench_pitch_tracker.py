@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput of the SWIPE pitch estimation, in frames per second.
+
+Estimates the pitch of a batch of frames of a harmonic tone, given their
+amplitude spectra as the STFT cache provides them, frame by frame (the
+previous implementation) or all at once, for several FFT sizes and pitch
+resolutions.
+"""
+
+import numpy as np
+
+from friture.pitch_tracker import PitchTracker
+from friture.ringbuffer import RingBuffer
+from friture.test.test_pitch_tracker import dense_kernels, estimate_pitch_reference, voice_like_frames
+from benchmarks.timing import time_per_call
+
+FFT_SIZES = [2048, 4096, 8192]
+# pitch resolutions, in cents
+CRES = [5, 10, 20]
+# frames per batch: at 75 % overlap, the 10 ms ticks bring one or a few
+# frames, and more when the analysis catches up
+BATCHES = [1, 16]
+
+
+def main():
+    print("%8s %6s %6s %18s %18s %8s" % ("fft_size", "cres", "batch", "frame by frame", "batched", "speedup"))
+
+    for fft_size in FFT_SIZES:
+        for cres in CRES:
+            tracker = PitchTracker(RingBuffer(), fft_size=fft_size, cres=cres)
+            kernels = dense_kernels(tracker)
+            for batch in BATCHES:
+                frames, spectra = voice_like_frames(tracker, batch)
+
+                def frame_by_frame():
+                    for f, s in zip(frames, spectra):
+                        estimate_pitch_reference(tracker, f, s, kernels)
+
+                previous = batch / time_per_call(frame_by_frame, repeat=3)
+                current = batch / time_per_call(lambda: tracker.estimate_pitches(frames, spectra), repeat=3)
+                print("%8d %6d %6d %18.0f %18.0f %8.1f" % (fft_size, cres, batch, previous, current, current / previous))
+
+
+if __name__ == "__main__":
+    main()
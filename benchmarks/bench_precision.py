@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput and memory of the double and single precision modes.
+
+Streams one second of 48 kHz stereo audio in 10 ms blocks through the
+ring buffer, the shared STFT (both channels) and the spectrum smoothing,
+as a spectrum dock in dual-channel mode does.
+"""
+
+import tracemalloc
+
+import numpy as np
+
+from friture.audiobackend import SAMPLING_RATE
+from friture.precision import set_single_precision
+from friture.ringbuffer import RingBuffer
+from friture.signal.exp_smoothing import exp_smoothed_value_2d
+from friture.stft_cache import STFTCache
+from benchmarks.timing import time_per_call
+
+CHANNELS = 2
+BLOCK = SAMPLING_RATE // 100
+FFT_SIZE = 4096
+HOP = FFT_SIZE // 4
+
+
+def stream(blocks):
+    buffer = RingBuffer()
+    cache = STFTCache()
+
+    alpha = 0.1
+    kernel = ((1. - alpha) ** np.arange(8191, -1, -1)).astype(blocks[0].dtype)
+    state = [np.zeros(FFT_SIZE // 2 + 1, dtype=blocks[0].dtype) for _ in range(CHANNELS)]
+
+    next_stop = FFT_SIZE
+    for block in blocks:
+        buffer.push(block, 0.)
+        count = (buffer.offset - next_stop) // HOP + 1
+        if count > 0:
+            stop = next_stop + (count - 1) * HOP
+            for channel in range(CHANNELS):
+                spectra = cache.power_spectra(buffer, channel, FFT_SIZE, HOP, stop, count)
+                state[channel] = exp_smoothed_value_2d(kernel, alpha, spectra.T, state[channel])
+            next_stop = stop + HOP
+
+    return buffer, state
+
+
+def main():
+    rng = np.random.default_rng(0)
+    # the audio devices deliver float32 samples
+    audio = rng.standard_normal((CHANNELS, SAMPLING_RATE)).astype(np.float32)
+
+    print("%10s %16s %12s %16s" % ("precision", "x real-time", "ring (kB)", "peak alloc (kB)"))
+
+    for name, single in (("float64", False), ("float32", True)):
+        set_single_precision(single)
+        dtype = np.float32 if single else np.float64
+        blocks = [audio[:, i:i + BLOCK].astype(dtype) for i in range(0, SAMPLING_RATE, BLOCK)]
+
+        duration = time_per_call(lambda: stream(blocks), min_duration=0.5, repeat=3)
+
+        tracemalloc.start()
+        buffer, _ = stream(blocks)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print("%10s %16.1f %12.0f %16.0f" % (name, 1. / duration, buffer.buffer.nbytes / 1e3, peak / 1e3))
+
+    set_single_precision(False)
+
+
+if __name__ == "__main__":
+    main()
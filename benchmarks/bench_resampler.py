@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput of the spectrogram screen resampler.
+
+Pushes blocks of spectrogram columns, as many as a display timer tick
+produces, through the time-axis resampler, column by column (the previous
+implementation) or all at once.
+"""
+
+import numpy as np
+
+from friture.signal.linear_interp import linear_interp_2D
+from friture.signal.online_linear_2D_resampler import Online_Linear_2D_resampler
+from benchmarks.timing import time_per_call
+
+# screen height of the spectrogram, in pixels
+HEIGHT = 600
+
+# (spectrogram columns per tick, input columns per screen column)
+CASES = [(1, 0.5), (4, 0.5), (4, 2.), (16, 0.25), (16, 4.), (64, 1.)]
+
+
+class ColumnByColumnResampler(Online_Linear_2D_resampler):
+
+    def push(self, data):
+        self.set_height(data.shape[0])
+        output_data = []
+        resampled_data = np.zeros((self.height, 1))
+        for j in range(data.shape[1]):
+            self.orig_index += 1.
+            n = self.processable(0)
+            if n > 0:
+                if resampled_data.shape[1] < n:
+                    resampled_data = np.zeros((self.height, n))
+                self.resampled_index = linear_interp_2D(
+                    resampled_data, data[:, j], self.old_data,
+                    self.orig_index, self.resampled_index, self.resampling_ratio, n)
+                output_data.append(resampled_data[:, :n].copy())
+            self.old_data = data[:, j]
+        return np.concatenate(output_data, axis=1) if output_data else np.zeros((self.height, 0))
+
+
+def columns_per_second(resampler, blocks):
+    def run():
+        for block in blocks:
+            resampler.push(block)
+    return len(blocks) * blocks[0].shape[1] / time_per_call(run)
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print("%8s %8s %18s %18s %8s" % ("columns", "ratio", "loop (columns/s)", "batched (columns/s)", "speedup"))
+
+    for columns, ratio in CASES:
+        blocks = [rng.random((HEIGHT, columns)) for _ in range(max(1, 256 // columns))]
+        L, M = ratio.as_integer_ratio()
+
+        loop = columns_per_second(ColumnByColumnResampler(L, M, HEIGHT), blocks)
+        batched = columns_per_second(Online_Linear_2D_resampler(L, M, HEIGHT), blocks)
+
+        print("%8d %8.2f %18.0f %18.0f %7.1fx" % (columns, ratio, loop, batched, batched / loop))
+
+
+if __name__ == "__main__":
+    main()
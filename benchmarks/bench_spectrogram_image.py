@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Cost of writing new columns into the spectrogram image.
+
+Compares the previous pixmap canvas (bytes copy, new QImage and three
+QPainter.drawImage calls per push) with the numpy-backed image ring, for
+the columns produced by one 10 ms timer tick on HD and 4K screens.
+Run with QT_QPA_PLATFORM=offscreen when there is no display.
+"""
+
+import numpy as np
+from PyQt6 import QtCore, QtGui
+
+from friture.spectrogram_image import CanvasScaledSpectrogram
+from benchmarks.timing import time_per_call
+
+# (canvas width, canvas height)
+SCREENS = [(1920, 1080), (3840, 2160)]
+COLUMNS = [1, 4]
+
+
+class PixmapCanvas:
+    """The previous implementation of CanvasScaledSpectrogram.addData."""
+
+    def __init__(self, width, height):
+        self.canvas_width = width
+        self.pixmap = QtGui.QPixmap(2 * width, height)
+        self.pixmap.fill(QtGui.QColor("black"))
+        self.painter = QtGui.QPainter()
+        self.write_offset = 0
+
+    def addData(self, xyzs, last_data_time):
+        xyzs = xyzs[::-1, :]
+        width, height = xyzs.shape[1], xyzs.shape[0]
+        image = QtGui.QImage(xyzs.tobytes(), width, height, width * 4, QtGui.QImage.Format.Format_RGB32)
+
+        offset = self.write_offset % self.canvas_width
+        direct = min(width, self.canvas_width - offset)
+        folded = width - direct
+        self.painter.begin(self.pixmap)
+        self.painter.drawImage(QtCore.QRectF(offset, 0, width, height), image, QtCore.QRectF(0, 0, width, height))
+        self.painter.drawImage(QtCore.QRectF(offset + self.canvas_width, 0, direct, height), image, QtCore.QRectF(0, 0, direct, height))
+        self.painter.drawImage(QtCore.QRectF(0, 0, folded, height), image, QtCore.QRectF(direct, 0, folded, height))
+        self.painter.end()
+        self.write_offset += width
+
+
+def main():
+    app = QtGui.QGuiApplication.instance() or QtGui.QGuiApplication([])
+
+    rng = np.random.default_rng(0)
+
+    print("%12s %8s %16s %16s %8s" % ("screen", "columns", "pixmap (us)", "image ring (us)", "speedup"))
+
+    for width, height in SCREENS:
+        for columns in COLUMNS:
+            data = rng.integers(0, 2 ** 24, (height, columns)).astype(np.uint32) | np.uint32(0xff000000)
+
+            pixmap_canvas = PixmapCanvas(width, height)
+            image_canvas = CanvasScaledSpectrogram(height, width)
+
+            t_pixmap = time_per_call(lambda: pixmap_canvas.addData(data, 0.))
+            t_image = time_per_call(lambda: image_canvas.addData(data, 0.))
+
+            print("%12s %8d %16.1f %16.1f %7.1fx" % ("%dx%d" % (width, height), columns, 1e6 * t_pixmap, 1e6 * t_image, t_pixmap / t_image))
+
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Per-tick cost of the spectrum analysis, frame by frame or batched.
+
+Emulates what Spectrum_Widget and Spectrogram_Widget do on each display
+timer tick: analyze all the overlapping frames that became realizable
+since the previous tick. The per-frame path calls data_indexed and
+analyzelive once per frame, the batched path takes a single strided view
+of the ring buffer and runs a single FFT call.
+"""
+
+import numpy as np
+
+from friture.audiobackend import SAMPLING_RATE
+from friture.audioproc import audioproc
+from friture.ringbuffer import RingBuffer
+from benchmarks.timing import time_per_call
+
+# audio samples received per display timer tick (10 ms)
+TICK_SAMPLES = SAMPLING_RATE // 100
+
+FFT_SIZES = [256, 1024, 4096, 16384]
+OVERLAPS = [0.5, 0.75, 0.875]
+
+
+def per_frame(buffer, proc, stop, fft_size, hop, count):
+    start = stop - (count - 1) * hop
+    spectra = np.zeros((fft_size // 2 + 1, count))
+    for i in range(count):
+        floatdata = buffer.data_indexed(start + i * hop, fft_size)
+        spectra[:, i] = proc.analyzelive(floatdata[0, :])
+    return spectra
+
+
+def batched(buffer, proc, stop, fft_size, hop, count):
+    frames = buffer.data_frames(stop, fft_size, hop, count)
+    return proc.analyze_frames(frames[0]).T
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    buffer = RingBuffer(history=4 * max(FFT_SIZES))
+    buffer.push(rng.standard_normal((1, 4 * max(FFT_SIZES))), 0.)
+
+    print("%8s %8s %8s %14s %14s %8s" % ("fft_size", "overlap", "frames", "per-frame (us)", "batched (us)", "speedup"))
+
+    for fft_size in FFT_SIZES:
+        proc = audioproc()
+        proc.set_fftsize(fft_size)
+
+        for overlap in OVERLAPS:
+            hop = int(fft_size * (1. - overlap))
+            count = max(1, round(TICK_SAMPLES / hop))
+            stop = buffer.offset
+
+            reference = per_frame(buffer, proc, stop, fft_size, hop, count)
+            np.testing.assert_allclose(batched(buffer, proc, stop, fft_size, hop, count), reference, rtol=1e-9, atol=1e-20)
+
+            t_loop = time_per_call(lambda: per_frame(buffer, proc, stop, fft_size, hop, count))
+            t_batch = time_per_call(lambda: batched(buffer, proc, stop, fft_size, hop, count))
+
+            print("%8d %8.3f %8d %14.1f %14.1f %7.1fx" % (fft_size, overlap, count, 1e6 * t_loop, 1e6 * t_batch, t_loop / t_batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Deterministic synthetic audio for the benchmarks, from the signal generators.
+
+The generators are the ones of the generator dock. The noise generators
+draw from the global numpy random state, which is seeded before each
+signal, so that two runs process exactly the same samples. All the
+signals are scaled to the same RMS level.
+"""
+
+import numpy as np
+
+from friture.audio_format import SAMPLING_RATE
+from friture.generators.pink import PinkGenerator
+from friture.generators.sine import SineGenerator
+from friture.generators.sweep import SweepGenerator
+from friture.generators.white import WhiteGenerator
+
+SIGNALS = {
+    "sine": SineGenerator,
+    "white": WhiteGenerator,
+    "pink": PinkGenerator,
+    "sweep": SweepGenerator,
+}
+
+# RMS level of the signals, -12 dBFS
+LEVEL = 10. ** (-12. / 20.)
+
+
+def generate(name, length, seed=0):
+    """'length' samples of the named signal, as a float64 1D array."""
+    generator = SIGNALS[name](None)
+    t = np.arange(length) / SAMPLING_RATE
+    np.random.seed(seed)
+    x = np.asarray(generator.signal(t), dtype=np.float64)
+    return LEVEL * x / np.sqrt(np.mean(x ** 2))
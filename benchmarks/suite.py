@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput of the DSP hot paths, on deterministic synthetic signals.
+
+Each case drives one hot path with the signals of benchmarks.signals, in
+the block sizes of the live analysis, and reports its throughput in
+samples, frames, columns or pixels per second. The results can be saved
+as JSON and compared with the results of another run, for example on
+another commit:
+
+    python -m benchmarks.suite -o before.json
+    git checkout other-branch
+    python -m benchmarks.suite -o after.json --compare before.json
+
+Run with QT_QPA_PLATFORM=offscreen when there is no display.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+import numpy as np
+
+import friture
+import friture.plotting.frequency_scales as fscales
+from friture import generated_filters
+from friture.audio_format import FRAMES_PER_BUFFER, SAMPLING_RATE
+from friture.audioproc import audioproc
+from friture.octavefilters import Octave_Filters
+from friture.pitch_estimator import PitchTracker
+from friture.ringbuffer import RingBuffer
+from friture.signal.color_tranform import Color_Transform
+from friture.signal.correlation import Accumulating_GCC_PHAT
+from friture.signal.frequency_resampler import Frequency_Resampler
+from friture.signal.lfilter import lfilter_float64_1D
+from friture.signal.online_linear_2D_resampler import Online_Linear_2D_resampler
+from benchmarks.bench_octave_filters import FunctionFilters
+from benchmarks.signals import SIGNALS, generate
+from benchmarks.timing import time_per_call
+
+# duration of the signals, in seconds
+DURATION = 1.
+# audio samples received per display timer tick (10 ms)
+TICK_SAMPLES = SAMPLING_RATE // 100
+
+FFT_SIZE = 4096
+HOP = FFT_SIZE // 4
+# screen height of the spectrogram, in pixels
+HEIGHT = 600
+# spectrogram columns per display timer tick
+TICK_COLUMNS = 4
+# default delay range of the delay estimator, in seconds, and its subsampling
+DELAY_RANGE = 1.
+DELAY_DECIMATION = 4
+
+
+def signal(name, duration=DURATION):
+    return generate(name, int(duration * SAMPLING_RATE))
+
+
+def blocks(x, length):
+    return [x[..., i:i + length] for i in range(0, x.shape[-1] - length + 1, length)]
+
+
+def spectrogram_columns(name):
+    """The normalized (frequency, time) spectrogram of a signal, in [0, 1],
+    as the spectrogram dock gives it to its resamplers."""
+    x = signal(name)
+    frames = np.lib.stride_tricks.sliding_window_view(x, FFT_SIZE)[::HOP]
+    proc = audioproc()
+    proc.set_fftsize(FFT_SIZE)
+    dB = 10. * np.log10(proc.analyze_frames(frames) + 1e-30)
+    return np.clip((dB + 140.) / 140., 0., 1.).T
+
+
+# Each case takes a signal name and returns (run, count, unit): run()
+# processes 'count' units of the signal.
+
+def ringbuffer_push(name):
+    x = np.stack([signal(name)] * 2)
+    buffer = RingBuffer()
+    pushed = blocks(x, FRAMES_PER_BUFFER)
+
+    def run():
+        for block in pushed:
+            buffer.push(block)
+    return run, len(pushed) * FRAMES_PER_BUFFER, "samples"
+
+
+def ringbuffer_data_indexed(name):
+    x = signal(name)
+    buffer = RingBuffer(history=x.shape[0])
+    buffer.push(x[np.newaxis, :])
+    starts = range(buffer.offset - x.shape[0], buffer.offset - FFT_SIZE, FRAMES_PER_BUFFER)
+
+    def run():
+        for start in starts:
+            buffer.data_indexed(start, FFT_SIZE)
+    return run, len(starts) * FFT_SIZE, "samples"
+
+
+def audioproc_analyzelive(name):
+    frames = np.lib.stride_tricks.sliding_window_view(signal(name), FFT_SIZE)[::HOP]
+    proc = audioproc()
+    proc.set_fftsize(FFT_SIZE)
+
+    def run():
+        for frame in frames:
+            proc.analyzelive(frame)
+    return run, frames.shape[0], "frames"
+
+
+def octave_filter_bank_decimation_fft(name):
+    x = signal(name)[np.newaxis, :]
+    filters = FunctionFilters(3, 1)
+    ticks = blocks(x, TICK_SAMPLES)
+
+    def run():
+        for block in ticks:
+            filters.filter(block)
+    return run, len(ticks) * TICK_SAMPLES, "samples"
+
+
+def octave_filter_bank(name):
+    x = signal(name)[np.newaxis, :]
+    bank = Octave_Filters(3).filter_bank
+    ticks = blocks(x, TICK_SAMPLES)
+
+    def run():
+        for block in ticks:
+            bank.filter(block)
+    return run, len(ticks) * TICK_SAMPLES, "samples"
+
+
+def lfilter(name):
+    # the 12th-order decimation filter of the octave bands and the delay estimator
+    b, a = (np.array(coefficients) for coefficients in generated_filters.PARAMS['dec'])
+    ticks = blocks(signal(name), TICK_SAMPLES)
+    state = [np.zeros(len(b) - 1)]
+
+    def run():
+        zi = state[0]
+        for block in ticks:
+            _, zi = lfilter_float64_1D(b, a, block, zi)
+        state[0] = zi
+    return run, len(ticks) * TICK_SAMPLES, "samples"
+
+
+def online_linear_2D_resampler(name):
+    frequency_resampler = Frequency_Resampler(fscales.Logarithmic, 20., 20000., HEIGHT)
+    frequency_resampler.setfreq(np.fft.rfftfreq(FFT_SIZE, 1. / SAMPLING_RATE))
+    columns = frequency_resampler.push(spectrogram_columns(name))
+    # 3 screen columns for 2 spectrogram columns
+    resampler = Online_Linear_2D_resampler(3, 2, HEIGHT)
+    ticks = blocks(columns, TICK_COLUMNS)
+
+    def run():
+        for block in ticks:
+            resampler.push(block)
+    return run, len(ticks) * TICK_COLUMNS, "columns"
+
+
+def frequency_resampler(name):
+    resampler = Frequency_Resampler(fscales.Logarithmic, 20., 20000., HEIGHT)
+    resampler.setfreq(np.fft.rfftfreq(FFT_SIZE, 1. / SAMPLING_RATE))
+    ticks = blocks(spectrogram_columns(name), TICK_COLUMNS)
+
+    def run():
+        for block in ticks:
+            resampler.push(block)
+    return run, len(ticks) * TICK_COLUMNS, "columns"
+
+
+def pitch_tracker_update(name):
+    buffer = RingBuffer()
+    tracker = PitchTracker(buffer)
+    ticks = blocks(signal(name)[np.newaxis, :], TICK_SAMPLES)
+
+    def run():
+        for block in ticks:
+            buffer.push(block)
+            tracker.update()
+    return run, len(ticks) * TICK_SAMPLES, "samples"
+
+
+def delay_estimator_gcc(name):
+    rate = SAMPLING_RATE // DELAY_DECIMATION
+    length = int(2 * DELAY_RANGE * rate)
+    hop = length // 2
+    # a few frames, and the second channel delayed by 10 ms
+    x = signal(name, 4 * DELAY_RANGE * DELAY_DECIMATION)[::DELAY_DECIMATION]
+    y = np.roll(x, rate // 100)
+    d0 = np.lib.stride_tricks.sliding_window_view(x, length)[::hop]
+    d1 = np.lib.stride_tricks.sliding_window_view(y, length)[::hop]
+
+    def run():
+        gcc = Accumulating_GCC_PHAT()
+        for k in range(d0.shape[0]):
+            gcc.push(d0[k:k + 1], d1[k:k + 1])
+            gcc.correlation()
+    return run, d0.shape[0], "frames"
+
+
+def color_lut(name):
+    frequency_resampler = Frequency_Resampler(fscales.Logarithmic, 20., 20000., HEIGHT)
+    frequency_resampler.setfreq(np.fft.rfftfreq(FFT_SIZE, 1. / SAMPLING_RATE))
+    columns = frequency_resampler.push(spectrogram_columns(name))
+    transform = Color_Transform()
+    ticks = blocks(columns, TICK_COLUMNS)
+
+    def run():
+        for block in ticks:
+            transform.push(block)
+    return run, len(ticks) * TICK_COLUMNS * HEIGHT, "pixels"
+
+
+CASES = {
+    "RingBuffer.push": ringbuffer_push,
+    "RingBuffer.data_indexed": ringbuffer_data_indexed,
+    "audioproc.analyzelive": audioproc_analyzelive,
+    "octave_filter_bank_decimation_fft": octave_filter_bank_decimation_fft,
+    "OctaveFilterBank.filter": octave_filter_bank,
+    "lfilter_float64_1D": lfilter,
+    "Online_Linear_2D_resampler.push": online_linear_2D_resampler,
+    "Frequency_Resampler.push": frequency_resampler,
+    "PitchTracker.update": pitch_tracker_update,
+    "Accumulating_GCC_PHAT": delay_estimator_gcc,
+    "Color_Transform.push": color_lut,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "friture": friture.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the Friture DSP hot paths.")
+    parser.add_argument("-o", "--output", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results saved in this JSON file")
+    parser.add_argument("-k", "--filter", default="", help="Only run the cases whose name contains this string")
+    parser.add_argument("--signals", default=",".join(SIGNALS),
+                        help="Comma-separated signals (default: %(default)s)")
+    parser.add_argument("--min-duration", type=float, default=0.2,
+                        help="Minimum duration of each measurement, in seconds (default: %(default)s)")
+    arguments = parser.parse_args()
+
+    reference = {}
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            previous = json.load(f)
+        reference = {(result["case"], result["signal"]): result["throughput"] for result in previous["results"]}
+        print("Comparing with %s (commit %s)" % (arguments.compare, previous["environment"]["commit"]))
+
+    print("%-34s %6s %16s %10s %14s %8s" % ("case", "signal", "throughput (/s)", "unit", "per call (ms)", "ratio"))
+
+    results = []
+    for case, build in CASES.items():
+        if arguments.filter not in case:
+            continue
+        for name in arguments.signals.split(","):
+            run, count, unit = build(name)
+            seconds = time_per_call(run, min_duration=arguments.min_duration)
+            throughput = count / seconds
+            results.append({
+                "case": case,
+                "signal": name,
+                "unit": unit,
+                "count": count,
+                "time_per_call": seconds,
+                "throughput": throughput,
+            })
+
+            ratio = reference.get((case, name))
+            print("%-34s %6s %16.4g %10s %14.3f %8s" % (
+                case, name, throughput, unit, 1e3 * seconds,
+                "" if ratio is None else "%.2fx" % (throughput / ratio)))
+
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print("Results saved to %s" % (arguments.output))
+
+
+if __name__ == "__main__":
+    main()
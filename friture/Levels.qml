@@ -15,7 +15,7 @@ Rectangle {
     // but do not bind directly to their widths
     // to avoid frequent costly resizes
     //due to level changes or variations in the width of the font characters
-    implicitWidth: 4 + fontMetrics.boundingRect(level_view_model.two_channels ? "2: -88.8" : "-88:8").width
+    implicitWidth: 4 + fontMetrics.boundingRect(level_view_model.channel_count > 1 ? level_view_model.channel_count + ": -88.8" : "-88:8").width
 
     FontMetrics {
         id: fontMetrics
@@ -33,7 +33,7 @@ Rectangle {
         Text {
             id: peakValues
             textFormat: Text.StyledText
-            text: level_view_model.two_channels ? "1: " + level_to_text(level_view_model.level_data_slow.level_max) + "<br />2: " + level_to_text(level_view_model.level_data_slow_2.level_max) : level_to_text(level_view_model.level_data_slow.level_max)
+            text: levels_to_text(level_view_model.channels, "level_max")
             font.pointSize: 14
             font.bold: true
             font.family: fixedFont
@@ -56,7 +56,7 @@ Rectangle {
         Text {
             id: rmsValues
             textFormat: Text.StyledText
-            text: level_view_model.two_channels ? "1: " + level_to_text(level_view_model.level_data_slow.level_rms) + "<br />2: " + level_to_text(level_view_model.level_data_slow_2.level_rms) : level_to_text(level_view_model.level_data_slow.level_rms)
+            text: levels_to_text(level_view_model.channels, "level_rms")
             font.pointSize: 14
             font.bold: true
             font.family: fixedFont
@@ -90,4 +90,17 @@ Rectangle {
 
         return dB.toFixed(1);
     }
+
+    // one line per channel, numbered when there are several channels
+    function levels_to_text(channels, level) {
+        if (channels.length == 1) {
+            return level_to_text(channels[0].level_data_slow[level]);
+        }
+
+        var lines = [];
+        for (var i = 0; i < channels.length; i++) {
+            lines.push((i + 1) + ": " + level_to_text(channels[i].level_data_slow[level]));
+        }
+        return lines.join("<br />");
+    }
 }
\ No newline at end of file
@@ -20,27 +20,35 @@ Rectangle {
         SingleMeter {
             Layout.fillHeight: true
             Layout.alignment: Qt.AlignLeft
-            levelMax: level_view_model.level_data.level_max
-            levelRms: level_view_model.level_data.level_rms
+            levelMax: level_view_model.channels[0].level_data.level_max
+            levelRms: level_view_model.channels[0].level_data.level_rms
             topOffset: metersLayout.topOffset
-            levelIECMaxBallistic: level_view_model.level_data_ballistic.peak_iec
+            levelIECMaxBallistic: level_view_model.channels[0].level_data_ballistic.peak_iec
         }
 
         MeterScale {
             Layout.fillHeight: true
             Layout.alignment: Qt.AlignLeft
             topOffset: metersLayout.topOffset
-            twoChannels: level_view_model.two_channels
+            twoChannels: level_view_model.channel_count > 1
         }
 
-        SingleMeter {
-            visible: level_view_model.two_channels
-            Layout.fillHeight: true
-            Layout.alignment: Qt.AlignLeft
-            levelMax: level_view_model.level_data_2.level_max
-            levelRms: level_view_model.level_data_2.level_rms
-            topOffset: metersLayout.topOffset
-            levelIECMaxBallistic: level_view_model.level_data_ballistic_2.peak_iec
+        // the other channels, on the right of the scale
+        Repeater {
+            model: level_view_model.channels
+
+            SingleMeter {
+                required property var modelData
+                required property int index
+
+                visible: index > 0
+                Layout.fillHeight: true
+                Layout.alignment: Qt.AlignLeft
+                levelMax: modelData.level_data.level_max
+                levelRms: modelData.level_data.level_rms
+                topOffset: metersLayout.topOffset
+                levelIECMaxBallistic: modelData.level_data_ballistic.peak_iec
+            }
         }
 
         Item {
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Lock that serializes the analysis with the settings changes.
+
+When the analysis runs in a worker thread (see analysis_worker), the
+settings of the audio backend and of the widgets are still changed from
+the GUI thread. The worker holds this lock while it fetches and analyzes
+the audio data, and the setters that change the analysis state take it
+too, so that the analysis never sees half-updated settings.
+
+In the default single-threaded mode the lock is never contended.
+"""
+
+import functools
+import threading
+from typing import Any, Callable, TypeVar, cast
+
+analysis_lock = threading.RLock()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def analysis_locked(method: F) -> F:
+    """Decorator that runs the method with the analysis lock held."""
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with analysis_lock:
+            return method(*args, **kwargs)
+
+    return cast(F, wrapper)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Optional worker thread for the audio fetching and the analysis.
+
+By default, the display timer of the main window fetches the audio data
+and every widget analyzes it on the GUI thread. With the worker thread
+enabled (--analysis-thread), a QThread runs its own timer that fetches
+the audio data and calls analyze() on the docks whose widget supports it.
+The results are posted to a single-producer single-consumer queue per
+dock, and drained on the GUI thread by the dock canvasUpdate, where the
+widget presents them to its view model.
+
+A widget supports the worker thread by implementing:
+ - analyze(): process the new audio data from its buffer, and return a
+   result object, or None if there is nothing new to present. It must
+   not touch any Qt object.
+ - present(result): update the view model, on the GUI thread.
+ - optionally, merge_results(older, newer): combine two results that the
+   GUI thread has not presented yet, in the worker thread.
+Its setters that change the analysis state must be decorated with
+analysis_locked. The other widgets keep receiving the new data on the GUI
+thread through the AudioBuffer signal.
+"""
+
+import logging
+from collections import deque
+
+from PyQt6 import QtCore
+
+from friture.analysis_lock import analysis_lock
+from friture.audiobackend import AudioBackend
+from friture.timings import GetTimings
+
+# results kept when the GUI thread lags behind
+RESULT_QUEUE_LENGTH = 64
+
+
+class ResultQueue:
+    """Lock-free queue from the worker thread (single producer) to the GUI
+    thread (single consumer).
+
+    deque.append, deque.pop and deque.popleft are atomic, so neither side
+    needs a lock: an item belongs to the side that takes it out.
+
+    When the GUI thread lags behind, for example while a modal dialog is
+    open, the queue does not grow beyond maxlen. A new result is merged into
+    the newest queued one with 'merge(older, newer)', when the widget can
+    merge its results. Otherwise the oldest result is dropped, and the drops
+    are logged when the queue is drained.
+    """
+
+    def __init__(self, maxlen=RESULT_QUEUE_LENGTH, merge=None):
+        self.logger = logging.getLogger(__name__)
+
+        self.items = deque()
+        self.maxlen = maxlen
+        self.merge = merge
+
+        # written by the producer only
+        self.dropped = 0
+        # written by the consumer only
+        self.reported = 0
+
+    def put(self, item):
+        if len(self.items) >= self.maxlen:
+            try:
+                if self.merge is not None:
+                    item = self.merge(self.items.pop(), item)
+                else:
+                    self.items.popleft()
+                    self.dropped += 1
+            except IndexError:
+                # drained by the consumer meanwhile
+                pass
+        self.items.append(item)
+
+    def drain(self):
+        dropped = self.dropped
+        if dropped != self.reported:
+            self.logger.warning("%d analysis results dropped, the display lags behind", dropped - self.reported)
+            self.reported = dropped
+
+        items = []
+        while True:
+            try:
+                items.append(self.items.popleft())
+            except IndexError:
+                return items
+
+
+class AnalysisWorker(QtCore.QObject):
+
+    start_requested = QtCore.pyqtSignal()
+    stop_requested = QtCore.pyqtSignal()
+
+    def __init__(self, period_ms):
+        super().__init__()
+
+        self.logger = logging.getLogger(__name__)
+
+        self.period_ms = period_ms
+        self.timer = None
+
+        # objects with an analyze() method, called on every tick
+        self.clients = []
+
+        self.thread = QtCore.QThread()
+        self.thread.setObjectName("Friture analysis")
+        self.moveToThread(self.thread)
+
+        # queued connections, the slots run in the worker thread
+        self.start_requested.connect(self.start_timer)
+        self.stop_requested.connect(self.stop_timer)
+
+        self.thread.start()
+
+    def add_client(self, client):
+        with analysis_lock:
+            self.clients.append(client)
+
+    def remove_client(self, client):
+        with analysis_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def start(self):
+        self.start_requested.emit()
+
+    def stop(self):
+        self.stop_requested.emit()
+
+    # slot, in the worker thread
+    def start_timer(self):
+        if self.timer is None:
+            # created here so that it belongs to the worker thread
+            self.timer = QtCore.QTimer(self)
+            self.timer.setInterval(self.period_ms)
+            self.timer.timeout.connect(self.tick)
+        self.logger.info("Analysis thread timer start")
+        self.timer.start()
+
+    # slot, in the worker thread
+    def stop_timer(self):
+        if self.timer is not None:
+            self.logger.info("Analysis thread timer stop")
+            self.timer.stop()
+
+    # slot, in the worker thread
+    def tick(self):
+        with analysis_lock, GetTimings().stage("analysis thread tick"):
+            AudioBackend().fetchAudioData()
+
+            for client in self.clients:
+                try:
+                    client.analyze()
+                except Exception:
+                    # the exception hook of the main window shows a message
+                    # box, which can only be done from the GUI thread
+                    self.logger.exception("Analysis failed")
+
+    def close(self):
+        # leaving the event loop of the thread also stops its timer
+        self.thread.quit()
+        self.thread.wait()
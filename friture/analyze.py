@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Command-line entry point of the offline analysis (friture-analyze).
+
+Example:
+    friture-analyze recording.wav -o recording-analysis --analyses levels,pitch
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import friture
+from friture.audio_format import SAMPLING_RATE
+from friture.offline import (
+    ANALYSES,
+    DEFAULT_BANDS_PER_OCTAVE,
+    DEFAULT_BLOCK_PERIODS,
+    DEFAULT_PERIOD,
+    OfflineAnalyzer,
+)
+from friture.pitch_estimator import DEFAULT_FFT_SIZE
+from friture.precision import set_single_precision
+
+
+def comma_separated(value):
+    return [item.strip() for item in value.split(",") if item.strip() != ""]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="friture-analyze",
+        description="Analyze a %d Hz PCM WAV file with the Friture processing, faster than real time." % (SAMPLING_RATE))
+
+    parser.add_argument(
+        "input",
+        help="The WAV file to analyze")
+
+    parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="The directory where the .npy results and analysis.json are written")
+
+    parser.add_argument(
+        "--analyses",
+        type=comma_separated,
+        default=list(ANALYSES),
+        help="Comma-separated analyses to run, among %s (default: all)" % (",".join(ANALYSES)))
+
+    parser.add_argument(
+        "--channels",
+        type=lambda value: [int(channel) for channel in comma_separated(value)],
+        default=None,
+        help="Comma-separated channels to analyze, starting from 0 (default: all)")
+
+    parser.add_argument(
+        "--period",
+        type=float,
+        default=DEFAULT_PERIOD,
+        help="Period of the levels, octave bands and spectra, in seconds (default: %(default)s)")
+
+    parser.add_argument(
+        "--fft-size",
+        type=int,
+        default=DEFAULT_FFT_SIZE,
+        help="FFT size of the spectrum and of the pitch tracker (default: %(default)s)")
+
+    parser.add_argument(
+        "--bands-per-octave",
+        type=int,
+        choices=[1, 3, 6, 12, 24],
+        default=DEFAULT_BANDS_PER_OCTAVE,
+        help="Bands per octave of the octave analysis (default: %(default)s)")
+
+    parser.add_argument(
+        "--block-periods",
+        type=int,
+        default=DEFAULT_BLOCK_PERIODS,
+        help="Number of periods read and analyzed at once (default: %(default)s)")
+
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Process the audio data in single precision")
+
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log the progress of the analysis")
+
+    arguments = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if arguments.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # before the buffers are created
+    set_single_precision(arguments.float32)
+
+    try:
+        analyzer = OfflineAnalyzer(
+            analyses=arguments.analyses,
+            period=arguments.period,
+            fft_size=arguments.fft_size,
+            bandsperoctave=arguments.bands_per_octave,
+            channel_map=arguments.channels,
+            block_periods=arguments.block_periods)
+
+        start = time.perf_counter()
+        metadata = analyzer.run(arguments.input, arguments.output)
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print("friture-analyze: error: %s" % (e), file=sys.stderr)
+        return 1
+
+    duration = metadata["samples"] / SAMPLING_RATE
+    print("Friture %s: analyzed %.1f s of audio in %.2f s (%.0fx real time)" % (
+        friture.__version__, duration, elapsed, duration / max(elapsed, 1e-9)))
+    for name, output in metadata["outputs"].items():
+        print("  %-8s %s %s" % (name, output["file"], tuple(output["shape"])))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,7 @@ import errno
 import platform
 import logging
 import logging.handlers
+import time
 
 from PyQt6 import QtCore
 # specifically import from PyQt6.QtGui and QWidgets for startup time improvement :
@@ -46,6 +47,8 @@ from friture.about import About_Dialog  # About dialog
 from friture.settings import Settings_Dialog  # Setting dialog
 from friture.audiobuffer import AudioBuffer  # audio ring buffer class
 from friture.audiobackend import AudioBackend  # audio backend class
+from friture.analysis_worker import AnalysisWorker
+from friture.precision import set_single_precision
 from friture.dockmanager import DockManager
 from friture.tilelayout import TileLayout
 from friture.level_view_model import LevelViewModel
@@ -74,6 +77,8 @@ from friture.generators.pink import Pink_Generator_Settings_View_Model
 from friture.generators.sweep import Sweep_Generator_Settings_View_Model
 from friture.generators.burst import Burst_Generator_Settings_View_Model
 from friture.theme_manager import ThemeManager
+from friture.frame_scheduler import GetFrameScheduler
+from friture.timings import GetTimings
 
 # the display timer could be made faster when the processing
 # power allows it, firing down to every 10 ms
@@ -87,7 +92,7 @@ SLOW_TIMER_PERIOD_MS = 1000
 
 class Friture(QMainWindow, ):
 
-    def __init__(self):
+    def __init__(self, analysis_thread=False):
         QMainWindow.__init__(self)
 
         self.logger = logging.getLogger(__name__)
@@ -143,9 +148,22 @@ class Friture(QMainWindow, ):
         # Initialize the audio data ring buffer
         self.audiobuffer = AudioBuffer()
 
+        # optional worker thread for the audio fetching and the analysis
+        if analysis_thread:
+            self.logger.info("Audio fetching and analysis in a worker thread")
+            self.analysis_worker = AnalysisWorker(SMOOTH_DISPLAY_TIMER_PERIOD_MS)
+        else:
+            self.analysis_worker = None
+
         # Initialize the audio backend
         # signal containing new data from the audio callback thread, processed as numpy array
-        AudioBackend().new_data_available.connect(self.audiobuffer.handle_new_data)
+        if self.analysis_worker is not None:
+            # the audio buffer is filled in the worker thread, where the data is fetched,
+            # and its signal is queued to the receivers in the GUI thread
+            self.audiobuffer.set_queued_receivers(True)
+            AudioBackend().new_data_available.connect(self.audiobuffer.handle_new_data, QtCore.Qt.ConnectionType.DirectConnection)
+        else:
+            AudioBackend().new_data_available.connect(self.audiobuffer.handle_new_data)
 
         self.player = Player(self)
         self.audiobuffer.new_data_available.connect(self.player.handle_new_data)
@@ -153,6 +171,8 @@ class Friture(QMainWindow, ):
         # this timer is used to update widgets that just need to display as fast as they can
         self.display_timer = QtCore.QTimer()
         self.display_timer.setInterval(SMOOTH_DISPLAY_TIMER_PERIOD_MS)  # constant timing
+        GetTimings().set_tick_period(SMOOTH_DISPLAY_TIMER_PERIOD_MS / 1000.)
+        GetFrameScheduler().set_budget(SMOOTH_DISPLAY_TIMER_PERIOD_MS / 1000.)
 
         # slow timer
         self.slow_timer = QtCore.QTimer()
@@ -183,16 +203,22 @@ class Friture(QMainWindow, ):
 
         self.level_widget = Levels_Widget(self, self._main_window_view_model.level_view_model)
         self.level_widget.set_buffer(self.audiobuffer)
-        self.audiobuffer.new_data_available.connect(self.level_widget.handle_new_data)
+        self.audiobuffer.new_data_available.connect(self.levels_new_data)
 
         self.playback_widget = PlaybackControlWidget(self, self.player, self._main_window_view_model.playback_control_view_model)
 
         self.dockmanager = DockManager(self, self.main_tile_layout)
 
         # timer ticks
-        self.display_timer.timeout.connect(self.dockmanager.canvasUpdate)
-        self.display_timer.timeout.connect(self.level_widget.canvasUpdate)
-        self.display_timer.timeout.connect(AudioBackend().fetchAudioData)
+        self.display_timer.timeout.connect(self.display_tick)
+
+        # with the threaded render loop, the QML scene graph is synchronized
+        # (while the GUI thread is blocked) and rendered on the render thread
+        direct = QtCore.Qt.ConnectionType.DirectConnection
+        self.quick_view.beforeSynchronizing.connect(lambda: GetTimings().begin("QML synchronization"), direct)
+        self.quick_view.afterSynchronizing.connect(lambda: GetTimings().end("QML synchronization"), direct)
+        self.quick_view.beforeRendering.connect(lambda: GetTimings().begin("QML rendering"), direct)
+        self.quick_view.afterRendering.connect(lambda: GetTimings().end("QML rendering"), direct)
 
         # toolbar clicks
         self._main_window_view_model.toolbar_view_model.recording_clicked.connect(self.timer_toggle)
@@ -230,6 +256,28 @@ class Friture(QMainWindow, ):
             errorBox(gui_message)
             self.errorDialogOpened = False
 
+    # slot
+    def display_tick(self):
+        start = time.perf_counter()
+        GetTimings().tick_begin()
+
+        # the audio is drained first, and on every tick, so that the input
+        # ring buffer never overflows while the docks are slowed down
+        if self.analysis_worker is None:
+            AudioBackend().fetchAudioData()
+
+        self.dockmanager.canvasUpdate()
+        with GetTimings().stage("Levels: drawing"):
+            self.level_widget.canvasUpdate()
+
+        GetTimings().tick_end()
+        GetFrameScheduler().end_tick(time.perf_counter() - start)
+
+    # slot
+    def levels_new_data(self, floatdata):
+        with GetTimings().stage("Levels: analysis"):
+            self.level_widget.handle_new_data(floatdata)
+
     # slot
     def settings_called(self):
         self.settings_dialog.show()
@@ -243,6 +291,8 @@ class Friture(QMainWindow, ):
 
     # event handler
     def closeEvent(self, event):
+        if self.analysis_worker is not None:
+            self.analysis_worker.close()
         AudioBackend().close()
         self.saveAppState()
         event.accept()
@@ -327,6 +377,8 @@ class Friture(QMainWindow, ):
         if self.display_timer.isActive():
             self.logger.info("Timer stop")
             self.display_timer.stop()
+            if self.analysis_worker is not None:
+                self.analysis_worker.stop()
             self._main_window_view_model.toolbar_view_model.recording = False
             self.playback_widget.stop_recording()
             AudioBackend().pause()
@@ -334,6 +386,8 @@ class Friture(QMainWindow, ):
         else:
             self.logger.info("Timer start")
             self.display_timer.start()
+            if self.analysis_worker is not None:
+                self.analysis_worker.start()
             self._main_window_view_model.toolbar_view_model.recording = True
             self.playback_widget.start_recording()
             AudioBackend().restart()
@@ -344,6 +398,8 @@ class Friture(QMainWindow, ):
         if not recording and self.display_timer.isActive():
             self.logger.info("Timer stop")
             self.display_timer.stop()
+            if self.analysis_worker is not None:
+                self.analysis_worker.stop()
             self._main_window_view_model.toolbar_view_model.recording = False
             self.playback_widget.stop_recording()
             AudioBackend().pause()
@@ -352,6 +408,8 @@ class Friture(QMainWindow, ):
         if recording and not self.display_timer.isActive():
             self.logger.info("Timer start")
             self.display_timer.start()
+            if self.analysis_worker is not None:
+                self.analysis_worker.start()
             self._main_window_view_model.toolbar_view_model.recording = True
             self.playback_widget.start_recording()
             AudioBackend().restart()
@@ -407,6 +465,16 @@ def main():
         action="store_true",
         help="Disable the splash screen on startup")
 
+    parser.add_argument(
+        "--analysis-thread",
+        action="store_true",
+        help="Fetch and analyze the audio data in a worker thread")
+
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Process the audio data in single precision")
+
     program_arguments, remaining_arguments = parser.parse_known_args()
     remaining_arguments.insert(0, sys.argv[0])
 
@@ -497,7 +565,10 @@ def main():
         splash.showMessage("Initializing the audio subsystem")
         app.processEvents()
 
-    window = Friture()
+    # before the audio backend and the widgets are created
+    set_single_precision(program_arguments.float32)
+
+    window = Friture(analysis_thread=program_arguments.analysis_thread)
     window.show()
     if not program_arguments.no_splash:
         splash.hide()
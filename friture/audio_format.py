@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Format of the audio stream, shared by the audio backend and the analysis.
+
+This module has no dependency on Qt or on the audio devices, so that the
+analysis code can run without them (see friture.offline).
+"""
+
+# the sample rate below should be dynamic, taken from PyAudio/PortAudio
+SAMPLING_RATE = 48000
+FRAMES_PER_BUFFER = 512
@@ -24,12 +24,14 @@ import time
 from PyQt6 import QtCore
 import sounddevice
 import rtmixer
-from numpy import ndarray, vstack, int8, int16, float64, float32, frombuffer, concatenate
+from numpy import ndarray, int8, int16, float64, float32, frombuffer
 import numpy as np
 
-# the sample rate below should be dynamic, taken from PyAudio/PortAudio
-SAMPLING_RATE = 48000
-FRAMES_PER_BUFFER = 512
+from friture.analysis_lock import analysis_locked
+# the widgets import the stream format from here as well
+from friture.audio_format import SAMPLING_RATE, FRAMES_PER_BUFFER
+from friture.precision import sample_dtype
+from friture.timings import GetTimings
 
 __audiobackendInstance = None
 
@@ -59,6 +61,29 @@ __audiobackendInstance = None
 # > doc, features are lacking
 
 
+def channel_index(channel_map):
+    """Index of the channels of a channel map in an interleaved frame:
+    a slice for a run of consecutive channels, an index array otherwise."""
+    first = channel_map[0]
+    if list(channel_map) == list(range(first, first + len(channel_map))):
+        return slice(first, first + len(channel_map))
+    return np.array(channel_map)
+
+
+def deinterleave_regions(out, regions, nchannels, index):
+    """Copy the 'index' channels of consecutive regions of interleaved
+    float32 frames to the rows of 'out', a (channels, length) array."""
+    start = 0
+    for buf in regions:
+        region = frombuffer(buf, dtype=float32).reshape(-1, nchannels)
+        stop = start + region.shape[0]
+        # all the channels in one strided read, with the conversion
+        # to the dtype of 'out'
+        out[:, start:stop] = region[:, index].T
+        start = stop
+    return out
+
+
 def AudioBackend():
     global __audiobackendInstance
     if __audiobackendInstance is None:
@@ -76,8 +101,6 @@ class __AudioBackend(QtCore.QObject):
 
         self.logger = logging.getLogger(__name__)
 
-        self.duo_input = False
-
         self.logger.info("Initializing audio backend")
 
         # look for devices
@@ -87,8 +110,9 @@ class __AudioBackend(QtCore.QObject):
         self.logger.info(f"Found {len(self.input_devices)} input devices and {len(self.output_devices)} output devices")
 
         self.device = None
-        self.first_channel = None
-        self.second_channel = None
+        # the device channels that are emitted, in order
+        self.channel_map = []
+        self.channel_index = slice(0, 0)
 
         self.stream = None
         self.ringBuffer = None
@@ -108,18 +132,17 @@ class __AudioBackend(QtCore.QObject):
                 self.logger.exception("Failed to open stream")
 
         if self.device is not None:
-            self.first_channel = 0
-            nchannels = self.get_current_device_nchannels()
-            if nchannels == 1:
-                self.second_channel = 0
-            else:
-                self.second_channel = 1
+            self.set_channel_map([0])
 
         # counter for the number of input buffer overflows
         self.xruns = 0
 
         self.chunk_number = 0
 
+        # destination of the fetched samples, reallocated when it is too small
+        self.sample_dtype = sample_dtype()
+        self.drain_buffer = np.empty((1, 4 * FRAMES_PER_BUFFER), dtype=self.sample_dtype)
+
         self.devices_with_timing_errors = []
 
         # throttle the "ringbuffer lagging behind" warning so a persistently
@@ -127,6 +150,7 @@ class __AudioBackend(QtCore.QObject):
         # not spam the log on every fetch cycle.
         self._last_lag_warning = 0.0
 
+    @analysis_locked
     def close(self):
         if self.stream is not None:
             self.stream.stop()
@@ -282,6 +306,7 @@ class __AudioBackend(QtCore.QObject):
     # method.
     # The index parameter is the index in the self.input_devices list of devices !
     # The return parameter is also an index in the same list.
+    @analysis_locked
     def select_input_device(self, index):
         device = self.input_devices[index]
 
@@ -319,26 +344,32 @@ class __AudioBackend(QtCore.QObject):
             if previous_stream is not None:
                 previous_stream.stop()
 
-            self.first_channel = 0
-            nchannels = self.device['max_input_channels']
-            if nchannels == 1:
-                self.second_channel = 0
-            else:
-                self.second_channel = 1
+            self.set_channel_map([0])
 
         return success, self.input_devices.index(self.device)
 
     # method
-    def select_first_channel(self, index):
-        self.first_channel = index
-        success = True
-        return success, self.first_channel
+    # The channel map lists the device channels to emit, in order: any
+    # non-empty subset of the input channels of the current device.
+    # The return parameter is the channel map in use.
+    @analysis_locked
+    def select_channels(self, channel_map):
+        channel_map = [int(channel) for channel in channel_map]
+        nchannels = self.get_current_device_nchannels()
 
-    # method
-    def select_second_channel(self, index):
-        self.second_channel = index
-        success = True
-        return success, self.second_channel
+        success = len(channel_map) > 0 \
+            and all(0 <= channel < nchannels for channel in channel_map)
+
+        if success:
+            self.set_channel_map(channel_map)
+        else:
+            self.logger.error("Invalid channel map %s for a device with %d channels", channel_map, nchannels)
+
+        return success, self.get_current_channel_map()
+
+    def set_channel_map(self, channel_map):
+        self.channel_map = list(channel_map)
+        self.channel_index = channel_index(self.channel_map)
 
     # method
     def open_stream(self, device):
@@ -439,12 +470,8 @@ class __AudioBackend(QtCore.QObject):
         return channels
 
     # method
-    def get_current_first_channel(self):
-        return self.first_channel
-
-    # method
-    def get_current_second_channel(self):
-        return self.second_channel
+    def get_current_channel_map(self):
+        return list(self.channel_map)
 
     # method
     def get_current_device_nchannels(self):
@@ -457,65 +484,66 @@ class __AudioBackend(QtCore.QObject):
         if self.action is None or self.ringBuffer is None:
             return
 
-        while self.ringBuffer.read_available >= FRAMES_PER_BUFFER:
-            read, buf1, buf2 = self.ringBuffer.get_read_buffers(FRAMES_PER_BUFFER)
-            assert read == FRAMES_PER_BUFFER
-
-            stream_time = self.get_stream_time()
-
-            buffer1 = frombuffer(buf1, dtype='float32')
-            buffer2 = frombuffer(buf2, dtype='float32')
-            buffer = concatenate((buffer1, buffer2)).astype(float64)
-            buffer.shape = -1, self.nchannels_max
-            self.ringBuffer.advance_read_index(FRAMES_PER_BUFFER)
-
-            # ideally we would use the exact time of the samples retrieved from the ring buffer,
-            # but rtmixer does not provide it
-            self.stream_read_index += read
-            stream_read_time = self.stream_start_time + self.stream_read_index / SAMPLING_RATE
-
-            # when starting a stream, it seems PortAudio gives us some data that is already in the buffer
-            # so the stream start time is actually older
-            # so we compensate here
-            if stream_read_time > stream_time and self.stream_read_index < 100000:
-                delta_seconds = stream_read_time - stream_time
-                self.stream_start_time -= delta_seconds
-
-            if stream_read_time < stream_time - 100 * FRAMES_PER_BUFFER / SAMPLING_RATE:
-                now = time.monotonic()
-                if now - self._last_lag_warning >= 5.0:
-                    self.logger.warning("Ringbuffer lagging behind: ringbuffer time = %f, stream time = %f", stream_read_time, stream_time)
-                    self._last_lag_warning = now
-
-            channel = self.get_current_first_channel()
-            if self.duo_input:
-                channel_2 = self.get_current_second_channel()
-
-            floatdata1 = buffer[:, channel]
-
-            if self.duo_input:
-                floatdata2 = buffer[:, channel_2]
-                floatdata = vstack((floatdata1, floatdata2))
-            else:
-                floatdata = floatdata1
-                floatdata.shape = (1, floatdata.size)
+        # drain everything that is available in one pass
+        available = self.ringBuffer.read_available
+        GetTimings().record_backlog(available)
+        if available < FRAMES_PER_BUFFER:
+            return
+
+        stream_time = self.get_stream_time()
+
+        with GetTimings().stage("audio fetch"):
+            read, buf1, buf2 = self.ringBuffer.get_read_buffers(available)
+            floatdata = self.deinterleave(read, buf1, buf2)
+            self.ringBuffer.advance_read_index(read)
+
+        # ideally we would use the exact time of the samples retrieved from the ring buffer,
+        # but rtmixer does not provide it
+        self.stream_read_index += read
+        stream_read_time = self.stream_start_time + self.stream_read_index / SAMPLING_RATE
+
+        # when starting a stream, it seems PortAudio gives us some data that is already in the buffer
+        # so the stream start time is actually older
+        # so we compensate here
+        if stream_read_time > stream_time and self.stream_read_index < 100000:
+            delta_seconds = stream_read_time - stream_time
+            self.stream_start_time -= delta_seconds
+
+        if stream_read_time < stream_time - 100 * FRAMES_PER_BUFFER / SAMPLING_RATE:
+            now = time.monotonic()
+            if now - self._last_lag_warning >= 5.0:
+                self.logger.warning("Ringbuffer lagging behind: ringbuffer time = %f, stream time = %f", stream_read_time, stream_time)
+                self._last_lag_warning = now
+
+        input_overflows = self.action.stats.input_overflows
+        input_overflow = input_overflows > self.xruns
+        if input_overflow:
+            self.xruns = input_overflows
+            self.logger.info("Stream overflow!")
+            self.underflow.emit()
+
+        self.new_data_available.emit(floatdata, stream_read_time, input_overflow)
+
+        self.chunk_number += 1
 
-            input_overflows = self.action.stats.input_overflows
-            input_overflow = input_overflows > self.xruns
-            if input_overflow:
-                self.xruns = input_overflows
-                self.logger.info("Stream overflow!")
-                self.underflow.emit()
+    def deinterleave(self, length, buf1, buf2):
+        """Copy the selected channels of the interleaved float32 ring buffer
+        regions to the preallocated drain buffer.
 
-            self.new_data_available.emit(floatdata, stream_read_time, input_overflow)
+        The returned (channels, length) array is a view of the drain buffer,
+        which is overwritten by the next fetch. Its rows follow the channel
+        map."""
+        channels = len(self.channel_map)
 
-            self.chunk_number += 1
+        if self.drain_buffer.shape[0] != channels \
+                or self.drain_buffer.shape[1] < length \
+                or self.drain_buffer.dtype != self.sample_dtype:
+            self.drain_buffer = np.empty((channels, max(length, 2 * self.drain_buffer.shape[1])), dtype=self.sample_dtype)
 
-    def set_single_input(self):
-        self.duo_input = False
+        floatdata = self.drain_buffer[:, :length]
 
-    def set_duo_input(self):
-        self.duo_input = True
+        # the two regions come from the wrap-around of the ring buffer
+        return deinterleave_regions(floatdata, (buf1, buf2), self.nchannels_max, self.channel_index)
 
     def get_stream_time(self) -> float:
         """The current stream time in seconds.
@@ -547,6 +575,7 @@ class __AudioBackend(QtCore.QObject):
         if self.stream is not None:
             self.stream.stop()
 
+    @analysis_locked
     def restart(self):
         if self.stream is not None:
             self.stream.start()
@@ -19,7 +19,7 @@
 
 from PyQt6 import QtCore
 import numpy as np
-from friture.ringbuffer import RingBuffer
+from friture.ringbuffer import FrameCursor, RingBuffer, RingBufferCursor
 
 FRAMES_PER_BUFFER = 1024
 
@@ -33,6 +33,8 @@ class AudioBuffer(QtCore.QObject):
         self.ringbuffer = RingBuffer()
         self.newpoints = 0
         self.lastDataTime = 0.
+        # the receivers of new_data_available read the data later, in another thread
+        self.queued_receivers = False
 
     def data(self, length):
         return self.ringbuffer.data(length)
@@ -41,14 +43,41 @@ class AudioBuffer(QtCore.QObject):
         return self.ringbuffer.data_older(length, delay_samples)
 
     def newdata(self):
-        return self.data(self.newpoints)
+        # a block longer than the buffer capacity has only been partly kept
+        return self.data(min(self.newpoints, self.ringbuffer.capacity))
+
+    def set_queued_receivers(self, queued: bool) -> None:
+        """Emit copies of the new data, for receivers that live in another
+        thread: the ring buffer can overwrite the samples before a queued
+        signal is delivered."""
+        self.queued_receivers = queued
 
     def set_newdata(self, newpoints):
         self.newpoints = newpoints
 
     def data_indexed(self, start, length):
         return self.ringbuffer.data_indexed(start, length)
-    
+
+    def data_frames(self, stop: int, length: int, hop: int, count: int) -> np.ndarray:
+        """'count' overlapping frames ending at 'stop', as a (channels, count, length) view."""
+        return self.ringbuffer.data_frames(stop, length, hop, count)
+
+    def reserve(self, length: int) -> None:
+        """Declare that the most recent 'length' samples will be read."""
+        self.ringbuffer.reserve(length)
+
+    def cursor(self, history: int = 0) -> RingBufferCursor:
+        """A new read position for a consumer that reads 'history' samples before it."""
+        return self.ringbuffer.cursor(history)
+
+    def frame_cursor(self, frame_length: int, hop: int) -> FrameCursor:
+        """A new reader of the overlapping frames, see FrameCursor.take()."""
+        return self.ringbuffer.frame_cursor(frame_length, hop)
+
+    def channels(self) -> int:
+        """The number of channels of the most recent data."""
+        return self.ringbuffer.buffer.shape[0]
+
     def data_time(self, start: int) -> float:
         """The stream time in seconds at the position defined by 'start'."""
         return self.ringbuffer.data_time(start)
@@ -56,5 +85,11 @@ class AudioBuffer(QtCore.QObject):
     def handle_new_data(self, floatdata: np.ndarray, input_time: float, status) -> None:
         self.ringbuffer.push(floatdata, input_time)
         self.set_newdata(floatdata.shape[1])
-        self.new_data_available.emit(floatdata)
+        # the data given by the audio backend is only valid until its next
+        # fetch, so emit the copy that now lives in the ring buffer, or a
+        # copy of it when the receivers may read it much later
+        newdata = self.newdata()
+        if self.queued_receivers:
+            newdata = newdata.copy()
+        self.new_data_available.emit(newdata)
         self.lastDataTime = input_time
@@ -21,14 +21,18 @@ import logging
 
 from numpy import linspace, log10, cos, arange, pi
 from numpy.fft import rfft
-from friture.audiobackend import SAMPLING_RATE
+from friture.audio_format import SAMPLING_RATE
+from friture.precision import sample_dtype
 
 
 class audioproc():
 
-    def __init__(self):
+    def __init__(self, dtype=None):
         self.logger = logging.getLogger(__name__)
 
+        # floating-point type of the window, and so of the spectra
+        self.dtype = sample_dtype() if dtype is None else dtype
+
         self.freq = linspace(0, SAMPLING_RATE / 2, 10)
         self.A = 0. * self.freq
         self.B = 0. * self.freq
@@ -46,6 +50,15 @@ class audioproc():
 
         return spectrum
 
+    def analyze_frames(self, frames):
+        # batched version of analyzelive: the frames are stacked along the
+        # leading axes, so that a single windowing multiply and a single FFT
+        # call process all of them (the last axis holds the samples)
+        fft = rfft(frames * self.window, axis=-1)
+        spectrum = self.norm_square(fft)
+
+        return spectrum
+
     def norm_square(self, fft):
         return (fft*fft.conjugate()).real / self.size_sq
 
@@ -77,7 +90,7 @@ class audioproc():
         N = self.fft_size
         n = arange(0, N)
         # Hann window : better frequency resolution than the rectangular window
-        self.window = 0.5 * (1. - cos(2 * pi * n / (N - 1)))
+        self.window = (0.5 * (1. - cos(2 * pi * n / (N - 1)))).astype(self.dtype)
         self.logger.info("audioproc: updating window")
 
     def update_freq_cache(self):
@@ -20,19 +20,18 @@
 from PyQt6 import QtCore
 from PyQt6.QtCore import pyqtProperty  # type: ignore
 
-PEAK_DECAY_RATE = (1.0 - 3E-6/500.)
-# Number of cycles the peak stays on hold before fall-off.
-PEAK_FALLOFF = 32
-
 class BallisticPeak(QtCore.QObject):
+    """The ballistic peak of a meter, on the IEC scale.
+
+    The peak-hold-then-decay mechanism is computed for all the channels
+    at once by friture.signal.level_meter.LevelMeter."""
+
     peak_changed = QtCore.pyqtSignal(float)
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self._peak_iec = 0
-        self._peak_hold_counter = 0
-        self._peak_decay_factor = PEAK_DECAY_RATE
 
     @pyqtProperty(float, notify=peak_changed)
     def peak_iec(self):
@@ -40,27 +39,6 @@ class BallisticPeak(QtCore.QObject):
 
     @peak_iec.setter # type: ignore
     def peak_iec(self, peak_iec):
-
-        # peak-hold-then-decay mechanism
-        if peak_iec > self._peak_iec:
-            # follow the peak
-            new_peak_iec = peak_iec
-            self._peak_hold_counter = 0  # reset the hold
-            self._peak_decay_factor = PEAK_DECAY_RATE
-        elif self._peak_hold_counter + 1 <= PEAK_FALLOFF:
-            # hold
-            new_peak_iec = self._peak_iec
-            self._peak_hold_counter += 1
-        else:
-            # decay
-            new_peak_iec = self._peak_decay_factor * float(self._peak_iec)
-            if new_peak_iec < peak_iec:
-                new_peak_iec = peak_iec
-                self._peak_hold_counter = 0  # reset the hold
-                self._peak_decay_factor = PEAK_DECAY_RATE
-            else:
-                self._peak_decay_factor *= self._peak_decay_factor
-
-        if self._peak_iec != new_peak_iec:
-            self._peak_iec = new_peak_iec
-            self.peak_changed.emit(new_peak_iec)
+        if self._peak_iec != peak_iec:
+            self._peak_iec = peak_iec
+            self.peak_changed.emit(peak_iec)
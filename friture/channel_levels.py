@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+from PyQt6 import QtCore
+from PyQt6.QtCore import QObject, pyqtProperty  # type: ignore
+
+from friture.ballistic_peak import BallisticPeak
+from friture.level_data import LevelData
+
+class ChannelLevels(QtCore.QObject):
+    """The levels of one input channel: the live ones, the slower ones for
+    the text labels, and the ballistic peak of the meter."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._level_data = LevelData(self)
+        self._level_data_slow = LevelData(self)
+        self._level_data_ballistic = BallisticPeak(self)
+
+    @pyqtProperty(QObject, constant = True) # type: ignore
+    def level_data(self):
+        return self._level_data
+
+    @pyqtProperty(QObject, constant = True) # type: ignore
+    def level_data_slow(self):
+        return self._level_data_slow
+
+    @pyqtProperty(QObject, constant = True) # type: ignore
+    def level_data_ballistic(self):
+        return self._level_data_ballistic
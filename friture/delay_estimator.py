@@ -25,8 +25,8 @@ from friture import generated_filters
 from friture.delay_estimator_view_model import Delay_Estimator_View_Model
 from .audiobackend import SAMPLING_RATE
 from .ringbuffer import RingBuffer
-from .signal.decimate import decimate_multiple, decimate_multiple_filtic
-from .signal.correlation import generalized_cross_correlation
+from .signal.decimate import Decimator
+from .signal.correlation import Accumulating_GCC_PHAT
 
 DEFAULT_DELAYRANGE = 1  # default delay range is 1 second
 
@@ -55,18 +55,22 @@ class Delay_Estimator_Widget(QObject):
         [self.bdec, self.adec] = generated_filters.PARAMS['dec']
         self.bdec = numpy.array(self.bdec)
         self.adec = numpy.array(self.adec)
-        self.zfs0 = decimate_multiple_filtic(self.Ndec, self.bdec, self.adec)
-        self.zfs1 = decimate_multiple_filtic(self.Ndec, self.bdec, self.adec)
+        self.decimator0 = Decimator(self.Ndec, self.bdec, self.adec)
+        self.decimator1 = Decimator(self.Ndec, self.bdec, self.adec)
 
-        # ringbuffers for the subsampled data
-        self.ringbuffer0 = RingBuffer()
-        self.ringbuffer1 = RingBuffer()
+        # ringbuffer for the subsampled data of the two channels
+        self.ringbuffer = RingBuffer()
 
         self.delayrange_s = DEFAULT_DELAYRANGE  # confidence range
 
-        self.old_Xcorr = None
+        # cross-spectrum smoothed over the frames, turned into a delay
+        # estimate once per display update
+        self.gcc_phat = Accumulating_GCC_PHAT()
+        self.estimate_pending = False
 
-        self.old_index = 0
+        # half-overlapped frames of the subsampled data
+        self.frame_cursor = self.ringbuffer.frame_cursor(*self.frame_size())
+        self.reserve_history()
 
         self.two_channels = False
         self.delay_ms = 0.
@@ -94,90 +98,52 @@ class Delay_Estimator_Widget(QObject):
             x0 = floatdata[0, :]
             x1 = floatdata[1, :]
             # subsample them
-            x0_dec, self.zfs0 = decimate_multiple(self.Ndec, self.bdec, self.adec, x0, self.zfs0)
-            x1_dec, self.zfs1 = decimate_multiple(self.Ndec, self.bdec, self.adec, x1, self.zfs1)
-            # push to a 1-second ring buffer
-            x0_dec.shape = (1, x0_dec.size)
-            x1_dec.shape = (1, x1_dec.size)
-            self.ringbuffer0.push(x0_dec, 0)
-            self.ringbuffer1.push(x1_dec, 0)
-
-            # we need to maintain an index of where we are in the buffer
-            index = self.ringbuffer0.offset
-            available = index - self.old_index
-
-            if available < 0:
-                # ringbuffer must have grown or something...
-                available = 0
-                self.old_index = index
-
-            time = 2 * self.delayrange_s
-            length = time * self.subsampled_sampling_rate
-            overlap = 0.5
-            needed = int(overlap * length)
-
-            realizable = int(available / needed)
-
-            for i in range(realizable):
-                self.old_index += needed
-
-                # retrieve data
-                d0 = self.ringbuffer0.data_indexed(self.old_index, int(length))
-                d1 = self.ringbuffer1.data_indexed(self.old_index, int(length))
-                d0.shape = (d0.size)
-                d1.shape = (d1.size)
-                std0 = numpy.std(d0)
-                std1 = numpy.std(d1)
-                if std0 > 0. and std1 > 0.:
-                    Xcorr = generalized_cross_correlation(d0, d1)
-
-                    if self.old_Xcorr is not None and self.old_Xcorr.shape == Xcorr.shape:
-                        # smoothing
-                        alpha = 0.3
-                        smoothed_Xcorr = alpha * Xcorr + (1. - alpha) * self.old_Xcorr
-                    else:
-                        smoothed_Xcorr = Xcorr
-
-                    absXcorr = numpy.abs(smoothed_Xcorr)
-                    i = numpy.argmax(absXcorr)
-
-                    # normalize
-                    # Xcorr_max_norm = Xcorr_unweighted[i]/(d0.size*std0*std1)
-                    self.Xcorr_extremum = smoothed_Xcorr[i]
-                    Xcorr_max_norm = abs(smoothed_Xcorr[i]) / (3 * numpy.std(smoothed_Xcorr))
-                    self.delay_ms = 1e3 * float(i) / self.subsampled_sampling_rate
-
-                    # delays larger than the half of the window most likely are actually negative
-                    if self.delay_ms > 1e3 * time / 2.:
-                        self.delay_ms -= 1e3 * time
-
-                    # numpy.save("Xcorr_%d_%.1f.npy" %(i,delay_ms), Xcorr)
-                    # numpy.save("smoothed_Xcorr%d_%.1f.npy" %(i,delay_ms), smoothed_Xcorr)
-
-                    # store for smoothing
-                    self.old_Xcorr = smoothed_Xcorr
-                else:
-                    self.delay_ms = 0.
-                    Xcorr_max_norm = 0.
-                    self.Xcorr_extremum = 0.
-
-                # debug wrong phase detection
-                # if Xcorr[i] < 0.:
-                #    numpy.save("Xcorr.npy", Xcorr)
-
-                c = 340.  # speed of sound, in meters per second (approximate)
-                self.distance_m = self.delay_ms * 1e-3 * c
-
-                # home-made measure of the significance
-                slope = 0.12
-                p = 3
-                x = (Xcorr_max_norm > 1.) * (Xcorr_max_norm - 1.)
-                x = (slope * x) ** p
-                self.correlation = int((x / (1. + x)) * 100)
+            x0_dec = self.decimator0.push(x0)
+            x1_dec = self.decimator1.push(x1)
+            # push to the ring buffer
+            self.ringbuffer.push(numpy.vstack((x0_dec, x1_dec)), 0)
+
+            # accumulate the cross-spectra of all the new frames at once
+            block = self.frame_cursor.take()
+            if block.frame_count > 0:
+                self.gcc_phat.push(block.frames[:, 0, :], block.frames[:, 1, :])
+                self.estimate_pending = True
+
+    # method, called before the analysis when the dock is shown again
+    def resync(self):
+        # the data pushed while the dock was hidden is not analyzed: the next
+        # frames start after it, with fresh decimation filters
+        self.decimator0.reset()
+        self.decimator1.reset()
+        self.frame_cursor.reset()
+
+    def update_estimate(self):
+        lag, self.Xcorr_extremum, Xcorr_max_norm = self.gcc_phat.estimate()
+
+        if not self.gcc_phat.last_frame_valid:
+            lag = 0.
+            Xcorr_max_norm = 0.
+            self.Xcorr_extremum = 0.
+
+        self.delay_ms = 1e3 * lag / self.subsampled_sampling_rate
+
+        c = 340.  # speed of sound, in meters per second (approximate)
+        self.distance_m = self.delay_ms * 1e-3 * c
+
+        # home-made measure of the significance
+        slope = 0.12
+        p = 3
+        x = (Xcorr_max_norm > 1.) * (Xcorr_max_norm - 1.)
+        x = (slope * x) ** p
+        self.correlation = int((x / (1. + x)) * 100)
 
     # method
     def canvasUpdate(self):
         if self.two_channels:
+            if self.estimate_pending:
+                self.update_estimate()
+                self.estimate_pending = False
+
             self._view_model.delay = "%.1f ms\n= %.2f m" % (self.delay_ms, self.distance_m)
             self._view_model.correlation = "%d%%" % (self.correlation)
             if self.Xcorr_extremum >= 0:
@@ -196,6 +162,18 @@ in the setup window."""
 
     def set_delayrange(self, delay_s):
         self.delayrange_s = delay_s
+        self.reserve_history()
+
+    def frame_size(self):
+        # the cross-correlation windows span twice the delay range,
+        # and are half-overlapped
+        length = int(2 * self.delayrange_s * self.subsampled_sampling_rate)
+        return length, max(length // 2, 1)
+
+    def reserve_history(self):
+        length, hop = self.frame_size()
+        self.ringbuffer.reserve(length)
+        self.frame_cursor.configure(length, hop)
 
     # slot
     def settings_called(self, checked):
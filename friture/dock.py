@@ -27,10 +27,14 @@ from PyQt6.QtCore import QObject, QSettings
 from friture.qml_tools import component_raise_if_error, qml_url
 from friture.widgetdict import getWidgetById, widgetIds
 from friture.controlbar_viewmodel import ControlBarViewModel
+from friture.analysis_worker import ResultQueue
+from friture.frame_scheduler import GetFrameScheduler
+from friture.timings import GetTimings
 
 from typing import Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from friture.analyzer import Friture
+    from friture.analysis_worker import AnalysisWorker
     from friture.dockmanager import DockManager
     from PyQt6.QtQml import QQmlEngine
 
@@ -48,6 +52,9 @@ class Dock(QObject):
 
         self.dockmanager: 'DockManager' = parent.dockmanager
         self.audiobuffer = parent.audiobuffer
+        self.analysis_worker: Optional['AnalysisWorker'] = parent.analysis_worker
+        # results of the worker thread analysis, None when the widget is analyzed on the GUI thread
+        self.analysis_results: Optional[ResultQueue] = None
 
         self.setObjectName(name)
 
@@ -92,6 +99,17 @@ class Dock(QObject):
         self.widgetId: Optional[int] = None
         self.audiowidget: Optional[QObject] = None
         self.audio_widget_qml: Optional[QQuickItem] = None
+        # whether the widget analyzes the new data on the GUI thread
+        self.receives_new_data = False
+        # whether the widget is analyzed on the GUI thread, when the dock is updated
+        self.analyzed_on_update = False
+        # names of the timed stages of the widget
+        self.analysis_stage = ""
+        self.drawing_stage = ""
+        # the widget is analyzed and drawn only while the dock is shown
+        self.shown = True
+        # whether the widget has to skip the data pushed while the dock was hidden
+        self.resync_pending = False
 
         if widgetId is None:
             widgetId = widgetIds()[0]
@@ -102,6 +120,10 @@ class Dock(QObject):
         self.dockmanager.close_dock(self)
 
     def cleanup(self):
+        self.detach_from_worker()
+        self.detach_from_buffer()
+        GetFrameScheduler().remove_client(self)
+
         if self.dock_qml is not None:
             self.dock_qml.setParentItem(None) # type: ignore
             self.dock_qml.deleteLater()
@@ -141,6 +163,9 @@ class Dock(QObject):
             self.audio_widget_qml.deleteLater()
             self.audio_widget_qml = None
 
+        self.detach_from_worker()
+        self.detach_from_buffer()
+
         if self.audiowidget is not None:
             settings = QSettings()
             self.audiowidget.saveState(settings) # type: ignore
@@ -155,9 +180,14 @@ class Dock(QObject):
             widgetId = widgetIds()[0]
 
         self.widgetId = widgetId
+        # the new widget has not missed any data
+        self.resync_pending = False
 
         widget_descriptor = getWidgetById(widgetId)
 
+        self.analysis_stage = "%s (%s): analysis" % (self.objectName(), widget_descriptor["Name"])
+        self.drawing_stage = "%s (%s): drawing" % (self.objectName(), widget_descriptor["Name"])
+
         constructor = widget_descriptor["Class"]
         if len(signature(constructor).parameters) == 2:
             self.audiowidget = constructor(self, self.qml_engine)
@@ -168,12 +198,27 @@ class Dock(QObject):
         fixed_font = QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont).family()
 
         self.audiowidget.set_buffer(self.audiobuffer) # type: ignore
-        self.audiobuffer.new_data_available.connect(
-            self.audiowidget.handle_new_data) # type: ignore
+        self.analyzed_on_update = False
+        if hasattr(self.audiowidget, 'analyze'):
+            if self.analysis_worker is not None:
+                # the results that cannot be merged are dropped when the GUI thread lags behind
+                merge = self.audiowidget.merge_results if hasattr(self.audiowidget, 'merge_results') else None # type: ignore
+                self.analysis_results = ResultQueue(merge=merge)
+                self.analysis_worker.add_client(self)
+            else:
+                # the new frames are kept in the buffer until the dock is updated
+                self.analyzed_on_update = True
+        else:
+            self.audiobuffer.new_data_available.connect(self.handle_new_data)
+            self.receives_new_data = True
         if widgetId in self.dockmanager.last_settings:
             self.audiowidget.restoreState( # type: ignore
                 self.dockmanager.last_settings[widgetId])
 
+        GetFrameScheduler().add_client(
+            self, widget_descriptor["UpdateRate"], "%s (%s)" % (self.objectName(), widget_descriptor["Name"]))
+        self.set_overlap(GetFrameScheduler().overlap)
+
         component = QQmlComponent(self.qml_engine)
         component.loadUrl(qml_url(self.audiowidget.qml_file_name())) # type: ignore
 
@@ -196,10 +241,81 @@ class Dock(QObject):
             for error in self.audio_widget_qml.errors():
                 self.logger.error("QML error: " + error.toString())
 
+    # slot, when the widget is analyzed on the GUI thread
+    def handle_new_data(self, floatdata):
+        if not self.shown:
+            return
+        with GetTimings().stage(self.analysis_stage):
+            self.resync()
+            self.audiowidget.handle_new_data(floatdata) # type: ignore
+
+    # method, called in the worker thread
+    def analyze(self):
+        if not self.shown:
+            return
+        with GetTimings().stage(self.analysis_stage):
+            self.resync()
+            result = self.audiowidget.analyze() # type: ignore
+        if result is not None:
+            self.analysis_results.put(result) # type: ignore
+
+    # method, called on each display tick
+    def set_shown(self, shown):
+        if shown and not self.shown:
+            # the widget catches up before its next analysis, on the thread
+            # where it is analyzed
+            self.resync_pending = True
+        self.shown = shown
+
+    def tile_shown(self):
+        # the tile of the dock collapses when the window is too small for the layout
+        return (self.dock_qml is not None and self.dock_qml.isVisible() # type: ignore
+                and self.dock_qml.width() > 0 and self.dock_qml.height() > 0) # type: ignore
+
+    def resync(self):
+        if self.resync_pending:
+            self.resync_pending = False
+            # the widgets that read the latest data, or whose state is
+            # still valid after a gap, have nothing to catch up
+            if hasattr(self.audiowidget, 'resync'):
+                self.audiowidget.resync() # type: ignore
+
+    def detach_from_buffer(self):
+        if self.receives_new_data:
+            self.audiobuffer.new_data_available.disconnect(self.handle_new_data)
+            self.receives_new_data = False
+
+    def detach_from_worker(self):
+        if self.analysis_results is not None:
+            # after this, analyze() is not called anymore
+            self.analysis_worker.remove_client(self) # type: ignore
+            self.analysis_results = None
+
+    # method, called when the frame scheduler updates the dock
     def canvasUpdate(self):
-        if self.audiowidget is not None:
+        if self.audiowidget is None:
+            return
+
+        results = []
+        if self.analysis_results is not None:
+            results = self.analysis_results.drain()
+        elif self.analyzed_on_update:
+            # all the frames since the previous update are analyzed at once
+            with GetTimings().stage(self.analysis_stage):
+                self.resync()
+                result = self.audiowidget.analyze() # type: ignore
+            if result is not None:
+                results = [result]
+
+        with GetTimings().stage(self.drawing_stage):
+            for result in results:
+                self.audiowidget.present(result) # type: ignore
             self.audiowidget.canvasUpdate()
 
+    # method, called by the frame scheduler when the overlap of the STFT frames changes
+    def set_overlap(self, overlap):
+        if hasattr(self.audiowidget, 'setoverlap'):
+            self.audiowidget.setoverlap(overlap) # type: ignore
 
     def pause(self):
         if self.audiowidget is not None:
@@ -18,11 +18,13 @@
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import time
 
 from PyQt6 import QtCore
 from PyQt6.QtWidgets import QMainWindow
 from friture.defaults import DEFAULT_DOCKS
 from friture.dock import Dock
+from friture.frame_scheduler import GetFrameScheduler
 from friture.tilelayout import TileLayout
 
 from typing import Dict, List, Optional, TYPE_CHECKING
@@ -141,9 +143,19 @@ class DockManager(QtCore.QObject):
         settings.endGroup()
 
     def canvasUpdate(self):
-        if self._parent.isVisible():
-            for dock in self.docks:
+        # the docks are analyzed and drawn only while they are shown: not when
+        # the window is minimized (or covered, on some platforms), nor when
+        # their tile is collapsed
+        window_shown = self._parent.isVisible() and self._parent.quick_view.isExposed()
+        scheduler = GetFrameScheduler()
+        now = time.perf_counter()
+        for dock in self.docks:
+            dock.set_shown(window_shown and dock.tile_shown())
+            # each dock is updated at its own rate
+            if dock.shown and scheduler.due(dock, now):
+                start = time.perf_counter()
                 dock.canvasUpdate()
+                scheduler.record_cost(dock, time.perf_counter() - start)
 
     def pause(self):
         for dock in self.docks:
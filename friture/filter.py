@@ -149,6 +149,10 @@ def octave_filter_bank_decimation_fft(
     via element-wise addition (not concatenation), keeping the pending
     buffer at a fixed fir_length-1 entries.
 
+    The input can be a single signal or a (channels, samples) block: the
+    leading axes are carried through every stage, so that the FFTs of all
+    the channels are computed in one call per stage.
+
     Parameters
     ----------
     boct : list of 1D arrays
@@ -163,18 +167,18 @@ def octave_filter_bank_decimation_fft(
         FFT size for each FFT stage.
     fir_length : int
         Length of the minphase FIR filters.
-    x : 1D array
-        Input signal.
-    overlaps_oct : list of 2D arrays
+    x : array, shape (..., samples)
+        Input signal, 1D or one row per channel.
+    overlaps_oct : list of arrays
         Overlap buffers for octave filters at each stage.
-        Each has shape (bands_per_octave, fir_length-1).
-    overlaps_dec : list of 1D arrays
+        Each has shape (..., bands_per_octave, fir_length-1).
+    overlaps_dec : list of arrays
         Overlap buffers for decimation filter at each stage.
-        Each has length fir_length-1.
+        Each has shape (..., fir_length-1).
 
     Returns
     -------
-    y : list of 1D arrays
+    y : list of arrays, shape (..., samples / dec)
         Filtered outputs, one per band (total NOCTAVE * bands_per_octave).
     dec : list of int
         Decimation factor for each band.
@@ -193,60 +197,238 @@ def octave_filter_bank_decimation_fft(
     Lm1 = L - 1
 
     for j in range(NOCTAVE):
-        N_s = len(x_dec)
+        N_s = x_dec.shape[-1]
         dec_val = 2 ** j
 
         # --- FFT overlap-add stage ---
         fft_size = fft_sizes[j]
-        n_freq = fft_size // 2 + 1
         H_oct = fft_H_oct[j]
         H_dec = fft_H_dec[j]
 
-        # Shared input FFT
-        X = np.fft.rfft(x_dec, fft_size)
+        # Shared input FFT, (..., n_freq)
+        X = np.fft.rfft(x_dec, fft_size, axis=-1)
 
         # Octave bandpass filters (batched multiply + irfft)
-        Y_oct = X[np.newaxis, :] * H_oct          # (bpo, n_freq)
-        y_oct_full = np.fft.irfft(Y_oct, fft_size, axis=1)  # (bpo, fft_size)
+        Y_oct = X[..., np.newaxis, :] * H_oct      # (..., bpo, n_freq)
+        y_oct_full = np.fft.irfft(Y_oct, fft_size, axis=-1)  # (..., bpo, fft_size)
 
         # Add pending overlap from previous block (element-wise)
         pending = overlaps_oct[j]
-        add_len = min(pending.shape[1], N_s)
+        add_len = min(pending.shape[-1], N_s)
         if add_len > 0:
-            y_oct_full[:, :add_len] += pending[:, :add_len]
+            y_oct_full[..., :add_len] += pending[..., :add_len]
 
         # Decimation filter (FFT) — uses the same X
         Y_dec = X * H_dec
-        y_dec_full = np.fft.irfft(Y_dec, fft_size)
+        y_dec_full = np.fft.irfft(Y_dec, fft_size, axis=-1)
         pending_d = overlaps_dec[j]
-        add_len_d = min(len(pending_d), N_s)
+        add_len_d = min(pending_d.shape[-1], N_s)
         if add_len_d > 0:
-            y_dec_full[:add_len_d] += pending_d[:add_len_d]
+            y_dec_full[..., :add_len_d] += pending_d[..., :add_len_d]
 
         # Assign outputs in reverse order (filter bpo-1 → position k, ..., filter 0 → position k-bpo+1)
         for i in range(bands_per_octave)[::-1]:
-            y[k] = y_oct_full[i, :N_s]
+            y[k] = y_oct_full[..., i, :N_s]
             dec[k] = dec_val
             k -= 1
 
-        x_dec = y_dec_full[:N_s:2]
+        x_dec = y_dec_full[..., :N_s:2]
 
         # Update pending buffers via element-wise addition of overlapping tails.
-        new_tail = y_oct_full[:, N_s:N_s + Lm1]
-        old_remaining = pending[:, add_len:]
-        if old_remaining.shape[1] > 0:
-            new_tail[:, :old_remaining.shape[1]] += old_remaining
+        new_tail = y_oct_full[..., N_s:N_s + Lm1]
+        old_remaining = pending[..., add_len:]
+        if old_remaining.shape[-1] > 0:
+            new_tail[..., :old_remaining.shape[-1]] += old_remaining
         overlaps_oct[j] = new_tail.copy()
 
-        new_tail_d = y_dec_full[N_s:N_s + Lm1]
-        old_remaining_d = pending_d[add_len_d:]
-        if len(old_remaining_d) > 0:
-            new_tail_d[:len(old_remaining_d)] += old_remaining_d
+        new_tail_d = y_dec_full[..., N_s:N_s + Lm1]
+        old_remaining_d = pending_d[..., add_len_d:]
+        if old_remaining_d.shape[-1] > 0:
+            new_tail_d[..., :old_remaining_d.shape[-1]] += old_remaining_d
         overlaps_dec[j] = new_tail_d.copy()
 
     return y, dec, overlaps_oct, overlaps_dec
 
 
+class OctaveFilterBank:
+    """Stateful all-FFT octave filter bank with decimation.
+
+    Same overlap-add scheme as octave_filter_bank_decimation_fft, planned
+    once for a block capacity and a channel layout: the FFT sizes, the
+    frequency responses and the workspaces of every stage are allocated at
+    planning time, and the per-block processing only writes into them with
+    ``out=`` arguments. The pending overlap tails live in fixed ring arrays.
+
+    The workspaces are time-major, (time, ..., bands): the overlap-add
+    slices are then contiguous, and the frequency responses are tiled to
+    the full workspace shape, so that no ufunc needs to broadcast. Both
+    would otherwise make numpy allocate iteration buffers on every call.
+
+    The bank is re-planned when a block is longer than the capacity (which
+    then grows to the next power of two) or when the channel layout
+    changes, and set_filters re-plans for new bands-per-octave filters.
+    The overlap state is kept across a change of capacity.
+
+    The decimation phase is carried from block to block, so that blocks of
+    any length give the same output as a single long block.
+    """
+
+    MIN_CAPACITY = 1024
+
+    def __init__(self, boct_fir, bdec_fir):
+        self.capacity = 0
+        self.channels_shape = None
+        self.set_filters(boct_fir, bdec_fir)
+
+    def set_filters(self, boct_fir, bdec_fir):
+        """Set the minimum-phase FIR approximations of the band filters,
+        (bands_per_octave, fir_length), and of the decimation filter."""
+        self.boct_fir = np.asarray(boct_fir, dtype=np.float64)
+        self.bdec_fir = np.asarray(bdec_fir, dtype=np.float64)
+        self.bands_per_octave = self.boct_fir.shape[0]
+        self.fir_length = self.boct_fir.shape[1]
+
+        if self.channels_shape is not None:
+            self._plan(self.capacity, self.channels_shape)
+
+    def decs(self):
+        """Decimation factor of each stage."""
+        return [2 ** j for j in range(NOCTAVE)]
+
+    def reset(self):
+        for overlap in self._overlaps_oct + self._overlaps_dec:
+            overlap[...] = 0.
+        self._heads = [0] * NOCTAVE
+        self._phases = [0] * NOCTAVE
+
+    def _plan(self, capacity, channels_shape):
+        Lm1 = self.fir_length - 1
+        bands_shape = channels_shape + (self.bands_per_octave,)
+
+        if channels_shape != self.channels_shape or self._overlaps_oct[0].shape != (Lm1,) + bands_shape:
+            self._overlaps_oct = [np.zeros((Lm1,) + bands_shape) for _ in range(NOCTAVE)]
+            self._overlaps_dec = [np.zeros((Lm1,) + channels_shape) for _ in range(NOCTAVE)]
+            self.channels_shape = channels_shape
+            self.reset()
+
+        self.capacity = capacity
+        self._input = np.zeros((capacity,) + channels_shape)
+
+        # from (time, ..., bands) to (..., bands, time)
+        self._output_axes = tuple(range(1, len(bands_shape) + 1)) + (0,)
+
+        self._fft_sizes = []
+        self._H_oct = []
+        self._H_dec = []
+        self._X = []
+        self._Y_oct = []
+        self._y_oct = []
+        self._Y_dec = []
+        self._y_dec = []
+
+        for j in range(NOCTAVE):
+            # the longest input of the stage, after j decimations
+            fft_size = _next_composite_size(-(-capacity // 2 ** j) + Lm1)
+            n_freq = fft_size // 2 + 1
+            self._fft_sizes.append(fft_size)
+
+            H_oct = np.fft.rfft(self.boct_fir, fft_size, axis=-1).T
+            self._H_oct.append(np.ascontiguousarray(np.broadcast_to(
+                H_oct.reshape((n_freq,) + (1,) * len(channels_shape) + (self.bands_per_octave,)),
+                (n_freq,) + bands_shape)))
+            self._X.append(np.zeros((n_freq,) + channels_shape, dtype=np.complex128))
+            self._Y_oct.append(np.zeros((n_freq,) + bands_shape, dtype=np.complex128))
+            self._y_oct.append(np.zeros((fft_size,) + bands_shape))
+
+            # the output of the last decimation would not be used
+            if j < NOCTAVE - 1:
+                H_dec = np.fft.rfft(self.bdec_fir, fft_size)
+                self._H_dec.append(np.ascontiguousarray(np.broadcast_to(
+                    H_dec.reshape((n_freq,) + (1,) * len(channels_shape)),
+                    (n_freq,) + channels_shape)))
+                self._Y_dec.append(np.zeros((n_freq,) + channels_shape, dtype=np.complex128))
+                self._y_dec.append(np.zeros((fft_size,) + channels_shape))
+
+        self._outputs = [None] * NOCTAVE
+
+    def filter(self, x):
+        """Filter a block of samples, 1D or (channels, samples).
+
+        Returns
+        -------
+        list of arrays, shape (..., bands_per_octave, samples / dec)
+            The band outputs of each stage, from the highest octave to the
+            lowest one. They are views of the workspaces of the bank,
+            overwritten by the next call.
+        """
+        N = x.shape[-1]
+        if N > self.capacity or x.shape[:-1] != self.channels_shape:
+            capacity = max(self.capacity, self.MIN_CAPACITY)
+            while capacity < N:
+                capacity *= 2
+            self._plan(capacity, x.shape[:-1])
+
+        Lm1 = self.fir_length - 1
+
+        # the bank works in double precision, whatever the input type
+        x_dec = self._input[:N]
+        np.copyto(x_dec, x.T)
+
+        for j in range(NOCTAVE):
+            N_s = x_dec.shape[0]
+            fft_size = self._fft_sizes[j]
+            X = self._X[j]
+
+            # Shared input FFT
+            np.fft.rfft(x_dec, fft_size, axis=0, out=X)
+
+            # Octave bandpass filters (batched multiply + irfft)
+            Y_oct = self._Y_oct[j]
+            y_oct = self._y_oct[j]
+            np.copyto(Y_oct, X[..., np.newaxis])
+            np.multiply(Y_oct, self._H_oct[j], out=Y_oct)
+            np.fft.irfft(Y_oct, fft_size, axis=0, out=y_oct)
+            self._overlap_add(self._overlaps_oct[j], self._heads[j], y_oct, N_s)
+
+            if j < NOCTAVE - 1:
+                # Decimation filter (FFT) — uses the same X
+                Y_dec = self._Y_dec[j]
+                y_dec = self._y_dec[j]
+                np.multiply(X, self._H_dec[j], out=Y_dec)
+                np.fft.irfft(Y_dec, fft_size, axis=0, out=y_dec)
+                self._overlap_add(self._overlaps_dec[j], self._heads[j], y_dec, N_s)
+
+                phase = self._phases[j]
+                x_dec = y_dec[phase:N_s:2]
+                self._phases[j] = (phase - N_s) % 2
+
+            self._heads[j] = (self._heads[j] + min(Lm1, N_s)) % Lm1
+            self._outputs[j] = y_oct[:N_s].transpose(self._output_axes)
+
+        return self._outputs
+
+    @staticmethod
+    def _overlap_add(ring, head, y_full, N_s):
+        """Add the pending overlap to the first samples of y_full, and
+        accumulate its tail in the ring, whose logical start is head and
+        moves by the number of samples consumed."""
+        Lm1 = ring.shape[0]
+        consumed = min(Lm1, N_s)
+
+        # the pending samples that this block completes, in up to two segments
+        first = min(consumed, Lm1 - head)
+        y_full[:first] += ring[head:head + first]
+        y_full[first:consumed] += ring[:consumed - first]
+        ring[head:head + first] = 0.
+        ring[:consumed - first] = 0.
+
+        # the tail of the block overlaps the next ones
+        head = (head + consumed) % Lm1
+        first = Lm1 - head
+        ring[head:] += y_full[N_s:N_s + first]
+        ring[:head] += y_full[N_s + first:N_s + Lm1]
+
+
 def _next_composite_size(n):
     """Find the smallest FFT size >= n that numpy can compute efficiently.
 
@@ -20,7 +20,7 @@ from friture.filter import (octave_frequencies, octave_filter_bank,
                             octave_filter_bank_decimation, NOCTAVE,
                             _next_composite_size)
 from friture.signal.lfilter import iir_to_minphase_fir
-from friture.audiobackend import SAMPLING_RATE
+from friture.audio_format import SAMPLING_RATE
 
 # bank of filters for any other kind of frequency scale
 # http://cobweb.ecn.purdue.edu/~malcolm/apple/tr35/PattersonsEar.pdf
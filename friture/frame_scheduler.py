@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Scheduling of the dock updates on the display timer ticks.
+
+The display timer ticks at a fixed period, the tick budget. On each tick,
+the audio data is drained first, then the docks that are due are updated:
+their results are presented and they are drawn. Each widget declares the
+update rate it prefers (the scope or the spectrum want every tick, a
+long-time levels plot only a few per second), and the duration of each
+update, its cost, is measured.
+
+When the ticks overrun their budget under a sustained load, the scheduler
+degrades gracefully, one step at a time: it first halves the update rate
+of the dock that takes the largest share of the time, down to
+MIN_UPDATE_RATE, then it coarsens the overlap of the STFT frames, which
+reduces the number of frames to analyze. When the ticks are well within
+their budget again, the steps are undone in the reverse order. The audio
+draining is never skipped, so that the input ring buffer does not
+overflow.
+
+The scheduler is used from the GUI thread only.
+"""
+
+import logging
+from fractions import Fraction
+
+# the docks are not updated less often than this, in Hz. The frames that
+# are analyzed at the update rate must stay in the ring buffer in between
+MIN_UPDATE_RATE = 10.
+
+# overlap of the STFT frames, from the finest to the coarsest. A Hann
+# window still sums to a constant with half-overlapped frames
+OVERLAPS = (Fraction(3, 4), Fraction(1, 2))
+
+# the ticks are checked by windows of this many ticks
+WINDOW_TICKS = 50
+# overruns in a window that trigger a degradation step, when the ticks also
+# use this share of the budget on average. Lowering the rates lowers the
+# average: it does not help against a single update longer than the budget
+DEGRADE_OVERRUNS = 3
+DEGRADE_UTILISATION = 0.75
+# windows without overrun, and below this share of the budget on average,
+# before a recovery step. The count doubles each time a recovery step has
+# to be undone, so that the scheduler does not oscillate
+RECOVERY_UTILISATION = 0.5
+RECOVERY_WINDOWS = 10
+MAX_RECOVERY_WINDOWS = 160
+
+# smoothing of the measured update durations
+COST_SMOOTHING = 0.1
+
+__frameSchedulerInstance = None
+
+
+def GetFrameScheduler():
+    global __frameSchedulerInstance
+    if __frameSchedulerInstance is None:
+        __frameSchedulerInstance = FrameScheduler()
+    return __frameSchedulerInstance
+
+
+class ScheduledClient:
+    """The update schedule of one client of the scheduler."""
+
+    def __init__(self, name, preferred_rate):
+        self.name = name
+        self.preferred_rate = preferred_rate
+        # the update rate is the preferred rate divided by a power of two
+        self.divider = 1
+        # time of the next update, in seconds
+        self.next_update = 0.
+        # smoothed duration of an update, in seconds
+        self.cost = 0.
+
+    def rate(self):
+        return self.preferred_rate / self.divider
+
+    def load(self):
+        """The share of the time spent in the updates."""
+        return self.cost * self.rate()
+
+    def can_slow_down(self):
+        return self.rate() / 2 >= MIN_UPDATE_RATE
+
+
+class FrameScheduler:
+
+    def __init__(self, budget=0.010):
+        self.logger = logging.getLogger(__name__)
+
+        self.budget = budget
+        self.clients = {}
+        self.overlap_level = 0
+
+        # duration of the updates of the current tick
+        self.tick_cost = 0.
+
+        self.window_ticks = 0
+        self.window_overruns = 0
+        self.window_duration = 0.
+        self.quiet_windows = 0
+        self.recovery_windows = RECOVERY_WINDOWS
+        self.last_step_was_recovery = False
+
+        # total number of ticks over the budget
+        self.overruns = 0
+
+    def set_budget(self, budget):
+        self.budget = budget
+
+    @property
+    def overlap(self):
+        return OVERLAPS[self.overlap_level]
+
+    def add_client(self, client, preferred_rate, name=""):
+        """Schedule the updates of 'client' at 'preferred_rate' Hz (at most
+        one per tick). The client is told the overlap of the STFT frames with
+        its set_overlap() method, whenever it changes."""
+        self.clients[client] = ScheduledClient(name, preferred_rate)
+
+    def remove_client(self, client):
+        self.clients.pop(client, None)
+
+    def due(self, client, now):
+        """Whether 'client' is to be updated on the tick that starts at 'now',
+        in seconds. Its next update is then scheduled."""
+        scheduled = self.clients.get(client)
+        if scheduled is None:
+            return True
+
+        # the ticks do not fire exactly on time
+        if now < scheduled.next_update - self.budget / 2:
+            return False
+
+        # spread the updates over the ticks: an update that does not fit in
+        # what is left of the budget of this tick is postponed, by one tick
+        # at most
+        if self.tick_cost + scheduled.cost > self.budget and now < scheduled.next_update + self.budget / 2:
+            return False
+
+        period = 1. / scheduled.rate()
+        # keep the rate on average, without catching up after a stall
+        scheduled.next_update = max(scheduled.next_update + period, now + period - self.budget)
+        return True
+
+    def record_cost(self, client, duration):
+        """Record the duration of an update of 'client', in seconds."""
+        self.tick_cost += duration
+
+        scheduled = self.clients.get(client)
+        if scheduled is None:
+            return
+
+        if scheduled.cost == 0.:
+            scheduled.cost = duration
+        else:
+            scheduled.cost += COST_SMOOTHING * (duration - scheduled.cost)
+
+    def end_tick(self, duration):
+        """Record the duration of a tick, in seconds, and degrade or recover
+        at the end of each window of ticks."""
+        self.tick_cost = 0.
+        self.window_ticks += 1
+        self.window_duration += duration
+        if duration > self.budget:
+            self.window_overruns += 1
+            self.overruns += 1
+
+        if self.window_ticks < WINDOW_TICKS:
+            return
+
+        utilisation = self.window_duration / (self.window_ticks * self.budget)
+        overruns = self.window_overruns
+        self.window_ticks = 0
+        self.window_overruns = 0
+        self.window_duration = 0.
+
+        if overruns >= DEGRADE_OVERRUNS and utilisation >= DEGRADE_UTILISATION:
+            self.quiet_windows = 0
+            if self.last_step_was_recovery:
+                self.recovery_windows = min(2 * self.recovery_windows, MAX_RECOVERY_WINDOWS)
+            self.degrade()
+        elif overruns == 0 and utilisation < RECOVERY_UTILISATION:
+            self.quiet_windows += 1
+            if self.quiet_windows >= self.recovery_windows:
+                self.quiet_windows = 0
+                self.recover()
+        else:
+            self.quiet_windows = 0
+
+    def degrade(self):
+        """Halve the update rate of the client with the largest load, or
+        coarsen the overlap when no rate can be lowered."""
+        candidates = [scheduled for scheduled in self.clients.values()
+                      if scheduled.can_slow_down() and scheduled.load() > 0.]
+        if candidates:
+            scheduled = max(candidates, key=lambda scheduled: scheduled.load())
+            scheduled.divider *= 2
+            self.last_step_was_recovery = False
+            self.logger.info("Display ticks over budget: %s updated at %.1f Hz", scheduled.name, scheduled.rate())
+        elif self.overlap_level < len(OVERLAPS) - 1:
+            self.last_step_was_recovery = False
+            self.logger.info("Display ticks over budget: STFT overlap lowered to %s", OVERLAPS[self.overlap_level + 1])
+            self.set_overlap_level(self.overlap_level + 1)
+
+    def recover(self):
+        """Undo the last kind of degradation step: refine the overlap first,
+        then double the update rate of the client with the smallest load."""
+        if self.overlap_level > 0:
+            self.last_step_was_recovery = True
+            self.logger.info("Display ticks within budget: STFT overlap raised to %s", OVERLAPS[self.overlap_level - 1])
+            self.set_overlap_level(self.overlap_level - 1)
+            return
+
+        candidates = [scheduled for scheduled in self.clients.values() if scheduled.divider > 1]
+        if candidates:
+            scheduled = min(candidates, key=lambda scheduled: scheduled.load())
+            scheduled.divider //= 2
+            self.last_step_was_recovery = True
+            self.logger.info("Display ticks within budget: %s updated at %.1f Hz", scheduled.name, scheduled.rate())
+
+    def set_overlap_level(self, level):
+        self.overlap_level = level
+        for client in list(self.clients):
+            client.set_overlap(self.overlap)
+
+    def describe(self):
+        """The update rates and the overlap, as plain text."""
+        lines = ["Display updates (%d ticks over budget), STFT overlap %s" % (self.overruns, self.overlap)]
+        for scheduled in self.clients.values():
+            lines.append("  %s: %.1f Hz (preferred %.0f Hz), %.2f ms per update" % (
+                scheduled.name, scheduled.rate(), scheduled.preferred_rate, 1e3 * scheduled.cost))
+        return "\n".join(lines)
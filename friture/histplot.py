@@ -40,11 +40,9 @@ class HistPlot(QObject):
 
         self._histplot_data = HistPlot_Data(GetStore())
 
-        self._curve_peak = FilledCurve(CurveType.PEEK)
-        self._histplot_data.add_plot_item(self._curve_peak)
-
-        self._curve_signal = FilledCurve(CurveType.SIGNAL)
-        self._histplot_data.add_plot_item(self._curve_signal)
+        # one (peak, signal) pair of curves per channel
+        self._curves = []
+        self.set_channel_count(1)
 
         self._histplot_data.show_legend = False
         self._histplot_data.vertical_axis.name = "PSD (dB A)"
@@ -74,8 +72,30 @@ class HistPlot(QObject):
     def view_model(self):
         return self._histplot_data
 
+    def set_channel_count(self, count):
+        while len(self._curves) < count:
+            curve_peak = FilledCurve(CurveType.PEEK)
+            self._histplot_data.add_plot_item(curve_peak)
+            curve_signal = FilledCurve(CurveType.SIGNAL)
+            self._histplot_data.add_plot_item(curve_signal)
+            self._curves.append((curve_peak, curve_signal))
+
+        while len(self._curves) > count:
+            curve_peak, curve_signal = self._curves.pop()
+            self._histplot_data.remove_plot_item(curve_peak)
+            self._histplot_data.remove_plot_item(curve_signal)
+
     def setdata(self, fl, fh, fc, y):
+        """Set the levels of the bands, one row per channel if y is 2D.
+
+        The bars of the channels are drawn side by side within each band.
+        """
         if not self.paused:
+            y = numpy.atleast_2d(y)
+            channels = y.shape[0]
+            if channels != len(self._curves):
+                self.set_channel_count(channels)
+
             M = numpy.max(y)
             m = self.normVerticalScaleTransform.coord_min
             y_int = (y-m)/(numpy.abs(M-m)+1e-3)
@@ -86,15 +106,20 @@ class HistPlot(QObject):
             scaled_y = 1. - self.normVerticalScaleTransform.toScreen(y)
             z = y_int
 
-            self._curve_signal.setData(scaled_x_left, scaled_x_right, scaled_y, z, baseline)
-
             self.compute_peaks(y)
             scaled_peak = 1. - self.normVerticalScaleTransform.toScreen(self.peak)
             z_peak = self.peak_int
-            self._curve_peak.setData(scaled_x_left, scaled_x_right, scaled_peak, z_peak, baseline)
 
+            scaled_width = (scaled_x_right - scaled_x_left) / channels
+            for channel, (curve_peak, curve_signal) in enumerate(self._curves):
+                channel_x_left = scaled_x_left + channel * scaled_width
+                channel_x_right = channel_x_left + scaled_width
+                curve_signal.setData(channel_x_left, channel_x_right, scaled_y[channel], z[channel], baseline)
+                curve_peak.setData(channel_x_left, channel_x_right, scaled_peak[channel], z_peak[channel], baseline)
+
+            # label above the highest bar of the band
             bar_label_x = (scaled_x_left + scaled_x_right)/2
-            self._histplot_data.setBarLabels(bar_label_x, fc, scaled_y)
+            self._histplot_data.setBarLabels(bar_label_x, fc, scaled_y.min(axis=0))
 
     def draw(self):
         return
@@ -109,7 +134,7 @@ class HistPlot(QObject):
         return
 
     def compute_peaks(self, y):
-        if len(self.peak) != len(y):
+        if self.peak.shape != y.shape:
             y_ones = ones(y.shape)
             self.peak = y_ones * (-500.)
             self.peak_int = zeros(y.shape)
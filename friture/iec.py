@@ -17,6 +17,9 @@
 # You should have received a copy of the GNU General Public License
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
+import numpy as np
+
+
 def dB_to_IEC(dB):
     if dB < -70.0:
         return 0.0
@@ -31,4 +34,14 @@ def dB_to_IEC(dB):
     elif dB < -20.0:
         return (dB + 30.0) * 0.02 + 0.3
     else:  # if dB < 0.0
-        return (dB + 20.0) * 0.025 + 0.5
\ No newline at end of file
+        return (dB + 20.0) * 0.025 + 0.5
+
+# breakpoints of the piecewise linear IEC 60268-18 scale. The last one
+# extends the top segment beyond any level of floating-point samples.
+IEC_DB = np.array([-70.0, -60.0, -50.0, -40.0, -30.0, -20.0, 1000.0])
+IEC_VALUES = np.array([0.0, 0.025, 0.075, 0.15, 0.3, 0.5, 0.5 + 1020.0 * 0.025])
+
+
+def dB_to_IEC_array(dB):
+    """dB_to_IEC applied to an array of levels."""
+    return np.interp(dB, IEC_DB, IEC_VALUES)
@@ -18,56 +18,46 @@
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
 from PyQt6 import QtCore
-from PyQt6.QtCore import QObject, pyqtProperty  # type: ignore
+from PyQt6.QtCore import pyqtProperty  # type: ignore
+from PyQt6.QtQml import QQmlListProperty # type: ignore
 
-from friture.ballistic_peak import BallisticPeak
-from friture.level_data import LevelData
+from friture.channel_levels import ChannelLevels
 
 class LevelViewModel(QtCore.QObject):
-    two_channels_changed = QtCore.pyqtSignal(bool)
+    channels_changed = QtCore.pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self._two_channels = False
-
-        self._level_data = LevelData(self)
-        self._level_data_2 = LevelData(self)
-        self._level_data_slow = LevelData(self)
-        self._level_data_slow_2 = LevelData(self)
-        self._level_data_ballistic = BallisticPeak(self)
-        self._level_data_ballistic_2 = BallisticPeak(self)
-
-    @pyqtProperty(bool, notify=two_channels_changed) # type: ignore
-    def two_channels(self):
-        return self._two_channels
-
-    @two_channels.setter # type: ignore
-    def two_channels(self, two_channels):
-        if self._two_channels != two_channels:
-            self._two_channels = two_channels
-            self.two_channels_changed.emit(two_channels)
-
-    @pyqtProperty(QObject, constant = True) # type: ignore
-    def level_data(self):
-        return self._level_data
-
-    @pyqtProperty(QObject, constant = True) # type: ignore
-    def level_data_2(self):
-        return self._level_data_2
-
-    @pyqtProperty(QObject, constant = True) # type: ignore
-    def level_data_slow(self):
-        return self._level_data_slow
-
-    @pyqtProperty(QObject, constant = True) # type: ignore
-    def level_data_slow_2(self):
-        return self._level_data_slow_2
-
-    @pyqtProperty(QObject, constant = True) # type: ignore
-    def level_data_ballistic(self):
-        return self._level_data_ballistic
-
-    @pyqtProperty(QObject, constant = True) # type: ignore
-    def level_data_ballistic_2(self):
-        return self._level_data_ballistic_2
\ No newline at end of file
+        self._channels = [ChannelLevels(self)]
+
+    def set_channel_count(self, count):
+        if count != len(self._channels):
+            # keep the levels of the channels that remain
+            self._channels = self._channels[:count] + [ChannelLevels(self) for _ in range(len(self._channels), count)]
+            self.channels_changed.emit()
+
+    @pyqtProperty(QQmlListProperty, notify=channels_changed) # type: ignore
+    def channels(self):
+        return QQmlListProperty(ChannelLevels, self, self._channels)
+
+    @pyqtProperty(int, notify=channels_changed) # type: ignore
+    def channel_count(self):
+        return len(self._channels)
+
+    def channel(self, index):
+        return self._channels[index]
+
+    def set_levels(self, levels_rms, levels_max, peaks_iec):
+        """Update the levels of all the channels from arrays, one value per channel."""
+        self.set_channel_count(len(levels_rms))
+        for channel, level_rms, level_max, peak_iec in zip(self._channels, levels_rms.tolist(), levels_max.tolist(), peaks_iec.tolist()):
+            channel.level_data.level_rms = level_rms
+            channel.level_data.level_max = level_max
+            channel.level_data_ballistic.peak_iec = peak_iec
+
+    def update_slow_levels(self):
+        """Copy the current levels to the slower ones of the text labels."""
+        for channel in self._channels:
+            channel.level_data_slow.level_rms = channel.level_data.level_rms
+            channel.level_data_slow.level_max = channel.level_data.level_max
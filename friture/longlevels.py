@@ -29,7 +29,7 @@ from friture.longlevels_settings import (LongLevels_Settings_Dialog,
                                          DEFAULT_MAXTIME,
                                          DEFAULT_RESPONSE_TIME)
 from friture.audioproc import audioproc
-from .signal.decimate import decimate
+from .signal.decimate import Decimator
 from .ringbuffer import RingBuffer
 from friture.signal.lfilter import lfilter_float64_1D
 from friture.scope_data import Scope_Data
@@ -62,33 +62,12 @@ class Subsampler:
         self.adec = np.zeros(self.bdec.shape)
         self.adec[0] = 1.
 
-        # build a proper array of zero initial conditions to start the subsampler
-        self.zfs = []
-        for i in range(self.Ndec):
-            l = max(len(self.bdec), len(self.adec)) - 1
-            self.zfs += [np.zeros(l)]
+        # keeps the filter states and phases across pushes, so that blocks
+        # shorter than 2**Ndec samples are fine
+        self.decimator = Decimator(self.Ndec, self.bdec, self.adec)
 
     def push(self, x):
-        # FIXME problems when x is smaller than filter coeff
-
-        # do not run on empty arrays, otherwise bad artefacts on the output !!
-        if x.size == 0:
-            return x
-
-        x_dec = x
-
-        # if we do not have enough samples, we need to buffer until we have enough
-        # we need 2**self.Ndec samples in input for one in output
-
-        zfs = []
-        for i, zi in zip(list(range(self.Ndec)), self.zfs):
-            x_dec, zf = decimate(self.bdec, self.adec, x_dec, zi=zi)
-            # zf can be reused to restart the filter
-            zfs.append(zf)
-
-        self.zfs = zfs
-
-        return x_dec
+        return self.decimator.push(x)
 
 
 class LongLevelWidget(QObject):
@@ -128,15 +107,18 @@ class LongLevelWidget(QObject):
 
         self.i = 0
 
-        self.old_index = 0
+        # read position in the audio buffer, set with the buffer
+        self.frame_cursor = None
+
+        # ringbuffer for the subsampled data
+        self.ringbuffer = RingBuffer()
+        # whether new levels are waiting to be drawn
+        self.curve_pending = False
 
         #Set the initial timespan and response time
         self.length_seconds = DEFAULT_MAXTIME
         self.setresptime(DEFAULT_RESPONSE_TIME)
 
-        # ringbuffer for the subsampled data
-        self.ringbuffer = RingBuffer()
-
     def qml_file_name(self):
         return "Scope.qml"
     
@@ -146,58 +128,58 @@ class LongLevelWidget(QObject):
     # method
     def set_buffer(self, buffer):
         self.audiobuffer = buffer
+        needed = 2 ** self.Ndec
+        self.frame_cursor = self.audiobuffer.frame_cursor(needed, needed)
 
     def handle_new_data(self, floatdata):
-        # we need to maintain an index of where we are in the buffer
-        index = self.audiobuffer.ringbuffer.offset
         self.last_data_time = self.audiobuffer.lastDataTime
 
-        available = index - self.old_index
-
-        if available < 0:
-            # ringbuffer must have grown or something...
-            available = 0
-            self.old_index = index
-
-        # if we have enough data to add a frequency column in the time-frequency plane, compute it
-        needed = int(2**self.Ndec)
-        realizable = int(np.floor(available / needed))
-
-        if realizable > 0:
-            for i in range(realizable):
-                floatdata = self.audiobuffer.data_indexed(self.old_index, needed)
+        # if we have enough data to add points to the levels curve, compute them.
+        # The frames do not overlap: together they are the contiguous run of
+        # new samples, processed in one go
+        block = self.frame_cursor.take()
 
-                # first channel
-                y0 = floatdata[0, :]
+        if block.frame_count > 0:
+            # first channel
+            y0 = block.frames[:, 0, :].reshape(-1)
 
-                y0_squared = y0**2
+            y0_squared = y0**2
 
-                # subsample
-                y0_squared_dec = self.subsampler.push(y0_squared)
+            # subsample, one point per frame
+            y0_squared_dec = self.subsampler.push(y0_squared)
 
-                self.level, self.zf = lfilter_float64_1D(self.b, self.a, y0_squared_dec, self.zf)
+            levels, self.zf = lfilter_float64_1D(self.b, self.a, y0_squared_dec, self.zf)
+            self.level = levels[-1]
 
-                self.level_rms = 10. * np.log10(max(self.level, 1e-150))
+            levels_rms = 10. * np.log10(np.maximum(levels, 1e-150))
+            self.level_rms = levels_rms[-1]
 
-                l = np.array([self.level_rms])
-                l.shape = (1, 1)
+            self.ringbuffer.push(levels_rms.reshape((1, -1)), 0)
+            self.curve_pending = True
 
-                self.ringbuffer.push(l, 0)
+    # method, called before the analysis when the dock is shown again
+    def resync(self):
+        # the levels of the time when the dock was hidden are not computed,
+        # they are left out of the curve
+        skipped = min(self.frame_cursor.skip(), self.length_samples)
+        self.ringbuffer.push(np.full((1, skipped), np.nan), 0)
+        self.curve_pending = True
 
-                self.old_index += needed
-
-            self.time = np.arange(self.length_samples) / self.subsampled_sampling_rate
+    # method
+    def canvasUpdate(self):
+        # the curve is updated at the update rate of the dock, which can be
+        # much lower than the rate of the new levels
+        if not self.curve_pending:
+            return
+        self.curve_pending = False
 
-            levels = self.ringbuffer.data(self.length_samples)
+        self.time = np.arange(self.length_samples) / self.subsampled_sampling_rate
 
-            scaled_t = self.time / self.length_seconds
-            scaled_y = np.clip(1. - (levels[0, :] - self.level_min) / (self.level_max - self.level_min), 0., 1.)
-            self._curve.setData(scaled_t, scaled_y)
+        levels = self.ringbuffer.data(self.length_samples)
 
-    # method
-    def canvasUpdate(self):
-        # nothing to do here
-        return
+        scaled_t = self.time / self.length_seconds
+        scaled_y = np.clip(1. - (levels[0, :] - self.level_min) / (self.level_max - self.level_min), 0., 1.)
+        self._curve.setData(scaled_t, scaled_y)
 
     def setmin(self, value):
         self.level_min = value
@@ -210,6 +192,7 @@ class LongLevelWidget(QObject):
     def setduration(self, value):
         self.length_seconds = value
         self.length_samples = int(self.length_seconds * self.subsampled_sampling_rate)
+        self.ringbuffer.reserve(self.length_samples)
         self._long_levels_data.horizontal_axis.setRange(0., self.length_seconds)
 
     def setresptime(self, value):
@@ -225,6 +208,8 @@ class LongLevelWidget(QObject):
 
         self.subsampled_sampling_rate = SAMPLING_RATE / 2 ** (self.Ndec)
         self.subsampler = Subsampler(self.Ndec)
+        if self.frame_cursor is not None:
+            self.frame_cursor.configure(2 ** self.Ndec, 2 ** self.Ndec)
 
         if self.length_seconds: 
             self.setduration(self.length_seconds)
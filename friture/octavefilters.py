@@ -21,7 +21,7 @@ from numpy import log10, array, where
 import numpy as np
 
 from friture.filter import (octave_frequencies,
-                            octave_filter_bank_decimation_fft,
+                            OctaveFilterBank,
                             NOCTAVE)
 from friture import generated_filters
 from friture import generated_fft
@@ -44,18 +44,31 @@ class Octave_Filters():
         self.bdec = array(self.bdec)
         self.adec = array(self.adec)
 
+        self.filter_bank = None
         self.setbandsperoctave(bandsperoctave)
 
     def filter(self, floatdata):
-        y, dec, self._overlaps_oct, self._overlaps_dec = \
-            octave_filter_bank_decimation_fft(
-                self.boct,
-                self._fft_H_oct, self._fft_H_dec, self._fft_sizes,
-                self.FIR_LENGTH,
-                floatdata,
-                self._overlaps_oct, self._overlaps_dec)
+        """Filter a block of samples, 1D or (channels, samples).
 
-        return y, dec
+        Returns the output of each band, from the highest to the lowest, and
+        their decimation factors. The outputs are views of the workspaces of
+        the filter bank, overwritten by the next call.
+        """
+        stages = self.filter_bank.filter(floatdata)
+
+        y = [stage[..., i, :] for stage in stages[::-1] for i in range(self.bandsperoctave)]
+
+        return y, self.get_decs()
+
+    def filter_stages(self, floatdata):
+        """Filter a block of samples, 1D or (channels, samples).
+
+        Returns the outputs of each decimation stage, (..., bands_per_octave,
+        samples / dec), from the lowest octave to the highest, so that their
+        bands follow the order of the frequencies. The outputs are views of
+        the workspaces of the filter bank, overwritten by the next call.
+        """
+        return self.filter_bank.filter(floatdata)[::-1]
 
     def get_decs(self):
         decs = [2 ** j for j in range(0, NOCTAVE)[::-1] for i in range(0, self.bandsperoctave)]
@@ -121,38 +134,14 @@ class Octave_Filters():
             self.f_nominal = self.f_nominal[-len(self.fi):]
 
     def _init_fir_and_states(self):
-        """Load precomputed FIR coefficients and FFT representations."""
+        """Load the precomputed FIR coefficients into the filter bank."""
         key = str(self.bandsperoctave)
         data = generated_fft.load_arrays()
-        fir_length = self.FIR_LENGTH
 
-        # Load precomputed FIR coefficients (time-domain)
-        self._boct_fir = list(data[f'{key}_boct_fir'])
+        self._boct_fir = data[f'{key}_boct_fir']
         self._bdec_fir = data['bdec_fir']
 
-        # Load precomputed FFT frequency responses and sizes
-        H_oct_stack = data[f'{key}_fft_H_oct']   # (NOCTAVE, bpo, max_freq)
-        H_dec_stack = data[f'{key}_fft_H_dec']   # (NOCTAVE, max_freq)
-        fft_sizes = data[f'{key}_fft_sizes'].tolist()
-
-        self._fft_H_oct = []
-        self._fft_H_dec = []
-        self._fft_sizes = fft_sizes
-
-        for j in range(NOCTAVE):
-            n_freq = fft_sizes[j] // 2 + 1
-            self._fft_H_oct.append(H_oct_stack[j, :, :n_freq])
-            self._fft_H_dec.append(H_dec_stack[j, :n_freq])
-
-        # Initialise overlap buffers for FFT stages.  Fixed size L-1
-        # because overlapping tails from consecutive blocks are combined
-        # via element-wise addition (not concatenation), keeping the
-        # buffer size constant regardless of block size.
-        self._overlaps_oct = [
-            np.zeros((self.bandsperoctave, fir_length - 1))
-            for _ in range(NOCTAVE)
-        ]
-        self._overlaps_dec = [
-            np.zeros(fir_length - 1)
-            for _ in range(NOCTAVE)
-        ]
+        if self.filter_bank is None:
+            self.filter_bank = OctaveFilterBank(self._boct_fir, self._bdec_fir)
+        else:
+            self.filter_bank.set_filters(self._boct_fir, self._bdec_fir)
@@ -18,7 +18,7 @@
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
 from PyQt6.QtCore import QObject
-from numpy import log10, array, arange
+from numpy import log10
 
 from friture.histplot import HistPlot
 from friture.octavefilters import Octave_Filters
@@ -29,9 +29,7 @@ from friture.octavespectrum_settings import (OctaveSpectrum_Settings_Dialog,  #
                                              DEFAULT_BANDSPEROCTAVE,
                                              DEFAULT_RESPONSE_TIME)
 
-from friture.filter import NOCTAVE
-
-from friture.signal.exp_smoothing import exp_smoothed_value
+from friture.signal.exp_smoothing import BandEnergyIntegrator
 
 from friture.audiobackend import SAMPLING_RATE
 
@@ -56,7 +54,7 @@ class OctaveSpectrum_Widget(QObject):
         self.PlotZoneSpect.setweighting(self.weighting)
 
         self.filters = Octave_Filters(DEFAULT_BANDSPEROCTAVE)
-        self.dispbuffers = [0] * DEFAULT_BANDSPEROCTAVE * NOCTAVE
+        self.integrator = None
 
         # set kernel and parameters for the smoothing filter
         self.setresponsetime(self.response_time)
@@ -74,39 +72,17 @@ class OctaveSpectrum_Widget(QObject):
     def set_buffer(self, buffer):
         self.audiobuffer = buffer
 
-    def compute_kernels(self, alphas, Ns):
-        kernels = []
-        for alpha, N in zip(alphas, Ns):
-            kernels += [(1. - alpha) ** arange(N - 1, -1, -1)]
-        return kernels
-
-    def exp_smoothed_value(self, kernel, alpha, data, previous):
-        N = len(data)
-        if N == 0:
-            return previous
-        else:
-            value = alpha * (kernel[-N:] * data).sum() + previous * (1. - alpha) ** N
-            return value
-
     def handle_new_data(self, floatdata):
         # the behaviour of the filters functions is sometimes
         # unexpected when they are called on empty arrays
         if floatdata.shape[1] == 0:
             return
 
-        # for now, take the first channel only
-        floatdata = floatdata[0, :]
+        # compute the filters' output, all the channels at once
+        stages = self.filters.filter_stages(floatdata)
 
-        # compute the filters' output
-        y, decs_unused = self.filters.filter(floatdata)
-
-        # compute the widget data
-        sp = [exp_smoothed_value(kernel, alpha, bankdata ** 2, old) for bankdata, kernel, alpha, old in zip(y, self.kernels, self.alphas, self.dispbuffers)]
-
-        # store result for next computation
-        self.dispbuffers = sp
-
-        sp = array(sp)
+        # compute the widget data, (channels, bands)
+        sp = self.integrator.push(stages)
 
         if self.weighting == 0:
             w = 0.
@@ -153,14 +129,16 @@ class OctaveSpectrum_Widget(QObject):
         Ns = [2 * 4096 / dec for dec in decs]
         self.alphas = [1. - (1. - w) ** (1. / (n + 1)) for n in ns]
         # print(ns, Ns)
-        self.kernels = self.compute_kernels(self.alphas, Ns)
+        if self.integrator is None:
+            self.integrator = BandEnergyIntegrator(self.alphas, Ns)
+        else:
+            self.integrator.set_smoothing(self.alphas, Ns)
 
     def setbandsperoctave(self, bandsperoctave):
         self.filters.setbandsperoctave(bandsperoctave)
-        # recreate the ring buffers
-        self.dispbuffers = [0] * bandsperoctave * NOCTAVE
         # reset kernel and parameters for the smoothing filter
         self.setresponsetime(self.response_time)
+        self.integrator.reset()
 
     def settings_called(self, checked):
         self.settings_dialog.show()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Offline analysis of audio files, without Qt and without audio devices.
+
+The samples of a WAV file are streamed in large blocks through the same
+processing as the docks: a ring buffer, the shared STFT cache, the octave
+filter bank and the pitch tracker. The results are written as .npy arrays
+in an output directory, with an analysis.json file that describes them.
+
+The levels, the octave bands and the spectrum are reported once per
+'period', a fixed number of samples that is a multiple of the largest
+decimation of the octave filters. The pitch is reported once per hop of
+the pitch tracker. The incomplete period at the end of the file is
+dropped.
+"""
+
+import json
+import logging
+import os
+import wave
+from typing import Any, Iterator, Optional, Protocol, Sequence
+
+import numpy as np
+
+from friture.audio_format import SAMPLING_RATE
+from friture.filter import NOCTAVE
+from friture.octavefilters import Octave_Filters
+from friture.pitch_estimator import DEFAULT_FFT_SIZE, PitchTracker
+from friture.precision import sample_dtype
+from friture.ringbuffer import RingBuffer
+from friture.stft_cache import GetSTFTCache
+
+# the periods are a multiple of the largest decimation of the octave filters
+PERIOD_STEP = 2 ** (NOCTAVE - 1)
+DEFAULT_PERIOD = 0.1  # seconds
+# number of periods read and analyzed at once
+DEFAULT_BLOCK_PERIODS = 64
+DEFAULT_BANDS_PER_OCTAVE = 3
+# length of the chunks given to the octave filter bank, a multiple of
+# PERIOD_STEP so that each chunk gives whole samples in every stage
+OCTAVE_CHUNK = 64 * PERIOD_STEP
+
+ANALYSES = ("levels", "octave", "spectrum", "pitch")
+
+# floor of the dB conversions, below anything that can be displayed
+EPSILON = 1e-30
+
+METADATA_FILE_NAME = "analysis.json"
+
+
+class WavReader:
+    """Reads the integer PCM samples of a WAV file as (channels, frames)
+    float arrays in [-1, 1)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self.wav = wave.open(path, "rb")
+        except wave.Error as e:
+            # the wave module rejects the floating-point WAV files
+            raise ValueError("%s: unsupported WAV file (%s), only integer PCM is supported" % (path, e))
+
+        self.channels = self.wav.getnchannels()
+        self.sample_width = self.wav.getsampwidth()
+        self.sample_rate = self.wav.getframerate()
+        self.frames = self.wav.getnframes()
+
+        if self.sample_rate != SAMPLING_RATE:
+            self.wav.close()
+            raise ValueError("%s: the sample rate is %d Hz, it must be %d Hz, please resample the file" % (
+                path, self.sample_rate, SAMPLING_RATE))
+
+    def close(self) -> None:
+        self.wav.close()
+
+    def read(self, length: int) -> np.ndarray:
+        """The next 'length' frames, or less at the end of the file."""
+        data = self.wav.readframes(length)
+        return decode_pcm(data, self.sample_width, self.channels)
+
+    def blocks(self, length: int) -> Iterator[np.ndarray]:
+        while True:
+            block = self.read(length)
+            if block.shape[1] == 0:
+                return
+            yield block
+
+
+def decode_pcm(data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Convert interleaved little-endian PCM bytes to (channels, frames) floats."""
+    dtype = sample_dtype()
+
+    if sample_width == 1:
+        # 8-bit samples are unsigned
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(dtype) - 128.) / 128.
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(dtype) / 2. ** 15
+    elif sample_width == 3:
+        # place the 3 bytes of each sample in the upper bytes of an int32
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((raw.shape[0], 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = padded.view("<i4")[:, 0].astype(dtype) / 2. ** 31
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype="<i4").astype(dtype) / 2. ** 31
+    else:
+        raise ValueError("Unsupported sample width: %d bytes" % (sample_width))
+
+    return samples.reshape(-1, channels).T
+
+
+def period_length(period: float) -> int:
+    """The number of samples of the periods closest to 'period' seconds."""
+    return max(1, round(period * SAMPLING_RATE / PERIOD_STEP)) * PERIOD_STEP
+
+
+def to_dB(energy: np.ndarray) -> np.ndarray:
+    return 10. * np.log10(energy + EPSILON)
+
+
+class Analysis(Protocol):
+    """One of the analyses, that gives a fixed number of output rows per
+    block of samples."""
+
+    name: str
+
+    def output_shape(self, periods: int, samples: int) -> tuple: ...
+
+    def process(self, block: np.ndarray, start: int) -> np.ndarray: ...
+
+    def metadata(self) -> dict: ...
+
+
+class LevelsAnalysis:
+    """RMS and peak levels of each channel over each period, in dBFS."""
+
+    name = "levels"
+
+    def __init__(self, period: int, channels: int):
+        self.period = period
+        self.channels = channels
+
+    def output_shape(self, periods: int, samples: int) -> tuple:
+        return (periods, self.channels, 2)
+
+    def process(self, block: np.ndarray, start: int) -> np.ndarray:
+        x = block.reshape(block.shape[0], -1, self.period)
+        mean_square = np.mean(x ** 2, axis=-1)
+        peak = np.max(np.abs(x), axis=-1)
+        return np.stack((to_dB(mean_square), to_dB(peak ** 2)), axis=-1).transpose(1, 0, 2)
+
+    def metadata(self) -> dict:
+        return {"axes": ["period", "channel", "level"], "levels": ["rms", "peak"], "unit": "dBFS"}
+
+
+class OctaveAnalysis:
+    """Energy of the fractional-octave bands of each channel over each
+    period, in dB, without weighting."""
+
+    name = "octave"
+
+    def __init__(self, period: int, channels: int, bandsperoctave: int):
+        self.period = period
+        self.channels = channels
+        self.filters = Octave_Filters(bandsperoctave)
+
+    def output_shape(self, periods: int, samples: int) -> tuple:
+        return (periods, self.channels, self.filters.nbands)
+
+    def process(self, block: np.ndarray, start: int) -> np.ndarray:
+        periods = block.shape[1] // self.period
+        # the filter bank is fastest on medium-sized chunks, and its outputs
+        # are overwritten from one chunk to the next
+        squares: list = [[] for _ in range(NOCTAVE)]
+        for chunk_start in range(0, block.shape[1], OCTAVE_CHUNK):
+            # (channels, bandsperoctave, samples/dec) outputs, lowest octave first
+            stages = self.filters.filter_stages(block[:, chunk_start:chunk_start + OCTAVE_CHUNK])
+            for stage_squares, stage in zip(squares, stages):
+                stage_squares.append(stage ** 2)
+
+        energies = []
+        for stage_squares in squares:
+            stage = np.concatenate(stage_squares, axis=-1)
+            energies.append(np.mean(stage.reshape(stage.shape[0], stage.shape[1], periods, -1), axis=-1))
+        # (channels, bands, periods)
+        energy = np.concatenate(energies, axis=1)
+        return to_dB(energy).transpose(2, 0, 1)
+
+    def metadata(self) -> dict:
+        return {"axes": ["period", "channel", "band"],
+                "bands_per_octave": self.filters.bandsperoctave,
+                "frequencies": self.filters.fi.tolist(),
+                "unit": "dB"}
+
+
+class SpectrumAnalysis:
+    """Power spectrum of each channel, averaged over the frames that end in
+    each period, in dB. NaN where no frame ends in a period."""
+
+    name = "spectrum"
+
+    def __init__(self, period: int, channels: int, ringbuffer: RingBuffer, fft_size: int):
+        self.period = period
+        self.channels = channels
+        self.ringbuffer = ringbuffer
+        self.fft_size = fft_size
+        # the grid of the spectrum dock, shared with the pitch tracker
+        self.hop = fft_size // 4
+        self.frame_cursor = ringbuffer.frame_cursor(fft_size, self.hop)
+
+    def output_shape(self, periods: int, samples: int) -> tuple:
+        return (periods, self.channels, self.fft_size // 2 + 1)
+
+    def process(self, block: np.ndarray, start: int) -> np.ndarray:
+        periods = block.shape[1] // self.period
+        result = np.full((periods, self.channels, self.fft_size // 2 + 1), np.nan, dtype=np.float32)
+
+        frames = self.frame_cursor.take()
+        if frames.frame_count == 0:
+            return result
+
+        # (count, channels, bins)
+        power = np.stack([
+            GetSTFTCache().power_spectra(self.ringbuffer, channel, self.fft_size, self.hop, frames.stop, frames.frame_count)
+            for channel in range(self.channels)], axis=1)
+
+        # the frames that end at the boundary belong to the earlier period
+        ends = frames.stop - self.hop * np.arange(frames.frame_count - 1, -1, -1)
+        indices = (ends - 1) // self.period - start // self.period
+        used, first, counts = np.unique(indices, return_index=True, return_counts=True)
+        sums = np.add.reduceat(power, first, axis=0)
+        result[used] = to_dB(sums / counts[:, np.newaxis, np.newaxis])
+        return result
+
+    def metadata(self) -> dict:
+        return {"axes": ["period", "channel", "frequency"],
+                "fft_size": self.fft_size,
+                "hop": self.hop,
+                "window": "hann",
+                "frequency_step": SAMPLING_RATE / self.fft_size,
+                "unit": "dB"}
+
+
+class PitchAnalysis:
+    """Pitch of the first channel, once per hop of the pitch tracker, in Hz.
+    NaN where no pitch is found."""
+
+    name = "pitch"
+
+    def __init__(self, ringbuffer: RingBuffer, fft_size: int):
+        self.tracker = PitchTracker(ringbuffer, fft_size=fft_size)
+
+    def output_shape(self, periods: int, samples: int) -> tuple:
+        hop = self.tracker.hop_size()
+        frames = (samples - self.tracker.fft_size) // hop + 1 if samples >= self.tracker.fft_size else 0
+        return (frames,)
+
+    def process(self, block: np.ndarray, start: int) -> np.ndarray:
+        return self.tracker.estimate_new_frames()
+
+    def metadata(self) -> dict:
+        return {"axes": ["frame"],
+                "fft_size": self.tracker.fft_size,
+                "hop": self.tracker.hop_size(),
+                "first_frame_end": self.tracker.fft_size,
+                "min_freq": self.tracker.min_freq,
+                "max_freq": self.tracker.max_freq,
+                "unit": "Hz"}
+
+
+class OfflineAnalyzer:
+    """
+    Streams a WAV file through the selected analyses.
+
+    Parameters:
+    -----------
+    analyses : sequence of str
+        The analyses to run, among ANALYSES.
+    period : float
+        The period of the levels, octave bands and spectra, in seconds.
+        It is rounded to a multiple of PERIOD_STEP samples.
+    fft_size : int
+        The FFT size of the spectrum and of the pitch tracker.
+    bandsperoctave : int
+        The number of bands per octave of the octave analysis.
+    channel_map : sequence of int, optional
+        The channels of the file to analyze, all of them by default. The
+        pitch is estimated on the first one.
+    block_periods : int
+        The number of periods read and analyzed at once.
+    """
+
+    def __init__(
+        self,
+        analyses: Sequence[str] = ANALYSES,
+        period: float = DEFAULT_PERIOD,
+        fft_size: int = DEFAULT_FFT_SIZE,
+        bandsperoctave: int = DEFAULT_BANDS_PER_OCTAVE,
+        channel_map: Optional[Sequence[int]] = None,
+        block_periods: int = DEFAULT_BLOCK_PERIODS,
+    ):
+        self.logger = logging.getLogger(__name__)
+
+        for name in analyses:
+            if name not in ANALYSES:
+                raise ValueError("Unknown analysis: %s" % (name))
+
+        self.analyses = [name for name in ANALYSES if name in analyses]
+        self.period = period_length(period)
+        self.fft_size = fft_size
+        self.bandsperoctave = bandsperoctave
+        self.channel_map = None if channel_map is None else list(channel_map)
+        self.block_length = self.period * block_periods
+
+    def run(self, path: str, output_dir: str) -> dict:
+        """Analyze the file at 'path' and write the results to 'output_dir'.
+
+        Returns the metadata written to analysis.json."""
+        reader = WavReader(path)
+        try:
+            return self._run(reader, output_dir)
+        finally:
+            reader.close()
+
+    def _run(self, reader: WavReader, output_dir: str) -> dict:
+        channel_map = list(range(reader.channels)) if self.channel_map is None else self.channel_map
+        if len(channel_map) == 0 or min(channel_map) < 0 or max(channel_map) >= reader.channels:
+            raise ValueError("Invalid channels %s for a file with %d channels" % (channel_map, reader.channels))
+        channels = len(channel_map)
+
+        periods = reader.frames // self.period
+        samples = periods * self.period
+
+        # the frames of a block are analyzed after the whole block is pushed
+        ringbuffer = RingBuffer(history=self.block_length + self.fft_size)
+
+        analyses: list[Analysis] = []
+        for name in self.analyses:
+            if name == "levels":
+                analyses.append(LevelsAnalysis(self.period, channels))
+            elif name == "octave":
+                analyses.append(OctaveAnalysis(self.period, channels, self.bandsperoctave))
+            elif name == "spectrum":
+                analyses.append(SpectrumAnalysis(self.period, channels, ringbuffer, self.fft_size))
+            elif name == "pitch":
+                analyses.append(PitchAnalysis(ringbuffer, self.fft_size))
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        # the arrays are written progressively, block after block
+        outputs = [
+            np.lib.format.open_memmap(
+                os.path.join(output_dir, analysis.name + ".npy"), mode="w+",
+                dtype=np.float32, shape=analysis.output_shape(periods, samples))
+            for analysis in analyses]
+        positions = [0] * len(analyses)
+
+        start = 0
+        for block in reader.blocks(self.block_length):
+            # drop the incomplete period at the end of the file
+            length = min(block.shape[1], samples - start)
+            if length <= 0:
+                break
+            block = block[channel_map, :length]
+
+            ringbuffer.push(block)
+
+            for i, analysis in enumerate(analyses):
+                rows = analysis.process(block, start)
+                outputs[i][positions[i]:positions[i] + len(rows)] = rows
+                positions[i] += len(rows)
+
+            start += length
+
+        for output in outputs:
+            output.flush()
+        del outputs
+
+        metadata: dict[str, Any] = {
+            "source": os.path.abspath(reader.path),
+            "sample_rate": SAMPLING_RATE,
+            "channels": channel_map,
+            "period": self.period,
+            "periods": periods,
+            "samples": samples,
+            "outputs": {},
+        }
+        for analysis in analyses:
+            description = analysis.metadata()
+            description["file"] = analysis.name + ".npy"
+            description["shape"] = list(analysis.output_shape(periods, samples))
+            metadata["outputs"][analysis.name] = description
+
+        with open(os.path.join(output_dir, METADATA_FILE_NAME), "w") as f:
+            json.dump(metadata, f, indent=2)
+
+        self.logger.info("Analyzed %d samples of %s", samples, reader.path)
+
+        return metadata
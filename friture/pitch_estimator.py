@@ -0,0 +1,452 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2024 Celeste Sinéad
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+# Pitch estimator adapted from libf0 (MIT License):
+# https://github.com/groupmm/libf0
+# Based on SWIPE algorithm by Arturo Camacho:
+# Arturo Camacho, John G. Harris; A sawtooth waveform inspired pitch estimator for speech and music. 
+# J. Acoust. Soc. Am. 1 September 2008; 124 (3): 1638–1652. https://doi.org/10.1121/1.2951592
+# Released under GPLv3 for inclusion in Friture.
+
+"""Qt-free pitch estimation, shared by the pitch tracker dock and the
+offline analysis."""
+
+import math as m
+import numpy as np
+from typing import Optional, Tuple
+
+from friture.audio_format import SAMPLING_RATE
+from friture.audioproc import audioproc
+from friture.ringbuffer import RingBuffer
+from friture.stft_cache import GetSTFTCache
+
+# Pitch tracker defaults:
+DEFAULT_FFT_SIZE = 4096
+DEFAULT_MIN_FREQ = 65
+DEFAULT_MAX_FREQ = 1047
+DEFAULT_MIN_DB = -50.0
+DEFAULT_C_RES = 10      # Pitch resolution in cents. Default of 10 produces 120 kernels per octave.
+DEFAULT_P_CONF = 0.50   # Confidence threshold for pitch estimation. Unitless.
+DEFAULT_P_DELTA = 2     # Maximum pitch jump between frames in semitones.
+
+def fastParabolicInterp(y1: np.ndarray, y2: np.ndarray, y3: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Estimate sub-bin pitch offset using parabolic interpolation.
+
+    To increase the precision of the pitch estimate beyond the kernel
+    resolution (10 cents), the strongest pitch correlation (y2) and its two
+    adjacent values (y1 and y3) are fitted to a parabola. The x-value of
+    the vertex represents the positional offset of the "true" pitch
+    relative to the center bin, enabling sub-bin pitch accuracy with fewer
+    kernels.
+
+    SWIPE's discretized pitch strength values are calculated from an inner
+    product of the audio signal with kernels made of cosine lobes. This
+    allows the underlying, smooth function to be modeled using a Taylor
+    series with even powers. Higher order terms don't contribute
+    significantly, so a simple parabolic interpolation can generate sub-bin
+    pitch accuracy.
+
+    Args:
+        y1 (ndarray): Pitch strength at frequency bin i - 1.
+        y2 (ndarray): Pitch strength at frequency bin i.
+        y3 (ndarray): Pitch strength at frequency bin i + 1.
+
+    Returns:
+        tuple:
+            vx (ndarray): The position offset (in index) of the interpolated
+                peak relative to the center index.
+            vy (ndarray): The interpolated pitch strength value at the peak.
+    """
+    a = (y1 - 2*y2 + y3) / 2
+    b = (y3 - y1) / 2
+    #c = y2
+
+    vx = -b / (2 * a + np.finfo(np.float64).eps) # Avoids division by zero
+    vy = a * vx**2 + b * vx + y2
+
+    return vx, vy
+
+# Harmonics are a mix of SWIPE and SWIPE'. Good match for human voice.
+KERNEL_HARMONICS = np.array([1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 13, 17, 19, 23])
+
+# Thin peaks, wide valleys
+KERNEL_PEAK_WIDTH = 0.15
+KERNEL_VALLEY_WIDTH = 1 - KERNEL_PEAK_WIDTH
+
+KERNEL_VALLEY_DIVISOR = 2
+KERNEL_DECAY_START_HARMONIC = 2
+
+
+def cosineKernelShape(ratio: np.ndarray, numberOfHarmonics: int) -> np.ndarray:
+    """Unnormalized SWIPE-style kernel, as a function of the frequency ratio
+    to the candidate fundamental.
+
+    Each harmonic i owns the ratios between i - valleyWidth and i + peakWidth:
+    a negative valley, then a positive peak centered on i. Only the first
+    numberOfHarmonics selected harmonics get a full peak, the others get a
+    quarter peak.
+
+    Args:
+        ratio (ndarray): Frequencies divided by the candidate fundamental.
+        numberOfHarmonics (int): Number of selected harmonics to include.
+
+    Returns:
+        ndarray: Kernel values, with the decay applied.
+    """
+    selectedHarmonics = KERNEL_HARMONICS[:numberOfHarmonics]
+
+    # The harmonic that owns each ratio, and the distance from it
+    harmonic = np.floor(ratio + KERNEL_VALLEY_WIDTH)
+    a = ratio - harmonic
+    inRange = (harmonic >= 1) & (harmonic <= KERNEL_HARMONICS[-1])
+
+    peakMask = inRange & (np.abs(a) < KERNEL_PEAK_WIDTH)
+    valleyMask = inRange & (a > -KERNEL_VALLEY_WIDTH) & (a <= -KERNEL_PEAK_WIDTH)
+
+    peakGain = np.where(np.isin(harmonic, selectedHarmonics), 1., 0.25)
+
+    k = np.zeros_like(ratio)
+    k[valleyMask] = -np.cos((a[valleyMask] + 0.5) / ((KERNEL_VALLEY_WIDTH - KERNEL_PEAK_WIDTH) / 2) * (np.pi / 2)) / KERNEL_VALLEY_DIVISOR
+    k[peakMask] = np.cos(a[peakMask] / KERNEL_PEAK_WIDTH * (np.pi / 2)) * peakGain[peakMask]
+
+    # Piecewise decay
+    decayStart = KERNEL_DECAY_START_HARMONIC + KERNEL_PEAK_WIDTH
+    k *= np.where(ratio <= decayStart, 1., np.sqrt(decayStart / ratio))
+
+    return k
+
+
+def calcCosineKernel(f: float, freqList: np.ndarray) -> np.ndarray:
+    """Generate a SWIPE-style kernel based on candidate frequency 'f'.
+
+    SWIPE kernels are normalized, continuous curves generated by sums of
+    positive and negative cosine lobes: positive lobes at the selected
+    harmonics and negative lobes between. This SWIPE implementation uses a
+    mixture of harmonics from SWIPE and SWIPE', tailored for a better match
+    to human voices. The magnitude of the kernels decays as the square root
+    of frequency, except for the fundamental and first harmonic, which are
+    given equal weighting.
+
+    Args:
+        f (float): Fundamental frequency (in Hz).
+        freqList (ndarray): Array of frequency bins for the kernel (in Hz).
+
+    Returns:
+        ndarray: Normalized kernel corresponding to the fundamental 'f'.
+    """
+    # Kernels don't need harmonics beyond the Nyquist frequency.
+    maxPossibleHarmonics = min(int(freqList[-1] / f), len(KERNEL_HARMONICS))
+
+    # Normalize frequencies around the current frequency, f. Useful for harmonic comparisons.
+    k = cosineKernelShape(freqList / f, maxPossibleHarmonics)
+
+    # Normalize the kernel to have a positive area of 1
+    k /= np.sum(k[k >0])
+
+    # Goose kernels with fewer harmonics
+    k /= maxPossibleHarmonics / len(KERNEL_HARMONICS)
+
+    return k
+
+class PitchTracker:
+    def __init__(
+        self,
+        input_buf: RingBuffer,
+        fft_size: int = DEFAULT_FFT_SIZE,
+        overlap: float = 0.75,
+        sample_rate: int = SAMPLING_RATE,
+        min_freq: float = DEFAULT_MIN_FREQ,
+        max_freq: float = DEFAULT_MAX_FREQ,
+        min_db: float = DEFAULT_MIN_DB,
+        cres: int = DEFAULT_C_RES,
+        conf: float = DEFAULT_P_CONF,
+        p_delta: int = DEFAULT_P_DELTA
+    ):
+        self.fft_size = fft_size
+        self.overlap = overlap
+        self.sample_rate = sample_rate
+        self.min_freq = min_freq
+        self.max_freq = max_freq
+        self.min_db = min_db
+        self.cres = cres
+        self.conf = conf
+        self.p_delta = p_delta
+        self.prev_f0: Optional[float] = None
+
+        self.input_buf = input_buf
+        self.frame_cursor = input_buf.frame_cursor(fft_size, self.hop_size())
+
+        self.out_buf = RingBuffer()
+        self.out_offset = self.out_buf.offset
+
+        self.proc = audioproc()
+        self.proc.set_fftsize(self.fft_size)
+
+        # Only generate the log-spaced pitch candidates and kernels for the SWIPE algorithm on instantiation.
+        self._init_swipe()
+
+    def set_input_buffer(self, new_buf: RingBuffer) -> None:
+        self.input_buf = new_buf
+        self.frame_cursor = new_buf.frame_cursor(self.fft_size, self.hop_size())
+
+    def hop_size(self) -> int:
+        return m.floor(self.fft_size * (1.0 - self.overlap))
+
+    def reserve_estimates(self, time_s: float) -> None:
+        """Declare the duration of the estimates that will be read."""
+        self.out_buf.reserve(m.floor(time_s / (self.hop_size() / self.sample_rate)) + 1)
+
+    def update(self) -> bool:
+        new = self.estimate_new_frames()
+        self.out_buf.push(new[np.newaxis, :], 0)
+        self.out_offset = self.out_buf.offset
+        return len(new) != 0
+
+    def estimate_new_frames(self) -> np.ndarray:
+        """Estimate the pitch of the complete new frames of the input buffer,
+        NaN where no pitch is found, without storing the estimates."""
+        block = self.frame_cursor.take()
+        if block.frame_count == 0:
+            return np.zeros(0)
+        # the spectra of the new frames, shared with the other docks
+        # that analyze the same frames
+        power = GetSTFTCache().power_spectra(
+            self.input_buf, 0, self.fft_size, self.hop_size(), block.stop, block.frame_count)
+        spectra = np.sqrt(power) * self.fft_size
+        return self.estimate_pitches(block.frames, spectra)
+
+    def skip_new_frames(self) -> None:
+        """Skip the complete new frames of the input buffer without analyzing
+        them. Their estimates are NaN, so that the later estimates keep their
+        place on the time axis."""
+        count = min(self.frame_cursor.skip(), self.out_buf.capacity)
+        self.out_buf.push(np.full((1, count), np.nan), 0)
+        self.out_offset = self.out_buf.offset
+
+    def get_estimates(self, time_s: float) -> np.ndarray:
+        num_results = m.floor(time_s / (self.hop_size() / self.sample_rate)) + 1
+        return self.out_buf.data_indexed(self.out_offset, num_results)[0,:]
+
+    def get_latest_estimate(self) -> float:
+        return self.out_buf.data_indexed(self.out_offset, 1)[0,0]
+
+    def new_frames(self) -> np.ndarray:
+        # (count, channels, fft_size) view of the complete new frames
+        return self.frame_cursor.take().frames
+
+    def _init_swipe(self) -> None:
+        """Initialize log-spaced frequency grid and SWIPE kernels.
+
+        Constructs the log-spaced frequency grid (up to Nyquist) and the SWIPE
+        kernels for frequencies up to the user selected max_freq.
+
+        The default pitch resolution (cres) of 10 cents produces 120 pitch
+        candidates per octave, which, after parabolic interpolation, is sufficient
+        to generate very precise pitch estimates.
+        """
+        numberOfLogSpacedFreqs = int(np.log2(self.sample_rate / (2 * self.min_freq)) * (1200 / self.cres))
+        self.logSpacedFreqs = np.logspace(np.log2(self.min_freq), np.log2(self.sample_rate // 2), num=numberOfLogSpacedFreqs, base=2)
+
+        # The pitch candidates for the kernels are a subset of the log-spaced freqs only up to the user's max_freq.
+        fMaxIndex = np.searchsorted(self.logSpacedFreqs, self.max_freq)
+        self.pitchCandidates = self.logSpacedFreqs[:fMaxIndex]
+        
+        # The log-spaced grid is geometric: sampled on the grid, the kernel of a
+        # candidate (see calcCosineKernel) only depends on the lag, the number
+        # of grid steps from the candidate, except for its normalization and
+        # for the harmonics that it selects. So instead of a dense
+        # (candidates x freqs) matrix, a few lag profiles are kept, and applied
+        # as cross-correlations computed with FFTs.
+        numberOfFreqs = len(self.logSpacedFreqs)
+        logStep = (np.log2(self.sample_rate // 2) - np.log2(self.min_freq)) / (numberOfFreqs - 1)
+        minLag = int(np.floor(np.log2(1 - KERNEL_VALLEY_WIDTH) / logStep))
+        maxLag = int(np.ceil(np.log2(KERNEL_HARMONICS[-1] + KERNEL_PEAK_WIDTH) / logStep))
+        lags = np.arange(minLag, maxLag + 1)
+        ratios = 2. ** (lags * logStep)
+
+        # long enough for the correlation not to wrap around
+        self.kernelFFTSize = 1 << int(np.ceil(np.log2(numberOfFreqs + maxLag - minLag)))
+
+        # Kernels don't need harmonics beyond the Nyquist frequency.
+        maxRatios = self.logSpacedFreqs[-1] / self.pitchCandidates
+        numberOfHarmonics = np.minimum(maxRatios.astype(int), len(KERNEL_HARMONICS))
+
+        # The selection only matters for the peaks that reach the grid. When
+        # all of them are selected, the kernel matches the one that selects all
+        # the harmonics, which is the case of most candidates.
+        visibleHarmonics = np.sum(KERNEL_HARMONICS[np.newaxis, :] - KERNEL_PEAK_WIDTH < maxRatios[:, np.newaxis], axis=1)
+        profileHarmonics = np.where(visibleHarmonics <= numberOfHarmonics, len(KERNEL_HARMONICS), numberOfHarmonics)
+
+        # (candidates, lag profile spectrum) for each distinct profile, and the
+        # normalization of each candidate
+        self.kernelGroups = []
+        self.kernelNormalization = np.empty(len(self.pitchCandidates))
+        candidates = np.arange(len(self.pitchCandidates))
+        for harmonics in np.unique(profileHarmonics)[::-1]:
+            group = candidates[profileHarmonics == harmonics]
+
+            profile = cosineKernelShape(ratios, harmonics)
+            circularProfile = np.zeros(self.kernelFFTSize)
+            circularProfile[lags % self.kernelFFTSize] = profile
+
+            # Positive area of each kernel on the grid, from the lag of the
+            # first freq (-j) to the lag of the last one
+            positiveArea = np.concatenate(([0.], np.cumsum(np.maximum(profile, 0.))))
+            first = np.clip(-group - minLag, 0, len(lags))
+            last = np.clip(numberOfFreqs - group - minLag, 0, len(lags))
+            self.kernelNormalization[group] = 1. / (positiveArea[last] - positiveArea[first]) / (numberOfHarmonics[group] / len(KERNEL_HARMONICS))
+
+            # contiguous candidates are sliced rather than gathered
+            if group[-1] - group[0] + 1 == len(group):
+                group = slice(group[0], group[-1] + 1)
+            self.kernelGroups.append((group, np.conj(np.fft.rfft(circularProfile))))
+
+        # Linear interpolation from the FFT bins to the log-spaced freqs, as a
+        # sparse operator with two taps per log-spaced freq: the lower bin and
+        # the weight of the upper one.
+        binPositions = self.logSpacedFreqs * (float(self.fft_size) / float(self.sample_rate))
+        numberOfBins = self.fft_size // 2 + 1
+        self.interpLowerBins = np.clip(np.floor(binPositions).astype(int), 0, numberOfBins - 2)
+        self.interpUpperBins = self.interpLowerBins + 1
+        self.interpWeights = np.clip(binPositions - self.interpLowerBins, 0., 1.)
+        self.logSpacedIndices = np.arange(len(self.logSpacedFreqs), dtype=np.float64)
+
+    def correlate_kernels(self, specLog: np.ndarray) -> np.ndarray:
+        """Correlate log-spaced spectra with the SWIPE kernels of all the
+        pitch candidates.
+
+        Equivalent to the product with the (candidates, log-spaced freqs)
+        matrix of calcCosineKernel, computed from the lag profiles of
+        _init_swipe.
+
+        Args:
+            specLog (ndarray): (count, log-spaced freqs) spectra.
+
+        Returns:
+            ndarray: (count, pitch candidates) strengths.
+        """
+        specLogFFT = np.fft.rfft(specLog, n=self.kernelFFTSize, axis=1)
+        pitchStrengths = np.empty((specLog.shape[0], len(self.pitchCandidates)))
+        for group, profileFFT in self.kernelGroups:
+            correlation = np.fft.irfft(specLogFFT * profileFFT, n=self.kernelFFTSize, axis=1)
+            pitchStrengths[:, group] = correlation[:, group]
+        pitchStrengths *= self.kernelNormalization
+        return pitchStrengths
+
+    def estimate_pitch(self, frame: np.ndarray, spectrum: Optional[np.ndarray] = None) -> Optional[float]:
+        """Estimate the fundamental frequency from a single audio frame.
+
+        See estimate_pitches, of which this is the single-frame case.
+
+        Args:
+            frame (np.ndarray): A 2D array containing one audio frame.
+            spectrum (Optional[np.ndarray]): The amplitude spectrum of the
+                windowed first channel of the frame, if already computed.
+
+        Returns:
+            Optional[float]: Estimated pitch in Hz, or NaN if unvoiced.
+        """
+        spectra = None if spectrum is None else spectrum[np.newaxis, :]
+        return self.estimate_pitches(frame[np.newaxis, ...], spectra)[0]
+
+    def estimate_pitches(self, frames: np.ndarray, spectra: Optional[np.ndarray] = None) -> np.ndarray:
+        """Estimate the fundamental frequencies of a sequence of audio frames.
+
+        Each frame's spectrum amplitude, linearly spaced, is resampled onto a
+        log-spaced frequency grid and correlated against SWIPE-like kernels.
+        The strongest match is refined via parabolic interpolation to achieve
+        sub-bin pitch precision. All the frames are processed at once, except
+        for the pitch jump rule that depends on the previous estimate.
+
+        Args:
+            frames (np.ndarray): A (count, channels, fft_size) array of frames.
+            spectra (Optional[np.ndarray]): The (count, fft_size // 2 + 1)
+                amplitude spectra of the windowed first channel of the
+                frames, if already computed.
+
+        Returns:
+            np.ndarray: Estimated pitches in Hz, NaN where unvoiced.
+        """
+        if frames.shape[0] == 0:
+            return np.zeros(0)
+
+        if spectra is None:
+            spectra = np.abs(np.fft.rfft(frames[:, 0, :] * self.proc.window, axis=-1))
+
+        # Resample the spectra onto the log-spaced frequencies and normalize
+        lower = spectra[:, self.interpLowerBins]
+        upper = spectra[:, self.interpUpperBins]
+        specLog = lower + self.interpWeights * (upper - lower)
+        specLogRMS = np.sqrt(np.einsum('ij,ij->i', specLog, specLog) / specLog.shape[1])
+
+        # Get the correlation between the normalized spectra of the audio
+        # frames and the kernels, (count, pitch candidates)
+        pitchStrengths = self.correlate_kernels(specLog)
+        pitchStrengths /= specLogRMS[:, np.newaxis]
+
+        # Get the highest strength index
+        idxMax = np.argmax(pitchStrengths, axis=1)
+        rows = np.arange(pitchStrengths.shape[0])
+
+        # The highest values for pitchStrength (confidence) will come from
+        # voiced pitches that nearly identically match the kernel for that
+        # pitch, with a peak correlation product of around 2.56.
+
+        # Use parabolic interp to get frequency values between resolution bins
+        last = pitchStrengths.shape[1] - 1
+        interior = (idxMax > 0) & (idxMax < last)
+        y1 = pitchStrengths[rows, np.maximum(idxMax - 1, 0)]
+        y2 = pitchStrengths[rows, idxMax]
+        y3 = pitchStrengths[rows, np.minimum(idxMax + 1, last)]
+        idxShift, _ = fastParabolicInterp(y1, y2, y3)
+        idxShift = np.where(interior, idxShift, 0.)
+
+        # Generate and refine the pitch estimates by creating a mapping from indices
+        # to frequency and applying it to idxMax with the interpolated index offset.
+        f0 = np.interp(idxMax + idxShift, self.logSpacedIndices, self.logSpacedFreqs)
+
+        # Get dBFS of the frames.
+        # Only signals above user's min_db threshold will be considered voiced.
+        samples = frames.reshape(frames.shape[0], -1)
+        RMS = np.sqrt(np.einsum('ij,ij->i', samples, samples) / samples.shape[1])
+        dBFS = 20 * np.log10(RMS + np.finfo(np.float64).eps)
+
+        # Scale the correlation strength (confidence) to be between 0 and 1
+        pitchConf = y2 / 2.56
+
+        # Bool conditions for unreliable pitch estimate
+        pitchUnreliable = (dBFS < self.min_db) | (pitchConf < self.conf)
+
+        # Exclude pitch jumps greater than p_delta semitones from the previous
+        # pitch. Whether a frame has a previous pitch depends on the decision
+        # for that previous frame, so this part runs frame by frame.
+        previous = np.concatenate(([np.nan if self.prev_f0 is None else self.prev_f0], f0[:-1]))
+        pitchJump = 12 * np.abs(np.log2(f0 / previous)) > self.p_delta
+
+        pitches = np.full(f0.shape, np.nan)
+        voiced = self.prev_f0 is not None
+        for i in range(f0.shape[0]):
+            voiced = not (pitchUnreliable[i] or (voiced and pitchJump[i]))
+            if voiced:
+                pitches[i] = f0[i]
+
+        if f0.shape[0] > 0:
+            self.prev_f0 = f0[-1] if voiced else None
+
+        return pitches
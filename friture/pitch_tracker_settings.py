@@ -23,15 +23,18 @@ from typing import Any
 
 from friture.audiobackend import SAMPLING_RATE
 
-# Pitch tracker defaults:
-DEFAULT_FFT_SIZE = 4096
-DEFAULT_MIN_FREQ = 65
-DEFAULT_MAX_FREQ = 1047
+from friture.pitch_estimator import (
+    DEFAULT_FFT_SIZE,
+    DEFAULT_MIN_FREQ,
+    DEFAULT_MAX_FREQ,
+    DEFAULT_MIN_DB,
+    DEFAULT_C_RES,
+    DEFAULT_P_CONF,
+    DEFAULT_P_DELTA,
+)
+
+# Pitch tracker defaults, see also the ones of the estimator:
 DEFAULT_DURATION = 10
-DEFAULT_MIN_DB = -50.0
-DEFAULT_C_RES = 10      # Pitch resolution in cents. Default of 10 produces 120 kernels per octave.
-DEFAULT_P_CONF = 0.50   # Confidence threshold for pitch estimation. Unitless.
-DEFAULT_P_DELTA = 2     # Maximum pitch jump between frames in semitones.
 
 class PitchTrackerSettingsDialog(QtWidgets.QDialog):
     def __init__(self, parent: QtWidgets.QWidget, view_model: Any) -> None:
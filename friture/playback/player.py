@@ -47,7 +47,7 @@ class Player(QObject):
         self.history_sec = DEFAULT_HISTORY_LENGTH_S
         self.history_samples = self.history_sec * SAMPLING_RATE
         self.buffer = RingBuffer()
-        self.buffer.grow_if_needed(self.history_samples)
+        self.buffer.reserve(self.history_samples)
         self.recorded_len = 0
         self.stopping.connect(self.on_stopping)
 
@@ -66,7 +66,7 @@ class Player(QObject):
 
         self.history_sec = new_len
         self.history_samples = self.history_sec * SAMPLING_RATE
-        self.buffer.grow_if_needed(self.history_samples)
+        self.buffer.reserve(self.history_samples)
 
         # Handle the case where the current play position is truncated out
         # (will result in a skip in playback)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Floating-point precision of the audio processing.
+
+The audio devices deliver float32 samples. By default they are converted
+to float64 and processed in double precision. In single precision mode
+(--float32), the samples, the analysis windows, the FFT outputs and the
+smoothing states are kept in float32, which halves the memory bandwidth.
+The recursive filters (octave bands, decimation) stay in double precision,
+where the rounding errors would accumulate.
+
+The precision is chosen once at startup, before the audio backend and the
+widgets are created.
+"""
+
+import numpy as np
+
+_sample_dtype: np.dtype = np.dtype(np.float64)
+
+
+def set_single_precision(enabled: bool) -> None:
+    global _sample_dtype
+    _sample_dtype = np.dtype(np.float32 if enabled else np.float64)
+
+
+def sample_dtype() -> np.dtype:
+    """The floating-point type of the samples and of the spectra."""
+    return _sample_dtype
@@ -17,114 +17,319 @@
 # You should have received a copy of the GNU General Public License
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
-# FIXME problem when self.offset overflows the MAXINT limit !
+"""Fixed-capacity circular buffer of multichannel audio samples.
+
+The samples are addressed by their absolute position in the stream:
+'offset' counts all the samples pushed so far. It is a Python integer, so
+it never overflows, and positions are mapped into the buffer with a mask,
+the capacity being a power of two.
+
+Every sample is stored twice, at 'position & mask' and one capacity further,
+so that any run of at most 'capacity' consecutive samples is a contiguous
+slice of the storage and can be returned as a view without any copy.
+
+The capacity is reserved up front: each consumer declares the longest
+history it reads with reserve() when it registers (or when its settings
+change). Pushing and reading never reallocate.
+
+One writer thread and any number of reader threads can use the buffer
+concurrently. The readers do not take any lock: the writer stores the
+samples before publishing the new offset, and a reallocation (in reserve(),
+or when the channel count or the sample type changes) swaps in a new
+storage array with a single assignment. WRITE_HEADROOM samples on top of
+each reservation keep the samples a reader is looking at from being
+overwritten by the block that the writer is pushing meanwhile.
+"""
 
 import logging
+import threading
+from typing import NamedTuple, Union, overload
+
+from numpy import arange, zeros, ndarray
+from numpy.lib.stride_tricks import as_strided
+from friture.audio_format import SAMPLING_RATE
+from friture.precision import sample_dtype
+
+# samples that can be pushed while a reader looks at the reserved history
+WRITE_HEADROOM = 8192
+
+DEFAULT_HISTORY = 8192
+
 
-from numpy import zeros, ndarray
-from friture.audiobackend import SAMPLING_RATE
+def next_power_of_two(n: int) -> int:
+    return 1 << max(0, int(n) - 1).bit_length()
 
 
 class RingBuffer():
 
-    def __init__(self):
+    def __init__(self, history: int = DEFAULT_HISTORY):
         self.logger = logging.getLogger(__name__)
 
-        # buffer length is dynamic based on the needs
-        self.buffer_length = 10000
-        self.buffer = zeros((1, 2 * self.buffer_length))
+        # serializes the writer and the reservations
+        self.write_lock = threading.Lock()
+
+        capacity = next_power_of_two(history + WRITE_HEADROOM)
+        self.buffer = zeros((1, 2 * capacity), dtype=sample_dtype())
         self.offset = 0
-        self.offset_time = 0
+        # (offset, stream time) of the end of the last push, read as a whole
+        self.time_reference = (0, 0.)
 
-    def push(self, floatdata: ndarray, input_time: float) -> None:
-        # update the circular buffer
+    @property
+    def capacity(self) -> int:
+        return self.buffer.shape[1] // 2
 
-        dim = floatdata.shape[0]
-        l = floatdata.shape[1]
+    def readable_length(self) -> int:
+        """The number of most recent samples that can be safely read."""
+        return self.capacity - WRITE_HEADROOM
+
+    def reserve(self, length: int) -> None:
+        """Make sure that the most recent 'length' samples can be read.
+
+        The buffer is reallocated if needed. The samples that it currently
+        holds are kept, at the same positions."""
+        with self.write_lock:
+            if length <= self.readable_length():
+                return
+
+            old_buffer = self.buffer
+            capacity = next_power_of_two(length + WRITE_HEADROOM)
+
+            self.logger.info("Ringbuffer: reserving capacity %d for length %d", capacity, length)
+
+            buffer = zeros((old_buffer.shape[0], 2 * capacity), dtype=old_buffer.dtype)
+            kept = min(self.offset, old_buffer.shape[1] // 2)
+            if kept > 0:
+                history = self._view(old_buffer, self.offset, kept)
+                self._store(buffer, self.offset - kept, history)
+            self.buffer = buffer
 
-        if dim != self.buffer.shape[0]:
-            # switched from single to dual channels or vice versa
-            self.buffer = zeros((dim, 2 * self.buffer_length))
+    def push(self, floatdata: ndarray, input_time: float = 0.) -> None:
+        with self.write_lock:
+            dim = floatdata.shape[0]
+            l = floatdata.shape[1]
 
-        self.grow_if_needed(l)
+            buffer = self.buffer
+            capacity = buffer.shape[1] // 2
+
+            if dim != buffer.shape[0]:
+                # switched from single to dual channels or vice versa
+                buffer = zeros((dim, 2 * capacity), dtype=buffer.dtype)
+
+            if floatdata.dtype.kind == 'f' and floatdata.dtype != buffer.dtype:
+                # switched between single and double precision samples
+                buffer = zeros((dim, 2 * capacity), dtype=floatdata.dtype)
+
+            # when more than a full capacity is pushed at once, only the most
+            # recent samples can be kept
+            written = min(l, capacity)
+            self._store(buffer, self.offset + l - written, floatdata[:, l - written:])
+
+            self.buffer = buffer
+            # publish the new samples, after they have been stored
+            self.offset += l
+            self.time_reference = (self.offset, input_time)
+
+    @staticmethod
+    def _store(buffer: ndarray, position: int, floatdata: ndarray) -> None:
+        # write at most one capacity of samples, starting at the absolute 'position'
+        capacity = buffer.shape[1] // 2
+        l = floatdata.shape[1]
+        start = position & (capacity - 1)
 
         # first copy, always complete
-        offset = self.offset % self.buffer_length
-        self.buffer[:, offset: offset + l] = floatdata[:, :]
+        buffer[:, start: start + l] = floatdata
         # second copy, can be folded
-        direct = min(l, self.buffer_length - offset)
+        direct = min(l, capacity - start)
         folded = l - direct
-        self.buffer[:, offset + self.buffer_length: offset + self.buffer_length + direct] = floatdata[:, 0: direct]
-        self.buffer[:, :folded] = floatdata[:, direct:]
+        buffer[:, start + capacity: start + capacity + direct] = floatdata[:, :direct]
+        buffer[:, :folded] = floatdata[:, direct:]
 
-        self.offset += l
-        self.offset_time = input_time
+    @staticmethod
+    def _view(buffer: ndarray, stop: int, length: int) -> ndarray:
+        # the 'length' samples ending at the absolute position 'stop'
+        capacity = buffer.shape[1] // 2
+        if length > capacity or length < 0:
+            raise ArithmeticError("Length %d does not fit in the buffer capacity %d, it must be reserved" % (length, capacity))
+
+        stop0 = (stop & (capacity - 1)) + capacity
+        return buffer[:, stop0 - length: stop0]
 
     def data(self, length):
-        self.grow_if_needed(length)
+        return self._view(self.buffer, self.offset, length)
 
-        stop = self.offset % self.buffer_length + self.buffer_length
-        start = stop - length
+    def data_older(self, length, delay_samples):
+        return self._view(self.buffer, self.offset - delay_samples, length)
 
-        while stop > 2 * self.buffer_length:
-            self.grow_if_needed(stop)
-            stop = self.offset % self.buffer_length + self.buffer_length
-            start = stop - length
+    def data_indexed(self, start, length):
+        return self._view(self.buffer, start, length)
 
-        if start > 2 * self.buffer_length or start < 0:
-            raise ArithmeticError("Start index is wrong %d %d" % (start, self.buffer_length))
-        if stop > 2 * self.buffer_length:
-            raise ArithmeticError("Stop index is larger than buffer size: %d > %d" % (stop, 2 * self.buffer_length))
-        return self.buffer[:, start: stop]
+    def data_frames(self, stop: int, length: int, hop: int, count: int) -> ndarray:
+        """The 'count' overlapping frames of 'length' samples, spaced by 'hop'
+        samples, the last one ending at the position defined by 'stop'.
 
-    def data_older(self, length, delay_samples):
-        self.grow_if_needed(length + delay_samples)
+        The frames are returned as a (channels, count, length) strided view
+        of the buffer, without any copy."""
+        span = length + (count - 1) * hop
+        data = self.data_indexed(stop, span)
+        if count == 1:
+            # common case with large FFT sizes, as_strided has a measurable overhead
+            return data[:, None, :]
+        channel_stride, sample_stride = data.strides
+        return as_strided(data,
+                          shape=(data.shape[0], count, length),
+                          strides=(channel_stride, hop * sample_stride, sample_stride),
+                          writeable=False)
 
-        start = (self.offset - length - delay_samples) % self.buffer_length + self.buffer_length
-        stop = start + length
-        return self.buffer[:, start: stop]
+    @overload
+    def data_time(self, start: int) -> float: ...
 
-    def data_indexed(self, start, length):
-        delay = self.offset - start
-        self.grow_if_needed(length + delay)
-
-        stop0 = start % self.buffer_length + self.buffer_length
-        start0 = stop0 - length
-
-        if start0 > 2 * self.buffer_length or start0 < 0:
-            raise ArithmeticError("Start index is wrong %d %d" % (start0, self.buffer_length))
-        if stop0 > 2 * self.buffer_length:
-            raise ArithmeticError("Stop index is larger than buffer size: %d > %d" % (stop0, 2 * self.buffer_length))
-
-        return self.buffer[:, start0: stop0]
-
-    def data_time(self, start: int) -> float:
-        """The stream time in seconds at the position defined by 'start'."""
-        return self.offset_time + (start - self.offset) / SAMPLING_RATE
-
-    def grow_if_needed(self, length):
-        if length > self.buffer_length:
-            # let the buffer grow according to our needs
-            old_length = self.buffer_length
-            new_length = int(1.5 * length)
-
-            self.logger.info("Ringbuffer: growing buffer for length %d", new_length)
-
-            # create new buffer
-            newbuffer = zeros((self.buffer.shape[0], 2 * new_length))
-            # copy existing data so that self.offset does not have to be changed
-            old_offset_mod = self.offset % old_length
-            new_offset_mod = self.offset % new_length
-            shift = new_offset_mod - old_offset_mod
-            # shift can be negative, computing modulo again
-            shift %= new_length
-            # first copy, always complete
-            newbuffer[:, shift:shift + old_length] = self.buffer[:, :old_length]
-            # second copy, can be folded
-            direct = min(old_length, new_length - shift)
-            folded = old_length - direct
-            newbuffer[:, new_length + shift:new_length + shift + direct] = self.buffer[:, :direct]
-            newbuffer[:, :folded] = self.buffer[:, direct:direct + folded]
-            # assign self.butter to the new larger buffer
-            self.buffer = newbuffer
-            self.buffer_length = new_length
+    @overload
+    def data_time(self, start: ndarray) -> ndarray: ...
+
+    def data_time(self, start: Union[int, ndarray]) -> Union[float, ndarray]:
+        """The stream time in seconds at the position defined by 'start', or
+        at each of the positions of an array."""
+        offset, time = self.time_reference
+        return time + (start - offset) / SAMPLING_RATE
+
+    def cursor(self, history: int = 0) -> "RingBufferCursor":
+        """A new read position, at the current end of the buffer."""
+        return RingBufferCursor(self, history)
+
+    def frame_cursor(self, frame_length: int, hop: int) -> "FrameCursor":
+        """A new reader of the overlapping frames pushed from now on."""
+        return FrameCursor(self, frame_length, hop)
+
+
+class RingBufferCursor():
+    """The read position of one consumer of a RingBuffer.
+
+    'position' is an absolute position in the stream, and 'history' is the
+    number of samples before it that the consumer reads, for example the
+    length of the frames that end at 'position'. The history is reserved in
+    the ring buffer.
+
+    The consumers that analyze frames on a grid align the position on it with
+    align(). The position then stays on the grid as long as it is advanced by
+    multiples of the grid step.
+    """
+
+    def __init__(self, ringbuffer: RingBuffer, history: int = 0):
+        self.ringbuffer = ringbuffer
+        self.history = 0
+        self.step = 1
+        # number of times the consumer fell behind and skipped samples
+        self.overruns = 0
+
+        self.set_history(history)
+        self.position = ringbuffer.offset
+
+    def set_history(self, history: int) -> None:
+        self.history = history
+        self.ringbuffer.reserve(history)
+
+    def align(self, step: int) -> None:
+        """Move the position back to the previous multiple of 'step'."""
+        self.step = step
+        self.position -= self.position % step
+
+    def available(self) -> int:
+        """The number of samples pushed after the position (can be negative).
+
+        If the consumer fell so far behind that the history of its position
+        has been overwritten, the position first jumps forward to the oldest
+        one, on the grid, whose history is still in the buffer."""
+        offset = self.ringbuffer.offset
+        oldest = offset - self.ringbuffer.capacity + self.history
+        if self.position < oldest:
+            self.ringbuffer.logger.info("Ringbuffer: reader overrun, skipping %d samples", oldest - self.position)
+            # round up to the grid
+            self.position = -(-oldest // self.step) * self.step
+            self.overruns += 1
+        return offset - self.position
+
+    def advance(self, length: int) -> None:
+        self.position += length
+
+    def reset(self) -> None:
+        """Skip all the samples pushed so far."""
+        self.position = self.ringbuffer.offset
+
+
+class FrameBlock(NamedTuple):
+    """The overlapping frames returned by FrameCursor.take()."""
+
+    # (count, channels, frame_length) read-only view of the ring buffer
+    frames: ndarray
+    # stream time in seconds at the end of each frame
+    times: ndarray
+    # buffer position at which the last frame ends
+    stop: int
+
+    @property
+    def frame_count(self) -> int:
+        return self.frames.shape[0]
+
+
+class FrameCursor():
+    """Reads all the new overlapping frames of a ring buffer at once.
+
+    The frames are 'frame_length' samples long and end on the multiples of
+    'hop', the grid shared with the other docks through the STFT cache. The
+    first frame ends at least 'frame_length' samples after the registration.
+    """
+
+    def __init__(self, ringbuffer: RingBuffer, frame_length: int, hop: int):
+        self.ringbuffer = ringbuffer
+        # the cursor position is the end of the next frame
+        self.cursor = RingBufferCursor(ringbuffer)
+        self.cursor.advance(frame_length)
+
+        self.frame_length = frame_length
+        self.hop = hop
+        self.configure(frame_length, hop)
+
+    def configure(self, frame_length: int, hop: int) -> None:
+        self.frame_length = frame_length
+        self.hop = hop
+        self.cursor.set_history(frame_length)
+        self.cursor.align(hop)
+
+    def pending(self) -> int:
+        """The number of complete frames that take() would return."""
+        available = self.cursor.available()
+        return available // self.hop + 1 if available >= 0 else 0
+
+    def take(self) -> FrameBlock:
+        """All the complete frames since the previous call."""
+        count = self.pending()
+        first = self.cursor.position
+        stop = first + (count - 1) * self.hop
+
+        if count > 0:
+            frames = self.ringbuffer.data_frames(stop, self.frame_length, self.hop, count).transpose(1, 0, 2)
+        else:
+            buffer = self.ringbuffer.buffer
+            frames = zeros((0, buffer.shape[0], self.frame_length), dtype=buffer.dtype)
+
+        times = self.ringbuffer.data_time(first + self.hop * arange(count))
+
+        self.cursor.advance(count * self.hop)
+        return FrameBlock(frames, times, stop)
+
+    def skip(self) -> int:
+        """Skip all the complete frames since the previous call, without
+        reading them, and return their number.
+
+        Unlike take(), the skipped frames may be older than the history kept
+        in the ring buffer. The next frames stay on the grid."""
+        available = self.ringbuffer.offset - self.cursor.position
+        count = available // self.hop + 1 if available >= 0 else 0
+        self.cursor.advance(count * self.hop)
+        return count
+
+    def reset(self) -> None:
+        """Skip all the samples pushed so far."""
+        self.cursor.reset()
+        self.cursor.advance(self.frame_length)
+        self.cursor.align(self.hop)
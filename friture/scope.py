@@ -64,6 +64,10 @@ class Scope_Widget(QObject):
         self.time = zeros(10)
         self.y = zeros(10)
         self.y2 = zeros(10)
+
+        self.channels = 1
+        # whether new data is waiting to be drawn
+        self.curves_pending = False
     
     def qml_file_name(self):
         return "Scope.qml"
@@ -74,12 +78,23 @@ class Scope_Widget(QObject):
     # method
     def set_buffer(self, buffer):
         self.audiobuffer = buffer
+        self.reserve_history()
+
+    def reserve_history(self):
+        # the trigger mode reads two time ranges
+        if self.audiobuffer is not None:
+            self.audiobuffer.reserve(2 * int(self.timerange * 1e-3 * SAMPLING_RATE))
 
     def handle_new_data(self, floatdata):
+        # the latest samples are read when the dock is updated
+        self.channels = floatdata.shape[0]
+        self.curves_pending = True
+
+    def update_curves(self):
         time = self.timerange * 1e-3
         width = int(time * SAMPLING_RATE)
 
-        twoChannels = floatdata.shape[0] > 1
+        twoChannels = self.channels > 1
 
         if twoChannels and len(self._scope_data.plot_items) == 1:
             self._scope_data.add_plot_item(self._curve_2)
@@ -134,7 +149,9 @@ class Scope_Widget(QObject):
 
     # method
     def canvasUpdate(self):
-        return
+        if self.curves_pending:
+            self.curves_pending = False
+            self.update_curves()
 
     def pause(self):
         return
@@ -146,6 +163,7 @@ class Scope_Widget(QObject):
     def set_timerange(self, timerange):
         self.timerange = timerange
         self._scope_data.horizontal_axis.setRange(-self.timerange/2., self.timerange/2.)
+        self.reserve_history()
 
     # slot
     def settings_called(self, checked):
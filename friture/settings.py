@@ -78,25 +78,16 @@ class Settings_Dialog(QtWidgets.QDialog, Ui_Settings_Dialog):
         for device in devices:
             self.comboBox_inputDevice.addItem(device)
 
-        channels = AudioBackend().get_readable_current_channels()
-        for channel in channels:
-            self.comboBox_firstChannel.addItem(channel)
-            self.comboBox_secondChannel.addItem(channel)
-
         current_device = AudioBackend().get_readable_current_device()
         self.comboBox_inputDevice.setCurrentIndex(current_device)
 
-        first_channel = AudioBackend().get_current_first_channel()
-        self.comboBox_firstChannel.setCurrentIndex(first_channel)
-        second_channel = AudioBackend().get_current_second_channel()
-        self.comboBox_secondChannel.setCurrentIndex(second_channel)
+        self.reset_channels()
 
         # signals
         self.comboBox_inputDevice.currentIndexChanged.connect(self.input_device_changed)
-        self.comboBox_firstChannel.activated.connect(self.first_channel_changed)
-        self.comboBox_secondChannel.activated.connect(self.second_channel_changed)
-        self.radioButton_single.toggled.connect(self.single_input_type_selected)
-        self.radioButton_duo.toggled.connect(self.duo_input_type_selected)
+        self.comboBox_firstChannel.activated.connect(self.channel_changed)
+        self.comboBox_secondChannel.activated.connect(self.channel_changed)
+        self.inputTypeButtonGroup.buttonToggled.connect(self.input_type_toggled)
         self.checkbox_showPlayback.stateChanged.connect(self.show_playback_checkbox_changed)
         self.spinBox_historyLength.editingFinished.connect(self.history_length_edit_finished)
 
@@ -124,7 +115,15 @@ class Settings_Dialog(QtWidgets.QDialog, Ui_Settings_Dialog):
             error_message.setWindowTitle("Input device error")
             error_message.showMessage("Impossible to use the selected input device, reverting to the previous one")
 
-        # reset the channels
+        # reset the channels, and keep the type of input
+        self.reset_channels()
+        self.select_channels()
+
+        self._toolbar_view_model.recording = True
+
+    # method
+    # fill the channel combo boxes for the current device
+    def reset_channels(self):
         channels = AudioBackend().get_readable_current_channels()
 
         self.comboBox_firstChannel.clear()
@@ -134,60 +133,44 @@ class Settings_Dialog(QtWidgets.QDialog, Ui_Settings_Dialog):
             self.comboBox_firstChannel.addItem(channel)
             self.comboBox_secondChannel.addItem(channel)
 
-        first_channel = AudioBackend().get_current_first_channel()
-        self.comboBox_firstChannel.setCurrentIndex(first_channel)
-        second_channel = AudioBackend().get_current_second_channel()
-        self.comboBox_secondChannel.setCurrentIndex(second_channel)
-
-        self._toolbar_view_model.recording = True
+        self.comboBox_firstChannel.setCurrentIndex(0)
+        self.comboBox_secondChannel.setCurrentIndex(min(1, len(channels) - 1))
 
-    # slot
-    def first_channel_changed(self, index):
-        self._toolbar_view_model.recording = False
-
-        success, index = AudioBackend().select_first_channel(index)
+    # method
+    # the channel map described by the type of input and the channel combo boxes
+    def channel_map(self):
+        if self.radioButton_all.isChecked():
+            return list(range(self.comboBox_firstChannel.count()))
+        elif self.radioButton_duo.isChecked():
+            return [self.comboBox_firstChannel.currentIndex(), self.comboBox_secondChannel.currentIndex()]
+        else:
+            return [self.comboBox_firstChannel.currentIndex()]
 
-        self.comboBox_firstChannel.setCurrentIndex(index)
+    # method
+    def select_channels(self):
+        success, channel_map = AudioBackend().select_channels(self.channel_map())
 
         if not success:
             # Note: the error message is a child of the settings dialog, so that
             # that dialog remains on top when the error message is closed
             error_message = QtWidgets.QErrorMessage(self)
             error_message.setWindowTitle("Input device error")
-            error_message.showMessage("Impossible to use the selected channel as the first channel, reverting to the previous one")
+            error_message.showMessage("Impossible to use the selected channels, reverting to the previous ones")
 
-        self._toolbar_view_model.recording = True
+        self.logger.info("Input channels: %s", channel_map)
 
     # slot
-    def second_channel_changed(self, index):
+    def channel_changed(self, index):
         self._toolbar_view_model.recording = False
-
-        success, index = AudioBackend().select_second_channel(index)
-
-        self.comboBox_secondChannel.setCurrentIndex(index)
-
-        if not success:
-            # Note: the error message is a child of the settings dialog, so that
-            # that dialog remains on top when the error message is closed
-            error_message = QtWidgets.QErrorMessage(self)
-            error_message.setWindowTitle("Input device error")
-            error_message.showMessage("Impossible to use the selected channel as the second channel, reverting to the previous one")
-
+        self.select_channels()
         self._toolbar_view_model.recording = True
 
     # slot
-    def single_input_type_selected(self, checked):
-        if checked:
-            self.groupBox_second.setEnabled(False)
-            AudioBackend().set_single_input()
-            self.logger.info("Switching to single input")
-
-    # slot
-    def duo_input_type_selected(self, checked):
+    def input_type_toggled(self, button, checked):
         if checked:
-            self.groupBox_second.setEnabled(True)
-            AudioBackend().set_duo_input()
-            self.logger.info("Switching to difference between two inputs")
+            self.groupBox_first.setEnabled(button is not self.radioButton_all)
+            self.groupBox_second.setEnabled(button is self.radioButton_duo)
+            self.select_channels()
 
     # slot
     def show_playback_checkbox_changed(self, state: int) -> None:
@@ -227,7 +210,10 @@ class Settings_Dialog(QtWidgets.QDialog, Ui_Settings_Dialog):
             channel = settings.value("secondChannel", 0, type=int)
             self.comboBox_secondChannel.setCurrentIndex(channel)
             duo_input_id = settings.value("duoInput", 0, type=int)
-            self.inputTypeButtonGroup.button(duo_input_id).setChecked(True)
+            input_type_button = self.inputTypeButtonGroup.button(duo_input_id)
+            if input_type_button is not None:
+                input_type_button.setChecked(True)
+            self.select_channels()
         self.checkbox_showPlayback.setCheckState(QtCore.Qt.CheckState(settings.value("showPlayback", 0, type=int)))
         self.spinBox_historyLength.setValue(settings.value("historyLength", 30, type=int))
         theme_preference_id = settings.value("themePreference", 0, type=int)
@@ -41,3 +41,129 @@ def generalized_cross_correlation(d0, d1):
     Xcorr = irfft(W * G)
 
     return Xcorr
+
+# half-width, in samples, of the interpolation kernel of the correlation
+SINC_HALF_WIDTH = 16
+
+
+def parabola_vertex(left, center, right, step):
+    """Offset of the vertex of the parabola through three equally-spaced values,
+    or 0 if they do not make a peak."""
+    curvature = left - 2. * center + right
+    if curvature >= 0.:
+        return 0.
+    return step * 0.5 * (left - right) / curvature
+
+
+class Accumulating_GCC_PHAT:
+    """Generalized cross-correlation with phase transform (PHAT), smoothed
+    over successive frames.
+
+    The PHAT-weighted cross-power spectra of the frames are smoothed
+    exponentially in the frequency domain. Since the inverse FFT is linear,
+    this is the same as smoothing the correlations in the lag domain, but
+    the correlation is only computed, with a single inverse FFT, when an
+    estimate is requested.
+    """
+
+    def __init__(self, alpha=0.3):
+        # weight of a new frame in the exponential smoothing
+        self.alpha = alpha
+        self.length = 0
+        self.window = numpy.zeros(0)
+        self.reset()
+
+    def reset(self):
+        # smoothed cross-power spectrum, None until a frame has been pushed
+        self.cross_spectrum = None
+        # whether the last frame had a signal on both channels
+        self.last_frame_valid = False
+
+    def push(self, d0, d1):
+        """Accumulate the frames of the two channels, given as (count, length) arrays."""
+        count, length = d0.shape
+        if count == 0:
+            return
+
+        if length != self.length:
+            self.length = length
+            # Hann window to mitigate non-periodicity effects
+            self.window = numpy.hanning(length)
+            self.reset()
+
+        # frames where a channel is silent carry no delay information
+        valid = (d0.std(axis=1) > 0.) & (d1.std(axis=1) > 0.)
+        self.last_frame_valid = bool(valid[-1])
+        d0 = d0[valid]
+        d1 = d1[valid]
+        if d0.shape[0] == 0:
+            return
+
+        # substract the means and window, for all the frames at once
+        D0 = rfft((d0 - d0.mean(axis=1, keepdims=True)) * self.window, axis=1)
+        D1 = rfft((d1 - d1.mean(axis=1, keepdims=True)) * self.window, axis=1)
+        G = D0.conjugate() * D1
+        absG = numpy.abs(G)
+        m = absG.max(axis=1, keepdims=True)
+        G /= 1e-10 * m + absG  # weight for a normalized "PHAT" cross-correlation
+
+        if self.cross_spectrum is None:
+            self.cross_spectrum = G[0]
+            G = G[1:]
+
+        # exponential smoothing of the frames in sequence, in closed form
+        n = G.shape[0]
+        if n > 0:
+            weights = self.alpha * (1. - self.alpha) ** numpy.arange(n - 1, -1, -1)
+            self.cross_spectrum = (1. - self.alpha) ** n * self.cross_spectrum + weights @ G
+
+    def correlation(self):
+        """The smoothed cross-correlation, indexed by lag (circularly)."""
+        if self.cross_spectrum is None:
+            return numpy.zeros(self.length)
+        return irfft(self.cross_spectrum, n=self.length)
+
+    def correlation_at(self, Xcorr, lags):
+        """The smoothed cross-correlation at fractional lags, interpolated from
+        its samples with a windowed sinc (it is band-limited)."""
+        offsets = numpy.arange(-SINC_HALF_WIDTH, SINC_HALF_WIDTH + 1)
+        nearest = numpy.floor(lags).astype(int)
+        # (lags, taps) distances from the lags to the samples around them
+        distances = lags[:, numpy.newaxis] - (nearest[:, numpy.newaxis] + offsets)
+        kernel = numpy.sinc(distances) * (0.5 + 0.5 * numpy.cos(numpy.pi * distances / (SINC_HALF_WIDTH + 1)))
+        samples = Xcorr[(nearest[:, numpy.newaxis] + offsets) % self.length]
+        return (kernel * samples).sum(axis=1)
+
+    def estimate(self):
+        """Estimate the delay of the second channel relative to the first one.
+
+        Returns the lag in samples, between -length/2 and length/2 and refined
+        below one sample by parabolic interpolation of the correlation peak,
+        the correlation at the peak (negative for reversed polarity), and the
+        ratio of the peak to three standard deviations of the correlation.
+        """
+        if self.cross_spectrum is None:
+            return 0., 0., 0.
+
+        Xcorr = self.correlation()
+        absXcorr = numpy.abs(Xcorr)
+        i = int(numpy.argmax(absXcorr))
+
+        extremum = Xcorr[i]
+        std = numpy.std(Xcorr)
+        peak_ratio = absXcorr[i] / (3 * std) if std > 0. else 0.
+
+        # parabola through the peak and its (circular) neighbours
+        lag = float(i) + parabola_vertex(absXcorr[i - 1], absXcorr[i], absXcorr[(i + 1) % self.length], 1.)
+
+        # the peak of a PHAT correlation is sharp, so the parabola is biased:
+        # fit it again on the band-limited correlation, evaluated closer
+        # around the first estimate
+        step = 0.25
+        lag += parabola_vertex(*numpy.abs(self.correlation_at(Xcorr, lag + step * numpy.arange(-1, 2))), step)
+
+        # delays larger than the half of the window most likely are actually negative
+        if lag > self.length / 2.:
+            lag -= self.length
+
+        return lag, extremum, peak_ratio
@@ -21,7 +21,8 @@ from __future__ import annotations
 
 import numpy as np
 import numpy.typing as npt
-from friture.signal.lfilter import lfilter_float64_1D
+from numpy.lib.stride_tricks import as_strided
+from friture.signal.lfilter import lfilter_decimate_float64_1D
 
 
 def decimate(
@@ -33,12 +34,10 @@ def decimate(
     if len(x) == 0:
         raise Exception("Filter input is too small")
 
-    # could use a polyphase decimator here
     if zi is None:
         zi = np.zeros(max(len(bdec), len(adec)) - 1, dtype=np.float64)
-    x_dec, zf = lfilter_float64_1D(bdec, adec, x, zi)
+    x_dec, zf = lfilter_decimate_float64_1D(bdec, adec, x, zi, 2)
 
-    x_dec = x_dec[::2]
     return x_dec, zf
 
 
@@ -82,3 +81,80 @@ def decimate_multiple_filtic(
         l = max(len(bdec), len(adec)) - 1
         zfs += [np.zeros(l)]
     return zfs
+
+
+class Decimator:
+    """Streaming decimation by 2**Ndec, as a cascade of Ndec decimations by 2.
+
+    The filter states and the phases are kept from one push to the next, so
+    that the input can be pushed in blocks of any length (the functions above
+    restart the phase at every block). Only the retained samples are
+    computed.
+
+    A cascade of FIR stages is itself a FIR filter followed by a single
+    decimation by 2**Ndec (H(z) then 2, H(z) then 2 is H(z)H(z^2) then 4),
+    so that it is run as one polyphase filter. IIR stages are run one after
+    the other.
+    """
+
+    def __init__(
+        self,
+        Ndec: int,
+        bdec: npt.NDArray[np.float64],
+        adec: npt.NDArray[np.float64],
+    ) -> None:
+        self.Ndec = Ndec
+        self.factor = 2 ** Ndec
+        self.bdec = np.asarray(bdec, dtype=np.float64)
+        self.adec = np.asarray(adec, dtype=np.float64)
+
+        self.fir = not np.any(self.adec[1:])
+        if self.fir:
+            cascade = np.ones(1)
+            for i in range(Ndec):
+                upsampled = np.zeros((self.bdec.shape[0] - 1) * 2 ** i + 1)
+                upsampled[::2 ** i] = self.bdec
+                cascade = np.convolve(cascade, upsampled)
+            self.cascade_reversed = cascade[::-1].copy()
+
+        self.reset()
+
+    def reset(self) -> None:
+        if self.fir:
+            # the last input samples, that the next outputs still depend on
+            self.history = np.zeros(self.cascade_reversed.shape[0] - 1)
+            # index, in the next input block, of the first retained sample
+            self.phase = 0
+        else:
+            self.zis = decimate_multiple_filtic(self.Ndec, self.bdec, self.adec)
+            self.phases = [0] * self.Ndec
+
+    def push(self, x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        x = np.asarray(x, dtype=np.float64)
+
+        if self.fir:
+            return self._push_fir(x)
+
+        x_dec = x
+        for i in range(self.Ndec):
+            length = x_dec.shape[0]
+            x_dec, self.zis[i] = lfilter_decimate_float64_1D(
+                self.bdec, self.adec, x_dec, self.zis[i], 2, self.phases[i])
+            self.phases[i] = (self.phases[i] - length) % 2
+
+        return x_dec
+
+    def _push_fir(self, x: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        taps = self.cascade_reversed.shape[0]
+        padded = np.concatenate((self.history, x))
+
+        # one window of input samples per retained output sample
+        count = len(range(self.phase, x.shape[0], self.factor))
+        itemsize = padded.strides[0]
+        windows = as_strided(padded[self.phase:], shape=(count, taps), strides=(self.factor * itemsize, itemsize), writeable=False)
+        x_dec = windows @ self.cascade_reversed
+
+        self.history = padded[padded.shape[0] - (taps - 1):].copy()
+        self.phase = (self.phase - x.shape[0]) % self.factor
+
+        return x_dec
@@ -105,3 +105,97 @@ def exp_smoothed_value_2d(
     value = alpha * conv + previous * a
 
     return value
+
+
+class BandEnergyIntegrator:
+    """
+    Exponentially smoothed energy of the bands of a filter bank.
+
+    Each band has its own smoothing factor and kernel length, which depend
+    on its decimation factor. The consecutive bands that share them form a
+    group, whose energies are computed together: a filter bank stage gives
+    one (..., bands, samples) array per group, and the whole bank costs a
+    handful of numpy calls instead of one call per band.
+
+    Parameters:
+    -----------
+    alphas : 1D array
+        The exponential smoothing factor of each band.
+    kernel_lengths : 1D array
+        The number of samples of the smoothing kernel of each band.
+    """
+
+    def __init__(
+        self,
+        alphas: npt.ArrayLike,
+        kernel_lengths: npt.ArrayLike,
+    ) -> None:
+        self.values = np.zeros(0)
+        self.set_smoothing(alphas, kernel_lengths)
+
+    def set_smoothing(self, alphas: npt.ArrayLike, kernel_lengths: npt.ArrayLike) -> None:
+        """Set the smoothing of the bands. The smoothed values are kept if
+        the number of bands does not change."""
+        alphas = np.asarray(alphas, dtype=dtype)
+        kernel_lengths = np.asarray(kernel_lengths).astype(int)
+
+        # start of each run of bands with the same smoothing
+        changes = (alphas[1:] != alphas[:-1]) | (kernel_lengths[1:] != kernel_lengths[:-1])
+        starts = np.concatenate(([0], np.flatnonzero(changes) + 1, [len(alphas)]))
+
+        # (bands slice, alpha, kernel) of each group
+        self.groups = []
+        for start, stop in zip(starts[:-1], starts[1:]):
+            alpha = float(alphas[start])
+            kernel = (1. - alpha) ** np.arange(kernel_lengths[start] - 1, -1, -1, dtype=dtype)
+            self.groups.append((slice(int(start), int(stop)), alpha, kernel))
+
+        if self.values.shape[-1:] != alphas.shape:
+            self.values = np.zeros(alphas.shape)
+
+    def reset(self) -> None:
+        self.values = np.zeros(self.values.shape[-1:])
+
+    def push(self, groups_data: list[npt.NDArray[np.float64]]) -> npt.NDArray[np.float64]:
+        """
+        Integrate new samples of the bands.
+
+        Parameters:
+        -----------
+        groups_data : list of arrays
+            The new samples of each group, shape (..., group bands, samples),
+            in the order of the bands. The leading (channels) shape must be
+            the same for all the groups.
+
+        Returns:
+        --------
+        array, shape (..., bands)
+            The smoothed energies. The array is owned by the integrator and
+            updated in place by the next calls.
+        """
+        channels_shape = groups_data[0].shape[:-2]
+        if self.values.shape[:-1] != channels_shape:
+            self.values = np.zeros(channels_shape + self.values.shape[-1:])
+
+        for (bands, alpha, kernel), data in zip(self.groups, groups_data):
+            N = data.shape[-1]
+            Nk = kernel.shape[0]
+
+            if N == 0:
+                continue
+
+            # only the most recent samples matter beyond the kernel length
+            if N > Nk:
+                data = data[..., N - Nk:]
+                N = Nk
+                a = 0.0
+            else:
+                a = (1.0 - alpha) ** N
+
+            conv = np.square(data) @ kernel[Nk - N:]
+
+            values = self.values[..., bands]
+            values *= a
+            values += alpha * conv
+
+        return self.values
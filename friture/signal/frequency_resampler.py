@@ -19,6 +19,7 @@
 
 
 import logging
+from typing import Optional
 
 import numpy as np
 import friture.plotting.frequency_scales as fscales
@@ -33,6 +34,9 @@ class Frequency_Resampler:
         self.maxfreq: float = maxfreq
         self.nsamples: int = nsamples
         self.freq = np.zeros((1))
+        # interpolation table, computed on the first push after a change
+        self.indices: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
         self.update_xscale()
 
     def setfreqrange(self, minfreq: float, maxfreq: float) -> None:
@@ -47,6 +51,8 @@ class Frequency_Resampler:
                 self.scale.transform(self.minfreq),
                 self.scale.transform(self.maxfreq),
                 self.nsamples))
+        self.indices = None
+        self.weights = None
 
     def setnsamples(self, nsamples):
         if self.nsamples != nsamples:
@@ -64,20 +70,43 @@ class Frequency_Resampler:
         self.freq = freq
         self.update_xscale()
 
+    def update_interpolation_table(self) -> None:
+        # two-tap linear interpolation, as np.interp(self.xscaled, self.freq, ...):
+        # each output sample is taken between the input samples at
+        # self.indices and self.indices + 1, self.weights being the weight of
+        # the second one. Outside of the input range, the edge values are used.
+        if self.freq.size < 2:
+            self.indices = np.zeros(self.xscaled.size, dtype=np.intp)
+            self.weights = np.zeros(self.xscaled.size)
+            return
+
+        indices = np.searchsorted(self.freq, self.xscaled, side='right') - 1
+        np.clip(indices, 0, self.freq.size - 2, out=indices)
+
+        lower = self.freq[indices]
+        upper = self.freq[indices + 1]
+        weights = (self.xscaled - lower) / (upper - lower)
+        np.clip(weights, 0., 1., out=weights)
+
+        self.indices = indices
+        self.weights = weights[:, np.newaxis]
+
     def push(self, data):
-        # f = interp1d(freq, data) # construct an interpolant
-        # return f(self.xscaled)
-        # s = UnivariateSpline(freq, data, s=0, k=1) # construct the spline
-        # return s(self.xscaled)
-        # Note : interp1d and UnivariateSpline are both slower than interp
-        # interp is still not optimal because it involved a search whereas
-        # the data is already completely sorted so an running interpolation
-        # could be done faster
-        n = data.shape[1]
-        resampled_data = np.zeros((self.xscaled.size, n))
-
-        for j in range(n):
-            interpolated = np.interp(self.xscaled, self.freq, data[:, j])
-            resampled_data[:, j] = interpolated
-
-        return resampled_data
+        # freq and xscaled only change with the settings, so the search of
+        # the interpolation intervals is done once, and each push is a
+        # single gather of the two taps over the whole block, plus a linear
+        # interpolation
+        if self.indices is None:
+            self.update_interpolation_table()
+
+        if self.freq.size < 2:
+            return np.repeat(data[:1, :], self.xscaled.size, axis=0)
+
+        lower = data[self.indices]
+        upper = data[self.indices + 1]
+
+        # linear interpolation, in place
+        upper -= lower
+        upper *= self.weights
+        upper += lower
+        return upper
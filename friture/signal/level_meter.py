@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from friture.iec import dB_to_IEC_array
+from friture.signal.exp_smoothing import exp_smoothed_value_2d
+
+# decay factor of the ballistic peak, squared at each block of the fall-off
+PEAK_DECAY_RATE = (1.0 - 3E-6/500.)
+# Number of blocks the ballistic peak stays on hold before fall-off.
+PEAK_FALLOFF = 32
+
+# initial value of the smoothed levels, below anything that can be displayed
+FLOOR = 1e-30
+
+
+class LevelMeter:
+    """
+    Peak, RMS and ballistic peak levels of all the channels of a signal.
+
+    The levels are updated from (channels, samples) blocks, with one array
+    of state per quantity: the cost of a block is a handful of numpy calls,
+    whatever the number of channels.
+
+    - the RMS level is the exponentially smoothed energy of the samples,
+      with the given response time;
+    - the peak level follows the maximum of the absolute value of the
+      samples, and decreases exponentially between blocks;
+    - the ballistic peak, on the IEC scale, holds the highest level for
+      PEAK_FALLOFF blocks, then falls off with an accelerating decay.
+
+    Parameters:
+    -----------
+    sample_rate : float
+        The sample rate of the signal, in Hz.
+    response_time : float
+        The response time of the RMS level, in seconds.
+    peak_response_time : float
+        The response time of the peak level, in seconds.
+    block_period : float
+        The nominal period of the blocks, in seconds, that sets the decay
+        of the peak level.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float,
+        response_time: float = 0.300,
+        peak_response_time: float = 0.025,
+        block_period: float = 0.025,
+    ) -> None:
+        # an exponential smoothing filter is a simple IIR filter
+        # s_i = alpha*x_i + (1-alpha)*s_{i-1}
+        # we compute alpha so that the n most recent samples represent 100*w percent of the output
+        w = 0.65
+        n = response_time * sample_rate
+        N = 5*n
+        self.alpha = 1. - (1. - w) ** (1. / (n + 1))
+        self.kernel = (1. - self.alpha) ** (np.arange(0, N)[::-1])
+
+        n2 = peak_response_time / block_period
+        self.peak_alpha = 1. - (1. - w) ** (1. / (n2 + 1))
+
+        # one value per channel
+        self.mean_square = np.zeros(0)
+        self.max = np.zeros(0)
+        self.peak_iec = np.zeros(0)
+        self.peak_hold_counter = np.zeros(0, dtype=np.int64)
+        self.peak_decay_factor = np.zeros(0)
+
+        self.set_channel_count(1)
+
+    def set_channel_count(self, count: int) -> None:
+        """Resize the state, the channels that remain keep their levels."""
+        def resized(state: npt.NDArray, fill: float) -> npt.NDArray:
+            new_state = np.full(count, fill, dtype=state.dtype)
+            kept = min(count, state.shape[0])
+            new_state[:kept] = state[:kept]
+            return new_state
+
+        self.mean_square = resized(self.mean_square, FLOOR)
+        self.max = resized(self.max, FLOOR)
+        self.peak_iec = resized(self.peak_iec, 0.)
+        self.peak_hold_counter = resized(self.peak_hold_counter, 0)
+        self.peak_decay_factor = resized(self.peak_decay_factor, PEAK_DECAY_RATE)
+
+        self.levels_rms = 10. * np.log10(self.mean_square)
+        self.levels_max = 20. * np.log10(self.max)
+
+    @property
+    def channel_count(self) -> int:
+        return self.mean_square.shape[0]
+
+    def push(self, data: npt.NDArray) -> None:
+        """
+        Update the levels with a new block of samples.
+
+        Parameters:
+        -----------
+        data : 2D array
+            The new samples, shape (channels, samples). A change in the
+            number of channels resizes the state.
+        """
+        if data.shape[0] != self.channel_count:
+            self.set_channel_count(data.shape[0])
+
+        # exponential smoothing for max
+        if data.shape[1] > 0:
+            value_max = np.abs(data).max(axis=1)
+            # follow the new maximum, or decrease exponentially
+            self.max = np.maximum(value_max, self.max * (1. - self.peak_alpha))
+
+        # exponential smoothing for RMS
+        self.mean_square = exp_smoothed_value_2d(self.kernel, self.alpha, data ** 2, self.mean_square)
+
+        self.levels_rms = 10. * np.log10(self.mean_square)
+        self.levels_max = 20. * np.log10(self.max)
+
+        self.update_ballistic_peak(dB_to_IEC_array(np.maximum(self.levels_max, self.levels_rms)))
+
+
+    def update_ballistic_peak(self, peak_iec: npt.NDArray[np.float64]) -> None:
+        # peak-hold-then-decay mechanism, channel by channel:
+        # - a rising level is followed, and resets the hold;
+        # - otherwise the peak is held for PEAK_FALLOFF blocks;
+        # - then it decays, faster and faster, until it reaches the level
+        counter = self.peak_hold_counter + 1
+        holding = (peak_iec <= self.peak_iec) & (counter <= PEAK_FALLOFF)
+        decayed = self.peak_decay_factor * self.peak_iec
+        # a rising level is always above the decayed peak
+        following = ~holding & (decayed < peak_iec)
+
+        self.peak_iec = np.where(holding, self.peak_iec, np.maximum(decayed, peak_iec))
+        # the counter stays at PEAK_FALLOFF during the decay
+        self.peak_hold_counter = np.where(following, 0, np.minimum(counter, PEAK_FALLOFF))
+        self.peak_decay_factor = np.where(
+            following, PEAK_DECAY_RATE,
+            np.where(holding, self.peak_decay_factor, self.peak_decay_factor * self.peak_decay_factor))
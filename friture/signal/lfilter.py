@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 """
-Pure-Python implementations of IIR filtering and IIR-to-FIR conversion.
+Numpy implementations of IIR filtering and IIR-to-FIR conversion.
 
 * :func:`lfilter_float64_1D` implements a single direct-form II
-  transposed IIR filter using Python lists for fast scalar arithmetic.
-  It is used by the legacy pure-IIR octave filter bank and the
-  :func:`decimate` helper.
+  transposed IIR filter.  Instead of a per-sample loop, the signal is
+  processed in blocks with a state-space formulation, so that the work
+  is done by a few matrix products; FIR filters are handled by a plain
+  convolution.  High-order filters are applied as their numerator followed
+  by a cascade of second-order all-pole sections, whose block matrices
+  stay accurate in double precision.  It is used by the legacy pure-IIR
+  octave filter bank, the long-term levels and the :func:`decimate` helper.
+  :func:`lfilter_decimate_float64_1D` computes only one output sample
+  out of N, for the decimators.
 
 * :func:`iir_to_minphase_fir` converts an IIR filter to a minimum-phase
   FIR approximation via cepstral processing.  The IIR impulse response
@@ -17,8 +23,11 @@ Pure-Python implementations of IIR filtering and IIR-to-FIR conversion.
 
 from __future__ import annotations
 
+from collections import OrderedDict
+
 import numpy as np
 import numpy.typing as npt
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 def iir_to_minphase_fir(
@@ -82,6 +91,297 @@ def iir_to_minphase_fir(
     return h_min[:fir_length]
 
 
+# length of the blocks of the state-space formulation. Longer blocks mean
+# fewer sequential steps, but a larger zero-state response matrix.
+IIR_BLOCK_LENGTH = 64
+
+# number of blocks whose start states are computed together
+IIR_GROUP_LENGTH = 16
+
+# highest order of the filters that are applied as a whole. The powers of
+# the companion matrix of a higher-order filter are so ill-conditioned that
+# the block matrices would lose most of the double precision.
+MAX_BLOCK_ORDER = 4
+
+# number of filters whose block matrices are kept
+BLOCK_FILTER_CACHE_SIZE = 64
+
+_block_filters: OrderedDict[tuple[bytes, bytes], _BlockIIR | _SectionedIIR] = OrderedDict()
+
+
+class _BlockIIR:
+    """Block form of a linear state-space filter.
+
+    One step of the filter is ``y = c z + d x`` and ``z' = M z + v x``.
+    Over a block of L samples starting with the state z, the outputs are the
+    zero-input response ``O z`` plus the zero-state response ``T x`` (T is
+    the lower-triangular Toeplitz matrix of the impulse response), and the
+    final state is ``M^L z + G x``. The states at the start of the blocks are
+    the only sequential part, and they are themselves computed a group of
+    blocks at a time. When the output is decimated, only the rows of O and T
+    of the retained samples are used.
+    """
+
+    def __init__(
+        self,
+        M: npt.NDArray[np.float64],
+        v: npt.NDArray[np.float64],
+        c: npt.NDArray[np.float64],
+        d: float,
+        block_length: int,
+        group_length: int,
+    ) -> None:
+        order = M.shape[0]
+        L = block_length
+        self.block_length = L
+
+        powers = np.empty((L + 1, order, order))
+        powers[0] = np.eye(order)
+        for k in range(L):
+            powers[k + 1] = M @ powers[k]
+
+        # (L, order): row k gives the output at k from the initial state
+        self.zero_input = c @ powers[:L]
+        # (order, L): column k gives the final state from the input at k
+        self.to_state = (powers[L - 1::-1] @ v).T
+        # M^0 ... M^L, for the state transitions over whole and partial blocks
+        self.powers = powers
+
+        impulse_response = np.empty(L)
+        impulse_response[0] = d
+        impulse_response[1:] = self.zero_input[:L - 1] @ v
+        lags = np.arange(L)[:, np.newaxis] - np.arange(L)[np.newaxis, :]
+        self.zero_state = np.where(lags >= 0, impulse_response[np.maximum(lags, 0)], 0.)
+
+        # over a group of K blocks, the state at the start of block j is
+        # P^j z + sum(P^(j-1-i) u_i for i < j), with P = M^L and u_i = G x_i.
+        # j goes up to K so that the last row is the state after the group.
+        K = group_length
+        self.group_length = K
+        block_powers = np.empty((K + 1, order, order))
+        block_powers[0] = np.eye(order)
+        for j in range(K):
+            block_powers[j + 1] = powers[L] @ block_powers[j]
+
+        # ((K + 1) * order, order)
+        self.group_zero_input = block_powers.reshape((K + 1) * order, order)
+        # ((K + 1) * order, K * order), block lower triangular
+        group_zero_state = np.zeros((K + 1, order, K, order))
+        for j in range(1, K + 1):
+            for i in range(j):
+                group_zero_state[j, :, i, :] = block_powers[j - 1 - i]
+        self.group_zero_state = group_zero_state.reshape((K + 1) * order, K * order)
+
+    def filter(
+        self, x: npt.NDArray[np.float64], zi: npt.NDArray[np.float64], step: int = 1, phase: int = 0
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        L = self.block_length
+        # the retained samples are at the same positions in all the blocks
+        assert L % step == 0
+        block_count = x.shape[0] // L
+        full = block_count * L
+        remainder = x.shape[0] - full
+        retained_per_block = L // step
+        retained_full = block_count * retained_per_block
+
+        y = np.empty(len(range(phase, x.shape[0], step)))
+        z = zi.astype(np.float64, copy=True)
+
+        if block_count > 0:
+            blocks = x[:full].reshape(block_count, L)
+
+            # state at the start of each block
+            order = z.shape[0]
+            inputs_to_state = blocks @ self.to_state.T
+            states = np.empty((block_count + 1, order))
+            for start in range(0, block_count, self.group_length):
+                count = min(self.group_length, block_count - start)
+                rows = (count + 1) * order
+                states[start:start + count + 1] = (
+                    self.group_zero_input[:rows] @ z
+                    + self.group_zero_state[:rows, :count * order] @ inputs_to_state[start:start + count].ravel()
+                ).reshape(count + 1, order)
+                z = states[start + count].copy()
+            states = states[:block_count]
+
+            outputs = blocks @ self.zero_state[phase::step].T
+            outputs += states @ self.zero_input[phase::step].T
+            y[:retained_full] = outputs.ravel()
+
+        if remainder > 0:
+            tail = x[full:]
+            rows = slice(phase, remainder, step)
+            y[retained_full:] = self.zero_state[rows, :remainder] @ tail + self.zero_input[rows] @ z
+            z = self.powers[remainder] @ z + self.to_state[:, L - remainder:] @ tail
+
+        return y, z
+
+
+def _direct_form(
+    b: npt.NDArray[np.float64], a: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64], float]:
+    """The state-space form (M, v, c, d) of a direct-form II transposed filter,
+    whose state is the one of lfilter_float64_1D."""
+    order = b.shape[0] - 1
+    M = np.zeros((order, order))
+    M[:-1, 1:] = np.eye(order - 1)
+    M[:, 0] -= a[1:]
+    v = b[1:] - a[1:] * b[0]
+    c = np.eye(1, order)[0]
+    return M, v, c, b[0]
+
+
+def _all_pole_sections(a: npt.NDArray[np.float64]) -> list[npt.NDArray[np.float64]]:
+    """Factor the denominator into second-order polynomials, one per pair of
+    complex conjugate poles or of real poles, and a first-order polynomial
+    for a remaining real pole."""
+    roots = np.roots(a)
+    # np.roots leaves out the poles at zero of the trailing zero coefficients
+    poles = np.concatenate((roots, np.zeros(a.shape[0] - 1 - roots.shape[0])))
+    # the eigenvalues of the real companion matrix come as exact conjugates
+    complex_poles = poles[poles.imag > 0]
+    real_poles = np.sort(poles[poles.imag == 0].real)
+
+    sections = [np.array([1., -2. * p.real, abs(p) ** 2]) for p in complex_poles]
+    for p, q in zip(real_poles[0:-1:2], real_poles[1::2]):
+        sections.append(np.array([1., -(p + q), p * q]))
+    if real_poles.shape[0] % 2 == 1:
+        sections.append(np.array([1., -real_poles[-1]]))
+    return sections
+
+
+def _all_pole_cascade(
+    a: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64], float]:
+    """The state-space form (M, v, c, d) of the all-pole filter 1/a, as a
+    cascade of direct-form sections. Its state is made of the states of the
+    sections, and M is block lower triangular: each section is fed by the
+    outputs of the previous ones."""
+    order = a.shape[0] - 1
+    M = np.zeros((order, order))
+    v = np.zeros(order)
+    c = np.zeros(order)
+
+    start = 0
+    for section in _all_pole_sections(a):
+        stop = start + section.shape[0] - 1
+        section_M, section_v, section_c, _ = _direct_form(np.eye(1, section.shape[0])[0], section)
+        M[start:stop, start:stop] = section_M
+        # the input of the section is the input plus the state parts of the
+        # outputs of the previous sections
+        M[start:stop, :start] = np.outer(section_v, c[:start])
+        v[start:stop] = section_v
+        c[start:stop] = section_c
+        start = stop
+
+    return M, v, c, 1.
+
+
+class _SectionedIIR:
+    """Direct-form II transposed IIR filter of high order, applied as its
+    numerator followed by a cascade of all-pole sections.
+
+    The direct-form state is the sum of the numerator partial sums and of
+    the all-pole state. So the numerator takes the given state, as a FIR
+    filter, and the cascade starts at rest. At the end, the all-pole state
+    is recovered from the zero-input response r of the cascade: with
+    ``s' = M s`` and ``y = s[0]`` in direct form,
+    ``s[k] = r[k] + a[1] r[k-1] + ... + a[k] r[0]``.
+    """
+
+    def __init__(
+        self, b: npt.NDArray[np.float64], a: npt.NDArray[np.float64], block_length: int, group_length: int
+    ) -> None:
+        self.b = b
+        self.cascade = _BlockIIR(*_all_pole_cascade(a), block_length, group_length)
+
+        order = a.shape[0] - 1
+        lags = np.arange(order)[:, np.newaxis] - np.arange(order)[np.newaxis, :]
+        state_from_response = np.where(lags >= 0, a[np.maximum(lags, 0)], 0.)
+        # (order, order): the direct-form state from the state of the cascade
+        self.to_direct_form = state_from_response @ self.cascade.zero_input[:order]
+
+    def filter(
+        self, x: npt.NDArray[np.float64], zi: npt.NDArray[np.float64], step: int = 1, phase: int = 0
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        u, zf = _fir_filter(self.b, x, zi, 1, 0)
+        y, state = self.cascade.filter(u, np.zeros(zi.shape[0]), step, phase)
+        zf += self.to_direct_form @ state
+        return y, zf
+
+
+def _block_filter(b: npt.NDArray[np.float64], a: npt.NDArray[np.float64]) -> _BlockIIR | _SectionedIIR:
+    key = (b.tobytes(), a.tobytes())
+    block_filter = _block_filters.get(key)
+    if block_filter is None:
+        if b.shape[0] - 1 > MAX_BLOCK_ORDER:
+            block_filter = _SectionedIIR(b, a, IIR_BLOCK_LENGTH, IIR_GROUP_LENGTH)
+        else:
+            block_filter = _BlockIIR(*_direct_form(b, a), IIR_BLOCK_LENGTH, IIR_GROUP_LENGTH)
+        _block_filters[key] = block_filter
+        if len(_block_filters) > BLOCK_FILTER_CACHE_SIZE:
+            _block_filters.popitem(last=False)
+    else:
+        _block_filters.move_to_end(key)
+    return block_filter
+
+
+def _fir_filter(
+    b: npt.NDArray[np.float64], x: npt.NDArray[np.float64], zi: npt.NDArray[np.float64], step: int, phase: int
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    # in direct form II transposed, the state of a FIR filter holds the
+    # partial sums of the next outputs: it is added to the convolution,
+    # and the convolution tail becomes the final state
+    n = x.shape[0]
+    order = b.shape[0] - 1
+
+    if step == 1:
+        full = np.convolve(x, b)
+        y = full[:n]
+        zf = full[n:].copy()
+    else:
+        # polyphase: only the windows of the retained samples are summed
+        padded = np.concatenate((np.zeros(order), x))
+        y = sliding_window_view(padded, order + 1)[phase::step] @ b[::-1]
+        zf = np.convolve(x[-order:], b)[min(n, order):]
+
+    head = min(n, order)
+    y[:len(range(phase, head, step))] += zi[phase:head:step]
+    zf[:order - head] += zi[head:]
+
+    return y, zf
+
+
+def _lfilter(
+    b: npt.NDArray[np.float64],
+    a: npt.NDArray[np.float64],
+    x: npt.NDArray[np.float64],
+    zi: npt.NDArray[np.float64],
+    step: int,
+    phase: int,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    assert b.shape[0] == a.shape[0], "a and b must be of the same shape"
+    assert zi.shape[0] == b.shape[0] - 1
+    assert 0 <= phase < step
+
+    b = np.asarray(b, dtype=np.float64)
+    a = np.asarray(a, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    zi = np.asarray(zi, dtype=np.float64)
+
+    if b.shape[0] == 1 or x.shape[0] == 0:
+        return x[phase::step] * b[0], zi.copy()
+
+    if not np.any(a[1:]):
+        return _fir_filter(b, x, zi, step, phase)
+
+    if IIR_BLOCK_LENGTH % step != 0:
+        y, zf = _block_filter(b, a).filter(x, zi)
+        return y[phase::step], zf
+
+    return _block_filter(b, a).filter(x, zi, step, phase)
+
+
 def lfilter_float64_1D(
     b: npt.NDArray[np.float64],
     a: npt.NDArray[np.float64],
@@ -96,6 +396,9 @@ def lfilter_float64_1D(
         a[0]*y[n] = b[0]*x[n] + b[1]*x[n-1] + ... + b[nb]*x[n-nb]
                                 - a[1]*y[n-1] - ... - a[na]*y[n-na]
 
+    with ``a[0]`` assumed to be 1.  The state has the same meaning as in
+    ``scipy.signal.lfilter``, so that a signal can be filtered chunk by chunk.
+
     Parameters
     ----------
     b : 1D array
@@ -114,34 +417,30 @@ def lfilter_float64_1D(
     zf : 1D array
         Final filter delay state (can be reused for continuous filtering).
     """
-    assert b.shape[0] == a.shape[0], "a and b must be of the same shape"
-    assert zi.shape[0] == b.shape[0] - 1
-
-    # Convert to Python lists for fast scalar access
-    b_list = b.tolist()
-    a_list = a.tolist()
-    x_list = x.tolist()
-    z_list = zi.tolist()
-
-    len_x = len(x_list)
-    len_b = len(b_list)
+    return _lfilter(b, a, x, zi, 1, 0)
 
-    y_list = [0.0] * len_x
 
-    if len_b > 1:
-        for k in range(len_x):
-            yk = z_list[0] + b_list[0] * x_list[k]
-            y_list[k] = yk
-
-            for n in range(len_b - 2):
-                z_list[n] = z_list[n + 1] + x_list[k] * b_list[n + 1] - yk * a_list[n + 1]
-
-            z_list[len_b - 2] = x_list[k] * b_list[len_b - 1] - yk * a_list[len_b - 1]
-    else:
-        for k in range(len_x):
-            y_list[k] = x_list[k] * b_list[0]
+def lfilter_decimate_float64_1D(
+    b: npt.NDArray[np.float64],
+    a: npt.NDArray[np.float64],
+    x: npt.NDArray[np.float64],
+    zi: npt.NDArray[np.float64],
+    factor: int,
+    phase: int = 0,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Filter data like :func:`lfilter_float64_1D` and keep one output sample
+    out of *factor*, starting at index *phase*.
 
-    y = np.array(y_list, dtype=np.float64)
-    z = np.array(z_list, dtype=np.float64)
+    Only the retained output samples are computed: a polyphase sum for FIR
+    filters, and the retained rows of the block responses for IIR filters
+    (the state still goes through every input sample).
 
-    return y, z
+    Returns
+    -------
+    y : 1D array
+        Filtered output, equal to ``lfilter_float64_1D(b, a, x, zi)[0][phase::factor]``.
+    zf : 1D array
+        Final filter delay state (can be reused for continuous filtering).
+    """
+    return _lfilter(b, a, x, zi, factor, phase)
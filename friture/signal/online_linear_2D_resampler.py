@@ -8,7 +8,6 @@ Created on Sat Apr 21 16:12:12 2012
 import numpy as np
 
 from .scipy_resample import resample
-from friture.signal.linear_interp import linear_interp_2D
 
 
 class Online_Linear_2D_resampler:
@@ -16,6 +15,9 @@ class Online_Linear_2D_resampler:
     A class to apply a linear resampling along the time axis of a 2D array.
     The resampling is applied online, as data is pushed.
     Meant to be used to resample from the source sampling to the screen sampling.
+
+    All the output columns of a pushed block are computed at once, with a
+    single gather of the neighbouring input columns and a linear interpolation.
     """
 
     def __init__(self, interp_factor_L=1, decim_factor_M=1, height=1):
@@ -29,9 +31,6 @@ class Online_Linear_2D_resampler:
         self.resampled_index = 0.
 
         self.old_data = np.zeros((self.height))
-        self.buffer = None
-
-        self.resampled_data = np.zeros((self.height, 1))
 
     def set_ratio(self, interp_factor_L, decim_factor_M):
         if self.interp_factor_L != interp_factor_L or self.decim_factor_M != decim_factor_M:
@@ -52,7 +51,6 @@ class Online_Linear_2D_resampler:
             # we resample here instead of just restarting with zeros to avoid black vertical lines
             # in the spectrogram
             self.old_data = resample(self.old_data, self.height)
-            self.resampled_data = resample(self.resampled_data, self.height)  # resample on the first axis
 
     def processable(self, m):
         return int(np.ceil((self.orig_index + m - (self.resampled_index + self.resampling_ratio)) / self.resampling_ratio))
@@ -62,36 +60,34 @@ class Online_Linear_2D_resampler:
         self.set_height(data.shape[0])
 
         time_sample_count = data.shape[1]
-
-        processable_time_sample_count = self.processable(time_sample_count)
-
-        output_data = np.zeros((self.height, processable_time_sample_count))
-        output_data_index = 0
-
-        for j in range(time_sample_count):
-            self.orig_index += 1.
-            n = self.processable(0)
-            if n <= 0:
-                # shift
-                self.old_data = data[:, j]
-                continue
-
-            if self.resampled_data.shape[1] < n:
-                self.resampled_data = np.zeros((self.height, n))
-
-            self.resampled_index = linear_interp_2D(
-                self.resampled_data,
-                data[:, j],
-                self.old_data,
-                self.orig_index,
-                self.resampled_index,
-                self.resampling_ratio,
-                n)
-            
-            # shift
-            self.old_data = data[:, j]
-
-            output_data[:, output_data_index:output_data_index+n] = self.resampled_data[:, :n]
-            output_data_index += n
+        if time_sample_count == 0:
+            return np.zeros((self.height, 0))
+
+        processable_time_sample_count = max(self.processable(time_sample_count), 0)
+
+        # positions of all the output samples in the input stream. An output
+        # sample is interpolated between the input column just before it and
+        # the input column just after it, at 'orig_index + column + 1'
+        resampled_indices = self.resampled_index + self.resampling_ratio * np.arange(1, processable_time_sample_count + 1)
+        columns = np.floor(resampled_indices - self.orig_index).astype(np.intp)
+        np.clip(columns, 0, time_sample_count - 1, out=columns)
+        a = (self.orig_index + 1. + columns) - resampled_indices
+
+        # gather the input columns around each output sample, the one before
+        # the first column being the last column of the previous block
+        right = data[:, columns]
+        output_data = data[:, columns - 1]
+        first_block_outputs = np.searchsorted(columns, 1)
+        output_data[:, :first_block_outputs] = self.old_data[:, None]
+
+        # linear interpolation, in place
+        output_data -= right
+        output_data *= a
+        output_data += right
+
+        self.orig_index += time_sample_count
+        if processable_time_sample_count > 0:
+            self.resampled_index = float(resampled_indices[-1])
+        self.old_data = data[:, -1].copy()
 
         return output_data
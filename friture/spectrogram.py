@@ -20,7 +20,7 @@
 """Spectrogram widget, that displays a rolling 2D image of the time-frequency spectrum."""
 
 from PyQt6.QtCore import QObject
-from numpy import log10, floor, zeros, float64, tile, array, ndarray
+from numpy import log10, tile, array, ndarray, concatenate
 from friture.audiobuffer import AudioBuffer
 from friture.imageplot import ImagePlot
 from friture.audioproc import audioproc
@@ -28,6 +28,10 @@ from friture.signal.color_tranform import Color_Transform
 from friture.signal.frequency_resampler import Frequency_Resampler
 from friture.signal.online_linear_2D_resampler import Online_Linear_2D_resampler
 from friture.signal.transform_pipeline import Transform_Pipeline  # audio processing class
+from friture.stft_cache import GetSTFTCache
+from friture.analysis_lock import analysis_locked
+from friture.precision import sample_dtype
+from friture.timings import GetTimings
 from friture.spectrogram_settings import (Spectrogram_Settings_Dialog,  # settings dialog
                                           DEFAULT_FFT_SIZE,
                                           DEFAULT_FREQ_SCALE,
@@ -87,7 +91,8 @@ class Spectrogram_Widget(QObject):
 
         self.timerange_s = DEFAULT_TIMERANGE
 
-        self.old_index = 0
+        # read position in the audio buffer, set with the buffer
+        self.frame_cursor = None
         self.overlap = 3. / 4.
         self.overlap_frac = Fraction(3, 4)
         self.dT_s = self.fft_size * (1. - self.overlap) / float(SAMPLING_RATE)
@@ -112,9 +117,13 @@ class Spectrogram_Widget(QObject):
         return self.PlotZoneImage.view_model()
 
     # method
+    @analysis_locked
     def set_buffer(self, buffer: AudioBuffer) -> None:
         self.audiobuffer = buffer
-        self.old_index = self.audiobuffer.ringbuffer.offset
+        self.frame_cursor = self.audiobuffer.frame_cursor(self.fft_size, self.hop_size())
+
+    def hop_size(self):
+        return int(self.fft_size * (1. - self.overlap))
 
     def log_spectrogram(self, sp):
         # Note: implementing the log10 of the array in Cython did not bring
@@ -129,34 +138,25 @@ class Spectrogram_Widget(QObject):
         return (sp - self.spec_min) / (self.spec_max - self.spec_min)
 
     def handle_new_data(self, floatdata: ndarray) -> None:
-        # we need to maintain an index of where we are in the buffer
-        index = self.audiobuffer.ringbuffer.offset
-
-        available = index - self.old_index
-
-        if available < 0:
-            # ringbuffer must have grown or something...
-            available = 0
-            self.old_index = index
-
-        # if we have enough data to add a frequency column in the time-frequency plane, compute it
-        needed = self.fft_size * (1. - self.overlap)
-        realizable = int(floor(available / needed))
+        result = self.analyze()
+        if result is not None:
+            self.present(result)
+
+    # method, called in the analysis worker thread when it is enabled
+    def analyze(self):
+        # all the new frames are analyzed at once. They end on the grid
+        # shared with the other docks, so that their power spectra come from
+        # the shared STFT cache (read-only).
+        block = self.frame_cursor.take()
+        realizable = block.frame_count
 
         if realizable > 0:
-            spn = zeros((len(self.freq), realizable), dtype=float64)
-
-            for i in range(realizable):
-                floatdata = self.audiobuffer.data_indexed(self.old_index, self.fft_size)
-                data_time = self.audiobuffer.data_time(self.old_index)
+            hop = self.frame_cursor.hop
+            stop = block.stop
+            data_time = float(block.times[-1])
 
-                # for now, take the first channel only
-                floatdata = floatdata[0, :]
-
-                # FFT transform
-                spn[:, i] = self.proc.analyzelive(floatdata)
-
-                self.old_index += int(needed)
+            # for now, take the first channel only
+            spn = GetSTFTCache().power_spectra(self.audiobuffer.ringbuffer, 0, self.fft_size, hop, stop, realizable).T
 
             w = tile(self.w, (1, realizable))
             norm_spectrogram = self.scale_spectrogram(self.log_spectrogram(spn) + w)
@@ -166,15 +166,11 @@ class Spectrogram_Widget(QObject):
             self.screen_resampler.set_ratio(self.sfft_rate_frac, screen_rate_frac)
             self.frequency_resampler.setnsamples(self.PlotZoneImage.spectrogram_screen_height())
 
-            data = self.audio_pipeline.push(norm_spectrogram)
+            # frequency and time resampling to the screen, and colors
+            with GetTimings().stage("Spectrogram: resampling"):
+                data = self.audio_pipeline.push(norm_spectrogram)
 
-            # ideally we would use the time of the last frame that is really consumed by the FFT processor.
-            # it may not be the current time if we don't have enough to compute a FFT window
-            self.PlotZoneImage.push(data, data_time)
-
-            if self.mustRestart:
-                self.PlotZoneImage.restart()
-                self.mustRestart = False
+            return data, data_time
 
         # thickness of a frequency column depends on FFT size and window overlap
         # hamming window with 75% overlap provides good quality (Perfect reconstruction,
@@ -184,6 +180,35 @@ class Spectrogram_Widget(QObject):
 
         # actual displayed spectrogram is a scaled version of the time-frequency plane
 
+        return None
+
+    # method, called before the analysis when the dock is shown again
+    def resync(self):
+        # the frames pushed while the dock was hidden are not analyzed
+        self.frame_cursor.skip()
+
+    # method, called in the worker thread when the GUI thread lags behind
+    def merge_results(self, older, newer):
+        older_data, _ = older
+        newer_data, newer_time = newer
+        if older_data.shape[0] != newer_data.shape[0]:
+            # the screen height changed, the older columns are obsolete
+            return newer
+        # the columns follow each other, the time is the one of the last column
+        return concatenate((older_data, newer_data), axis=1), newer_time
+
+    # method
+    def present(self, result):
+        data, data_time = result
+
+        # ideally we would use the time of the last frame that is really consumed by the FFT processor.
+        # it may not be the current time if we don't have enough to compute a FFT window
+        self.PlotZoneImage.push(data, data_time)
+
+        if self.mustRestart:
+            self.PlotZoneImage.restart()
+            self.mustRestart = False
+
     def canvasUpdate(self):
         self.PlotZoneImage.draw()
 
@@ -200,11 +225,13 @@ class Spectrogram_Widget(QObject):
         # defer the restart until we get data from the audio source (so that a fresh lastdatatime is passed to the spectrogram image)
         self.mustRestart = True
 
+    @analysis_locked
     def setminfreq(self, freq):
         self.minfreq = freq
         self.PlotZoneImage.setfreqrange(self.minfreq, self.maxfreq)
         self.frequency_resampler.setfreqrange(self.minfreq, self.maxfreq)
 
+    @analysis_locked
     def setmaxfreq(self, freq):
         self.maxfreq = freq
         self.PlotZoneImage.setfreqrange(self.minfreq, self.maxfreq)
@@ -214,18 +241,35 @@ class Spectrogram_Widget(QObject):
         self.freq = self.proc.get_freq_scale()
         self.frequency_resampler.setfreq(self.freq)
     
+    @analysis_locked
     def setfreqscale(self, freqscale):
         self.PlotZoneImage.setfreqscale(freqscale)
         self.frequency_resampler.setfreqscale(freqscale)
 
+    @analysis_locked
     def setfftsize(self, fft_size):
         self.fft_size = fft_size
+        if self.frame_cursor is not None:
+            self.frame_cursor.configure(self.fft_size, self.hop_size())
 
         self.proc.set_fftsize(fft_size)
         self.update_weighting()
         self.freq = self.proc.get_freq_scale()
         self.frequency_resampler.setfreq(self.freq)
 
+        self._update_frame_period()
+
+    @analysis_locked
+    def setoverlap(self, overlap):
+        self.overlap_frac = overlap
+        self.overlap = float(overlap)
+        if self.frame_cursor is not None:
+            self.frame_cursor.configure(self.fft_size, self.hop_size())
+
+        self._update_frame_period()
+
+    def _update_frame_period(self):
+        # the time between the columns follows the FFT size and the overlap
         self.dT_s = self.fft_size * (1. - self.overlap) / float(SAMPLING_RATE)
         self.PlotZoneImage.settimerange(self.timerange_s, self.dT_s)
 
@@ -233,14 +277,17 @@ class Spectrogram_Widget(QObject):
 
         self.update_jitter()
 
+    @analysis_locked
     def setmin(self, value):
         self.spec_min = value
         self.PlotZoneImage.setspecrange(self.spec_min, self.spec_max)
 
+    @analysis_locked
     def setmax(self, value):
         self.spec_max = value
         self.PlotZoneImage.setspecrange(self.spec_min, self.spec_max)
 
+    @analysis_locked
     def setweighting(self, weighting):
         self.weighting = weighting
         self.PlotZoneImage.setweighting(weighting)
@@ -257,6 +304,8 @@ class Spectrogram_Widget(QObject):
         else:
             self.w = C
         self.w.shape = (len(self.w), 1)
+        # same precision as the spectra
+        self.w = self.w.astype(sample_dtype())
 
     def settings_called(self, checked):
         self.settings_dialog.show()
@@ -268,6 +317,7 @@ class Spectrogram_Widget(QObject):
         self.settings_dialog.restoreState(settings)
 
     # slot
+    @analysis_locked
     def timerangechanged(self, value):
         self.timerange_s = value
         self.PlotZoneImage.settimerange(self.timerange_s, self.dT_s)
@@ -28,10 +28,10 @@ class CanvasScaledSpectrogram(QtCore.QObject):
     A 2D image that is meant to hold the spectrogram data, in a ringbuffer-style.
 
     Architecture:
-    1. quickly convert each piece of data to a pixmap,
-    (with the right pixel size, since QImage to QPixmap conversion is slow, and scaling is slow too)
-    2. use a cache of size M=2*N
-    3. write in the cache at the position j and j+N
+    1. the colors are kept in a persistent numpy array, which a QImage wraps
+    without any copy, so that new columns are written in place
+    2. the array is M=2*N columns wide
+    3. each column is written at the positions j and j+N
     4. the data part that is to be drawn can be read contiguously from j+1 to j+1+N
     """
     canvasWidthChanged = QtCore.pyqtSignal(int)
@@ -44,25 +44,35 @@ class CanvasScaledSpectrogram(QtCore.QObject):
         self.canvas_height = canvas_height
         self.canvas_width = canvas_width
 
-        self.pixmap = QtGui.QPixmap(2 * self.canvas_width, self.canvas_height)
-        # print("pixmap info : hasAlpha =", self.pixmap.hasAlpha(), ", depth =", self.pixmap.depth(), ", default depth =", self.pixmap.defaultDepth())
-        self.pixmap.fill(QtGui.QColor("black"))
-        self.painter = QtGui.QPainter()
         self.write_offset = 0
         self.last_write_time = 0
+        self.erase()
+
+    def set_image_data(self, image_data: numpy.ndarray) -> None:
+        # the QImage reads the array memory directly, the array must stay alive with it
+        self.image_data = image_data
+        height, width = image_data.shape
+        # the stubs only declare bytes, which would be a copy: pass the array buffer itself
+        self.image = QtGui.QImage(image_data.data, width, height, width * 4, QtGui.QImage.Format.Format_RGB32) # type: ignore[call-overload]
 
     def erase(self):
-        self.pixmap = QtGui.QPixmap(2 * self.canvas_width, self.canvas_height)
-        self.pixmap.fill(QtGui.QColor("black"))
+        # opaque black
+        self.set_image_data(numpy.full((self.canvas_height, 2 * self.canvas_width), 0xff000000, dtype=numpy.uint32))
         self.write_offset = 0
 
-    # resize the pixmap and update the offsets accordingly
+    # resize the image and update the offsets accordingly
     def resize(self, width, height):
-        oldWidth = int(self.pixmap.width() / 2)
+        oldWidth = self.image_data.shape[1] // 2
         if width != oldWidth and width > 0 and oldWidth > 0:
-            self.write_offset = (self.write_offset % oldWidth) * width / oldWidth
+            self.write_offset = int((self.write_offset % oldWidth) * width / oldWidth)
             self.write_offset = self.write_offset % width  # to handle negative values
-        self.pixmap = self.pixmap.scaled(2 * width, height, QtCore.Qt.AspectRatioMode.IgnoreAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+
+        scaled = self.image.scaled(2 * width, height, QtCore.Qt.AspectRatioMode.IgnoreAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+        scaled = scaled.convertToFormat(QtGui.QImage.Format.Format_RGB32)
+        bits = scaled.constBits()
+        bits.setsize(scaled.sizeInBytes())
+        rows = numpy.frombuffer(bits, dtype=numpy.uint32).reshape(height, scaled.bytesPerLine() // 4)
+        self.set_image_data(rows[:, :2 * width].copy())
 
     def setcanvas_height(self, canvas_height):
         canvas_height = max(1, int(canvas_height))
@@ -85,51 +95,32 @@ class CanvasScaledSpectrogram(QtCore.QObject):
         xyzs = xyzs[::-1, :]
 
         width = xyzs.shape[1]
+        canvas_width = self.image_data.shape[1] // 2
 
-        # convert the data to colors, and then to a data string
-        # that QImage can understand
-        byteString = self.colors_to_bytes(xyzs)
-
-        myimage = self.prepare_image(byteString, width, xyzs.shape[0])
+        # only the most recent columns fit in the canvas. The rows
+        # that do not fit are clipped, as a painter would do.
+        kept = min(width, canvas_width)
+        rows = min(xyzs.shape[0], self.image_data.shape[0])
+        colors = xyzs[:rows, width - kept:]
 
-        # Now, draw the image onto the widget pixmap, which has
+        # write the colors in place into the image, which has
         # the structure of a 2D ringbuffer
-
-        offset = self.write_offset % max(self.canvas_width, 1)
+        offset = (self.write_offset + width - kept) % canvas_width
 
         # first copy, always complete
-        source1 = QtCore.QRectF(0, 0, width, xyzs.shape[0])
-        target1 = QtCore.QRectF(offset, 0, width, xyzs.shape[0])
+        self.image_data[:rows, offset:offset + kept] = colors
         # second copy, can be folded
-        direct = min(width, self.canvas_width - offset)
-        folded = width - direct
-        source2a = QtCore.QRectF(0, 0, direct, xyzs.shape[0])
-        target2a = QtCore.QRectF(offset + self.canvas_width, 0, direct, xyzs.shape[0])
-        source2b = QtCore.QRectF(direct, 0, folded, xyzs.shape[0])
-        target2b = QtCore.QRectF(0, 0, folded, xyzs.shape[0])
-
-        self.painter.begin(self.pixmap)
-        self.painter.drawImage(target1, myimage, source1)
-        self.painter.drawImage(target2a, myimage, source2a)
-        self.painter.drawImage(target2b, myimage, source2b)
-        self.painter.end()
+        direct = min(kept, canvas_width - offset)
+        folded = kept - direct
+        self.image_data[:rows, offset + canvas_width:offset + canvas_width + direct] = colors[:, :direct]
+        self.image_data[:rows, :folded] = colors[:, direct:]
 
         # updating the offset
         self.write_offset += width
         self.last_write_time = last_data_time
 
-    def colors_to_bytes(self, data):
-        return data.tobytes()
-
-    # defined as a separate function so that it appears in the profiler
-    # NOTE: QImage with a colormap is slower (by a factor of 2) than the custom
-    # colormap code here.
-    def prepare_image(self, byteString, width, height):
-        myimage = QtGui.QImage(byteString, width, height, width * 4, QtGui.QImage.Format.Format_RGB32)
-        return myimage
-
-    def getpixmap(self):
-        return self.pixmap
+    def getimage(self):
+        return self.image
 
     def getpixmapoffset(self, read_time: float, canvas_timerange: float) -> float:
         if self.canvas_width <= 0:
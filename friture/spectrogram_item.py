@@ -57,7 +57,7 @@ class SpectrogramItem(QQuickPaintedItem):
 
         if painter is None:
             return
-        painter.drawPixmap(
+        painter.drawImage(
             QRectF(0, 0, self.width(), self.height()),
-            self._curve.pixmap(),
+            self._curve.image(),
             pixmap_source_rect)
\ No newline at end of file
@@ -51,8 +51,8 @@ class SpectrogramImageData(QtCore.QObject):
     def draw(self):
         self.data_changed.emit()
 
-    def pixmap(self):
-        return self.canvasscaledspectrogram.getpixmap()
+    def image(self):
+        return self.canvasscaledspectrogram.getimage()
     
     def pixmap_source_rect(self, paint_time):
         pixmap_offset = self.canvasscaledspectrogram.getpixmapoffset(paint_time - self.jitter_seconds, self.T + self.jitter_seconds)
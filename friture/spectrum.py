@@ -18,7 +18,7 @@
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
 from PyQt6.QtCore import QObject
-from numpy import log10, argmax, zeros, arange, floor, float64, ones
+from numpy import log10, argmax, zeros, arange, ones, concatenate
 from friture.audioproc import audioproc  # audio processing class
 from friture.spectrum_settings import (Spectrum_Settings_Dialog,  # settings dialog
                                        DEFAULT_FFT_SIZE,
@@ -35,6 +35,9 @@ import friture.plotting.frequency_scales as fscales
 from friture.audiobackend import SAMPLING_RATE
 from friture.spectrumPlotWidget import SpectrumPlotWidget
 from friture.signal.exp_smoothing import exp_smoothed_value_2d
+from friture.stft_cache import GetSTFTCache
+from friture.analysis_lock import analysis_locked
+from friture.precision import sample_dtype
 
 
 class Spectrum_Widget(QObject):
@@ -62,7 +65,8 @@ class Spectrum_Widget(QObject):
         self.update_weighting()
         self.freq = self.proc.get_freq_scale()
 
-        self.old_index = 0
+        # read position in the audio buffer, set with the buffer
+        self.frame_cursor = None
         self.overlap = 3. / 4.
 
         self.update_display_buffers()
@@ -88,9 +92,13 @@ class Spectrum_Widget(QObject):
         return self.PlotZoneSpect.view_model()
 
     # method
+    @analysis_locked
     def set_buffer(self, buffer):
         self.audiobuffer = buffer
-        self.old_index = self.audiobuffer.ringbuffer.offset
+        self.frame_cursor = self.audiobuffer.frame_cursor(self.fft_size, self.hop_size())
+
+    def hop_size(self):
+        return int(self.fft_size * (1. - self.overlap))
 
     def log_spectrogram(self, sp):
         # Note: implementing the log10 of the array in Cython did not bring
@@ -123,52 +131,49 @@ class Spectrum_Widget(QObject):
         return res
 
     def handle_new_data(self, floatdata):
-        # we need to maintain an index of where we are in the buffer
-        index = self.audiobuffer.ringbuffer.offset
-
-        available = index - self.old_index
-
-        if available < 0:
-            # ringbuffer must have grown or something...
-            available = 0
-            self.old_index = index
-
-        # if we have enough data to add a frequency column in the time-frequency plane, compute it
-        needed = self.fft_size * (1. - self.overlap)
-        realizable = int(floor(available / needed))
+        result = self.analyze()
+        if result is not None:
+            self.present(result)
+
+    # method, called in the analysis worker thread when it is enabled
+    def analyze(self):
+        # all the new frames are analyzed at once. They end on the grid
+        # shared with the other docks, so that their power spectra come from
+        # the shared STFT cache (read-only).
+        block = self.frame_cursor.take()
+        realizable = block.frame_count
 
         if realizable > 0:
-            sp1n = zeros((len(self.freq), realizable), dtype=float64)
-            sp2n = zeros((len(self.freq), realizable), dtype=float64)
-
-            for i in range(realizable):
-                floatdata = self.audiobuffer.data_indexed(self.old_index, self.fft_size)
-
-                # first channel
-                # FFT transform
-                sp1n[:, i] = self.proc.analyzelive(floatdata[0, :])
-
-                if self.dual_channels and floatdata.shape[0] > 1:
-                    # second channel for comparison
-                    sp2n[:, i] = self.proc.analyzelive(floatdata[1, :])
-
-                self.old_index += int(needed)
-
-            # compute the widget data
-            sp1 = exp_smoothed_value_2d(self.kernel, self.alpha, sp1n, self.dispbuffers1)
-            sp2 = exp_smoothed_value_2d(self.kernel, self.alpha, sp2n, self.dispbuffers2)
+            hop = self.frame_cursor.hop
+            stop = block.stop
+            stft_cache = GetSTFTCache()
+            ringbuffer = self.audiobuffer.ringbuffer
+            two_channels = self.dual_channels and self.audiobuffer.channels() > 1
+            channels = 2 if two_channels else 1
+
+            # (frequencies, frames) power spectra of each channel, stacked
+            # along the frequency axis so that all the channels are smoothed
+            # in a single call
+            spectra = [stft_cache.power_spectra(ringbuffer, channel, self.fft_size, hop, stop, realizable).T
+                       for channel in range(channels)]
+            spn = spectra[0] if channels == 1 else concatenate(spectra)
+
+            if self.dispbuffers.shape[0] != channels:
+                self.update_display_buffers(channels)
+
+            # compute the widget data, one row per channel
+            sp = exp_smoothed_value_2d(self.kernel, self.alpha, spn, self.dispbuffers.reshape(-1))
+            sp.shape = self.dispbuffers.shape
             # store result for next computation
-            self.dispbuffers1 = sp1
-            self.dispbuffers2 = sp2
+            self.dispbuffers = sp
 
-            sp1.shape = self.freq.shape
-            sp2.shape = self.freq.shape
             self.w.shape = self.freq.shape
 
-            if self.dual_channels and floatdata.shape[0] > 1:
-                dB_spectrogram = self.log_spectrogram(sp2) - self.log_spectrogram(sp1)
+            if two_channels:
+                # second channel compared to the first one
+                dB_spectrogram = self.log_spectrogram(sp[1]) - self.log_spectrogram(sp[0])
             else:
-                dB_spectrogram = self.log_spectrogram(sp1) + self.w
+                dB_spectrogram = self.log_spectrogram(sp[0]) + self.w
 
             # the log operation and the weighting could be deffered
             # to the post-weedening !
@@ -177,11 +182,29 @@ class Spectrum_Widget(QObject):
 
             # The maximum value in the harmonic product spectrum is quite
             # likely to correspond to a fundamental frequency.
-            harmonic_products = self.harmonic_product_spectrum(sp1)
+            harmonic_products = self.harmonic_product_spectrum(sp[0])
             pitch_idx = argmax(harmonic_products)
             fpitch = max(self.freq[pitch_idx], 1e-20)
 
-            self.PlotZoneSpect.setdata(self.freq, dB_spectrogram, fmax, fpitch)
+            return self.freq, dB_spectrogram, fmax, fpitch
+
+        return None
+
+    # method, called before the analysis when the dock is shown again
+    def resync(self):
+        # the frames pushed while the dock was hidden are not analyzed,
+        # the smoothed spectrum converges again on the new frames
+        self.frame_cursor.skip()
+
+    # method, called in the worker thread when the GUI thread lags behind
+    def merge_results(self, older, newer):
+        # the smoothed spectrum of the newer result supersedes the older one
+        return newer
+
+    # method
+    def present(self, result):
+        freq, dB_spectrogram, fmax, fpitch = result
+        self.PlotZoneSpect.setdata(freq, dB_spectrogram, fmax, fpitch)
 
     # method
     def canvasUpdate(self):
@@ -193,6 +216,7 @@ class Spectrum_Widget(QObject):
     def restart(self):
         self.PlotZoneSpect.restart()
 
+    @analysis_locked
     def setresponsetime(self, response_time):
         # time = SMOOTH_DISPLAY_TIMER_PERIOD_MS/1000. #DISPLAY
         # time = 0.025 #IMPULSE setting for a sound level meter
@@ -219,11 +243,12 @@ class Spectrum_Widget(QObject):
 
     def compute_kernel(self, alpha, N):
         kernel = (1. - alpha) ** arange(N - 1, -1, -1)
-        return kernel
+        # same precision as the spectra, so that the smoothing state stays in it
+        return kernel.astype(sample_dtype())
 
-    def update_display_buffers(self):
-        self.dispbuffers1 = zeros(len(self.freq))
-        self.dispbuffers2 = zeros(len(self.freq))
+    def update_display_buffers(self, channels=1):
+        # one row of smoothed spectrum per analyzed channel
+        self.dispbuffers = zeros((channels, len(self.freq)), dtype=sample_dtype())
 
     def setminfreq(self, minfreq):
         self.setMinMaxFreq(minfreq, self.maxfreq)
@@ -231,6 +256,7 @@ class Spectrum_Widget(QObject):
     def setmaxfreq(self, maxfreq):
         self.setMinMaxFreq(self.minfreq, maxfreq)
 
+    @analysis_locked
     def setMinMaxFreq(self, minfreq, maxfreq):
         self.minfreq = minfreq
         self.maxfreq = maxfreq
@@ -248,8 +274,11 @@ class Spectrum_Widget(QObject):
 
         self.PlotZoneSpect.setfreqrange(realmin, realmax)
 
+    @analysis_locked
     def setfftsize(self, fft_size):
         self.fft_size = fft_size
+        if self.frame_cursor is not None:
+            self.frame_cursor.configure(self.fft_size, self.hop_size())
         self.proc.set_fftsize(self.fft_size)
         self.freq = self.proc.get_freq_scale()
         self.update_display_buffers()
@@ -257,6 +286,14 @@ class Spectrum_Widget(QObject):
         # reset kernel and parameters for the smoothing filter
         self.setresponsetime(self.response_time)
 
+    @analysis_locked
+    def setoverlap(self, overlap):
+        self.overlap = float(overlap)
+        if self.frame_cursor is not None:
+            self.frame_cursor.configure(self.fft_size, self.hop_size())
+        # the smoothing is defined per frame
+        self.setresponsetime(self.response_time)
+
     def setmin(self, value):
         self.spec_min = value
         self.PlotZoneSpect.setspecrange(self.spec_min, self.spec_max)
@@ -265,6 +302,7 @@ class Spectrum_Widget(QObject):
         self.spec_max = value
         self.PlotZoneSpect.setspecrange(self.spec_min, self.spec_max)
 
+    @analysis_locked
     def setweighting(self, weighting):
         self.weighting = weighting
         self.PlotZoneSpect.setweighting(weighting)
@@ -283,6 +321,7 @@ class Spectrum_Widget(QObject):
 
         self.w.shape = (1, self.w.size)
 
+    @analysis_locked
     def setdualchannels(self, dual_enabled):
         self.dual_channels = dual_enabled
         if dual_enabled:
@@ -19,6 +19,8 @@
 
 from PyQt6 import QtCore, QtWidgets, QtGui
 from friture.audiobackend import AudioBackend
+from friture.frame_scheduler import GetFrameScheduler
+from friture.timings import GetTimings, format_timings
 
 
 class StatisticsWidget(QtWidgets.QWidget):
@@ -48,9 +50,33 @@ class StatisticsWidget(QtWidgets.QWidget):
                                                 QtCore.Qt.TextInteractionFlag.TextBrowserInteraction | QtCore.Qt.TextInteractionFlag.TextSelectableByKeyboard | QtCore.Qt.TextInteractionFlag.TextSelectableByMouse)
         self.LabelStats.setObjectName("LabelStats")
 
+        self.timings_checkbox = QtWidgets.QCheckBox("Record the processing timings", self.scrollAreaWidgetContents)
+        self.timings_checkbox.setChecked(GetTimings().enabled)
+        self.timings_checkbox.toggled.connect(self.timings_toggled)
+
+        self.export_json_button = QtWidgets.QPushButton("Export JSON...", self.scrollAreaWidgetContents)
+        self.export_json_button.clicked.connect(self.export_json)
+        self.export_trace_button = QtWidgets.QPushButton("Export Chrome trace...", self.scrollAreaWidgetContents)
+        self.export_trace_button.clicked.connect(self.export_trace)
+
+        self.timings_layout = QtWidgets.QHBoxLayout()
+        self.timings_layout.addWidget(self.timings_checkbox)
+        self.timings_layout.addStretch()
+        self.timings_layout.addWidget(self.export_json_button)
+        self.timings_layout.addWidget(self.export_trace_button)
+
+        self.LabelTimings = QtWidgets.QLabel(self.scrollAreaWidgetContents)
+        self.LabelTimings.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeading | QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop)
+        self.LabelTimings.setTextInteractionFlags(QtCore.Qt.TextInteractionFlag.TextSelectableByKeyboard | QtCore.Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.LabelTimings.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.LabelTimings.setObjectName("LabelTimings")
+
         self.stats_layout = QtWidgets.QVBoxLayout(self.scrollAreaWidgetContents)
         self.stats_layout.setObjectName("stats_layout")
         self.stats_layout.addWidget(self.LabelStats)
+        self.stats_layout.addLayout(self.timings_layout)
+        self.stats_layout.addWidget(self.LabelTimings)
+        self.stats_layout.addStretch()
         self.stats_scrollarea.setWidget(self.scrollAreaWidgetContents)
 
         self.tab_stats_layout = QtWidgets.QGridLayout(self)
@@ -64,8 +90,37 @@ class StatisticsWidget(QtWidgets.QWidget):
             return
 
         label = "Chunk #%d\n"\
-            "Number of overflowed inputs (XRUNs): %d"\
+            "Number of overflowed inputs (XRUNs): %d\n\n%s"\
             % (AudioBackend().chunk_number,
-               AudioBackend().xruns)
+               AudioBackend().xruns,
+               GetFrameScheduler().describe())
 
         self.LabelStats.setText(label)
+
+        if GetTimings().enabled:
+            self.LabelTimings.setText(format_timings(GetTimings().summary()))
+
+    # slot
+    def timings_toggled(self, checked):
+        GetTimings().set_enabled(checked)
+        self.LabelTimings.setText("")
+
+    # slot
+    def export_json(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export the timings", "friture-timings.json", "JSON files (*.json)")
+        if not path:
+            return
+        try:
+            GetTimings().export_json(path)
+        except OSError as error:
+            QtWidgets.QMessageBox.critical(self, "Export failed", "The timings could not be written to %s:\n%s" % (path, error.strerror or error))
+
+    # slot
+    def export_trace(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export the Chrome trace", "friture-trace.json", "JSON files (*.json)")
+        if not path:
+            return
+        try:
+            GetTimings().export_chrome_trace(path)
+        except OSError as error:
+            QtWidgets.QMessageBox.critical(self, "Export failed", "The Chrome trace could not be written to %s:\n%s" % (path, error.strerror or error))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Process-wide cache of short-time Fourier transform frames.
+
+Several docks (spectrum, spectrogram, pitch tracker) analyze the same
+audio buffer with a windowed FFT. When their settings match, the cache
+computes each frame once and hands the same power spectra to all of them,
+so that the CPU use scales with the number of distinct analysis
+configurations instead of the number of docks.
+
+A configuration is identified by (ring buffer, channel, FFT size, window,
+hop size). Inside a configuration, frames are identified by the ring
+buffer offset at which they end. For two docks to share their frames, the
+frames must be on the same grid: by convention, the frames end at offsets
+that are multiples of the hop size (see aligned_stop and
+RingBufferCursor.align).
+"""
+
+from collections import OrderedDict
+
+from numpy import concatenate, ndarray, zeros
+
+from friture.audioproc import audioproc
+
+# the only window implemented by audioproc
+WINDOW = "hann"
+
+# number of analysis configurations kept in the cache. When the settings
+# of a dock change, its previous configuration becomes the least recently
+# used one and is eventually evicted.
+DEFAULT_MAX_CONFIGURATIONS = 8
+
+__stftCacheInstance = None
+
+
+def GetSTFTCache():
+    global __stftCacheInstance
+    if __stftCacheInstance is None:
+        __stftCacheInstance = STFTCache()
+    return __stftCacheInstance
+
+
+def aligned_stop(stop: int, hop: int) -> int:
+    """The largest offset on the shared frame grid that is not after 'stop'."""
+    return stop - stop % hop
+
+
+class _STFTEntry:
+    """The most recent frames of one analysis configuration."""
+
+    def __init__(self, fft_size: int):
+        self.proc = audioproc()
+        self.proc.set_fftsize(fft_size)
+
+        # consecutive power spectra, one per row, the last one ending at self.stop
+        self.spectra = zeros((0, fft_size // 2 + 1))
+        self.stop = 0
+        # number of frames to keep, grown to the largest request
+        self.capacity = 1
+
+    def first(self, hop: int) -> int:
+        return self.stop - (self.spectra.shape[0] - 1) * hop
+
+    def compute(self, ringbuffer, channel: int, fft_size: int, hop: int, stop: int, count: int) -> ndarray:
+        frames = ringbuffer.data_frames(stop, fft_size, hop, count)
+        return self.proc.analyze_frames(frames[channel])
+
+    def power_spectra(self, ringbuffer, channel: int, fft_size: int, hop: int, stop: int, count: int) -> ndarray:
+        self.capacity = max(self.capacity, count)
+
+        start = stop - (count - 1) * hop
+        cached = self.spectra.shape[0] > 0 \
+            and (stop - self.stop) % hop == 0 \
+            and start >= self.first(hop) \
+            and start <= self.stop + hop
+
+        if not cached:
+            # different frame grid, frames too old or not contiguous to the
+            # cached ones: start over from the requested frames
+            spectra = self.compute(ringbuffer, channel, fft_size, hop, stop, count)
+            self.stop = stop
+        elif stop > self.stop:
+            # compute the missing frames only, in a single batch
+            new_count = (stop - self.stop) // hop
+            new_spectra = self.compute(ringbuffer, channel, fft_size, hop, stop, new_count)
+            spectra = concatenate((self.spectra, new_spectra))[-max(self.capacity, count):]
+            self.stop = stop
+        else:
+            spectra = None
+
+        if spectra is not None:
+            # the arrays are shared between subscribers, they must not be modified
+            spectra.flags.writeable = False
+            self.spectra = spectra
+
+        end = self.spectra.shape[0] - (self.stop - stop) // hop
+        return self.spectra[end - count:end]
+
+
+class STFTCache:
+    """Shared STFT frames, with least-recently-used eviction of the configurations."""
+
+    def __init__(self, max_configurations: int = DEFAULT_MAX_CONFIGURATIONS):
+        self.max_configurations = max_configurations
+        self.entries: OrderedDict = OrderedDict()
+
+    def power_spectra(self, ringbuffer, channel: int, fft_size: int, hop: int, stop: int, count: int) -> ndarray:
+        """The power spectra of the 'count' frames of 'fft_size' samples of a
+        channel, spaced by 'hop' samples, the last one ending at 'stop'.
+
+        The result is a read-only (count, fft_size // 2 + 1) array, normalized
+        like audioproc.analyzelive. It is shared with the other docks that
+        request the same frames."""
+        key = (ringbuffer, channel, fft_size, WINDOW, hop)
+
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = _STFTEntry(fft_size)
+            self.entries[key] = entry
+            while len(self.entries) > self.max_configurations:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+
+        return entry.power_spectra(ringbuffer, channel, fft_size, hop, stop, count)
+
+    def clear(self) -> None:
+        self.entries.clear()
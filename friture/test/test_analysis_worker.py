@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from friture.analysis_worker import ResultQueue
+
+
+class ResultQueueTest(unittest.TestCase):
+    def test_merges_results_when_full(self):
+        queue = ResultQueue(maxlen=3, merge=lambda older, newer: older + newer)
+        for i in range(10):
+            queue.put([i])
+
+        # the results beyond the length are merged into the newest one
+        self.assertEqual(queue.drain(), [[0], [1], [2, 3, 4, 5, 6, 7, 8, 9]])
+        self.assertEqual(queue.dropped, 0)
+
+        queue.put([10])
+        self.assertEqual(queue.drain(), [[10]])
+
+    def test_counts_dropped_results(self):
+        queue = ResultQueue(maxlen=3)
+        for i in range(10):
+            queue.put(i)
+
+        with self.assertLogs("friture.analysis_worker", level="WARNING"):
+            self.assertEqual(queue.drain(), [7, 8, 9])
+        self.assertEqual(queue.dropped, 7)
+        self.assertEqual(queue.reported, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
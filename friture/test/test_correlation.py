@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.signal.correlation import Accumulating_GCC_PHAT, generalized_cross_correlation
+
+
+def delayed(x, delay):
+    # circular delay by a fractional number of samples, as a phase shift
+    f = np.fft.rfftfreq(len(x))
+    return np.fft.irfft(np.fft.rfft(x) * np.exp(-2j * np.pi * f * delay), n=len(x))
+
+
+class GCCPHATTest(unittest.TestCase):
+
+    length = 1024
+
+    def frames(self, x, count):
+        hop = self.length // 2
+        return np.stack([x[k * hop:k * hop + self.length] for k in range(count)])
+
+    def test_matches_lag_domain_smoothing(self):
+        rng = np.random.default_rng(6)
+        x0 = rng.standard_normal(self.length * 8)
+        x1 = np.roll(x0, 17) + 0.5 * rng.standard_normal(x0.size)
+        d0 = self.frames(x0, 12)
+        d1 = self.frames(x1, 12)
+
+        # the previous estimator: one correlation per frame, smoothed
+        alpha = 0.3
+        smoothed = None
+        for f0, f1 in zip(d0, d1):
+            Xcorr = generalized_cross_correlation(f0.copy(), f1.copy())
+            smoothed = Xcorr if smoothed is None else alpha * Xcorr + (1. - alpha) * smoothed
+
+        gcc = Accumulating_GCC_PHAT(alpha)
+        # in uneven batches of frames
+        for start, stop in ((0, 1), (1, 6), (6, 6), (6, 12)):
+            gcc.push(d0[start:stop], d1[start:stop])
+
+        npt.assert_allclose(gcc.correlation(), smoothed, atol=1e-12)
+
+        lag, extremum, peak_ratio = gcc.estimate()
+        self.assertAlmostEqual(lag, 17., delta=0.05)
+        self.assertGreater(extremum, 0.)
+        self.assertGreater(peak_ratio, 1.)
+
+    def test_sub_sample_lag(self):
+        rng = np.random.default_rng(7)
+        x0 = rng.standard_normal(self.length * 4)
+        # band-limited, so that the correlation peak spans a few samples
+        x0 = np.convolve(x0, np.hanning(9), mode='same')
+
+        for delay in (-30.3, 5.5, 12.25):
+            x1 = -delayed(x0, delay)
+            gcc = Accumulating_GCC_PHAT()
+            gcc.push(self.frames(x0, 7), self.frames(x1, 7))
+
+            lag, extremum, _ = gcc.estimate()
+            self.assertAlmostEqual(lag, delay, delta=0.05)
+            self.assertLess(extremum, 0.)
+
+    def test_silent_frames(self):
+        gcc = Accumulating_GCC_PHAT()
+        silence = np.zeros((3, self.length))
+        gcc.push(silence, np.ones((3, self.length)))
+
+        self.assertFalse(gcc.last_frame_valid)
+        self.assertEqual(gcc.estimate(), (0., 0., 0.))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture import generated_filters
+from friture.longlevels import gauss
+from friture.signal.decimate import Decimator
+from friture.signal.lfilter import lfilter_float64_1D
+
+
+def filters():
+    bdec, adec = generated_filters.PARAMS['dec']
+    yield np.array(bdec), np.array(adec)
+
+    b = np.array(gauss(11, 2.))
+    a = np.zeros(b.shape)
+    a[0] = 1.
+    yield b, a
+
+
+def decimate_whole(Ndec, b, a, x):
+    # filter the whole signal at full rate and drop every other sample
+    for i in range(Ndec):
+        x, _ = lfilter_float64_1D(b, a, x, np.zeros(len(b) - 1))
+        x = x[::2]
+    return x
+
+
+class DecimatorTest(unittest.TestCase):
+    """The streaming decimator matches the decimation of the whole signal,
+    whatever the lengths of the blocks."""
+
+    # odd lengths shift the phase of the stages, the empty block is a no-op
+    block_lengths = [1, 7, 480, 0, 3, 64, 129, 1000, 2]
+
+    def test_matches_whole_signal(self):
+        rng = np.random.default_rng(4)
+        x = rng.standard_normal(sum(self.block_lengths))
+        edges = np.cumsum([0] + self.block_lengths)
+
+        for b, a in filters():
+            for Ndec in range(1, 5):
+                decimator = Decimator(Ndec, b, a)
+                y = np.concatenate([decimator.push(x[start:stop]) for start, stop in zip(edges[:-1], edges[1:])])
+
+                expected = decimate_whole(Ndec, b, a, x)
+                self.assertEqual(y.shape, expected.shape)
+                # rounding of the block IIR engine, see test_lfilter
+                npt.assert_allclose(y, expected, rtol=0, atol=1e-9 * np.abs(expected).max())
+
+    def test_reset(self):
+        b, a = next(filters())
+        x = np.random.default_rng(5).standard_normal(101)
+
+        decimator = Decimator(3, b, a)
+        first = decimator.push(x)
+        decimator.reset()
+        npt.assert_array_equal(decimator.push(x), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
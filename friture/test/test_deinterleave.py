@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.audiobackend import channel_index, deinterleave_regions
+
+
+class DeinterleaveTest(unittest.TestCase):
+    def test_channel_index(self):
+        self.assertEqual(channel_index([0]), slice(0, 1))
+        self.assertEqual(channel_index([2, 3, 4]), slice(2, 5))
+        npt.assert_array_equal(channel_index([3, 1]), [3, 1])
+        npt.assert_array_equal(channel_index([1, 1]), [1, 1])
+
+    def test_matches_channel_map(self):
+        # interleaved frames of a 16-channel device, split by the wrap-around
+        # of the audio ring buffer
+        rng = np.random.default_rng(2)
+        samples = rng.standard_normal((16, 700)).astype(np.float32)
+        interleaved = samples.T.copy()
+        regions = (interleaved[:300].tobytes(), interleaved[300:].tobytes())
+
+        for channel_map in ([0], [1], [0, 1], list(range(16)), [4, 5, 6, 7], [15, 0, 3], [2, 2]):
+            for dtype in (np.float32, np.float64):
+                out = np.empty((len(channel_map), 700), dtype=dtype)
+                deinterleave_regions(out, regions, 16, channel_index(channel_map))
+                npt.assert_array_equal(out, samples[channel_map])
+
+
+if __name__ == '__main__':
+    unittest.main()
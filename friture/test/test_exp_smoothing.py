@@ -6,6 +6,14 @@ import numpy.testing as npt
 
 from friture.signal import exp_smoothing as esc
 
+def band_reference(kernel, alpha, band, previous):
+    # beyond the kernel length, only the most recent samples are kept, and
+    # the previous value is forgotten
+    if band.shape[1] > kernel.shape[0]:
+        return esc.exp_smoothed_value_2d(kernel, alpha, band[:, -kernel.shape[0]:] ** 2, 0. * previous)
+    return esc.exp_smoothed_value_2d(kernel, alpha, band ** 2, previous)
+
+
 class ExpSmoothingTest(unittest.TestCase):
     def test_uniform_rows(self):
         # rows with identical time-series should produce identical filtered values
@@ -43,6 +51,30 @@ class ExpSmoothingTest(unittest.TestCase):
         # outputs should be strictly increasing with the multiplier
         self.assertTrue((out[1:] > out[:-1]).all())
 
+    def test_band_energy_integrator_matches_per_band(self):
+        # three groups of bands, as three decimation stages would give them
+        decs = np.repeat([4, 2, 1], 3)
+        alphas = 1. - 0.35 ** (1. / (100. / decs + 1))
+        kernel_lengths = 64 // decs
+        kernels = [(1. - alpha) ** np.arange(Nk - 1, -1, -1) for alpha, Nk in zip(alphas, kernel_lengths)]
+
+        integrator = esc.BandEnergyIntegrator(alphas, kernel_lengths)
+        self.assertEqual(len(integrator.groups), 3)
+
+        rng = np.random.default_rng(2)
+        channels = 2
+        previous = [np.zeros(channels) for _ in decs]
+        # blocks shorter and longer than the kernels
+        for N in [8, 0, 40, 128, 4]:
+            groups_data = [rng.standard_normal((channels, 3, N // dec)) for dec in (4, 2, 1)]
+            out = integrator.push(groups_data)
+
+            bands = [group[:, i, :] for group in groups_data for i in range(3)]
+            previous = [band_reference(kernel, alpha, band, old)
+                        for band, kernel, alpha, old in zip(bands, kernels, alphas, previous)]
+
+            npt.assert_allclose(out, np.array(previous).T, rtol=1e-12)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from friture.frame_scheduler import (
+    DEGRADE_OVERRUNS,
+    MIN_UPDATE_RATE,
+    OVERLAPS,
+    RECOVERY_WINDOWS,
+    WINDOW_TICKS,
+    FrameScheduler,
+)
+
+
+class Client:
+    def __init__(self):
+        self.overlaps = []
+
+    def set_overlap(self, overlap):
+        self.overlaps.append(overlap)
+
+
+class FrameSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = FrameScheduler(budget=0.010)
+        self.now = 0.
+
+    def run_ticks(self, count, duration, costs):
+        # ticks 10 ms apart, with some jitter
+        updates = {client: 0 for client in costs}
+        for i in range(count):
+            self.now += 0.010 + (0.001 if i % 2 else -0.001)
+            for client, cost in costs.items():
+                if self.scheduler.due(client, self.now):
+                    updates[client] += 1
+                    self.scheduler.record_cost(client, cost)
+            self.scheduler.end_tick(duration)
+        return updates
+
+    def test_preferred_rates(self):
+        fast, slow = Client(), Client()
+        self.scheduler.add_client(fast, 100, "fast")
+        self.scheduler.add_client(slow, 10, "slow")
+
+        updates = self.run_ticks(200, 0.002, {fast: 0.001, slow: 0.001})
+        self.assertEqual(updates[fast], 200)
+        self.assertAlmostEqual(updates[slow], 20, delta=1)
+
+    def test_degrades_rates_then_overlap(self):
+        cheap, costly = Client(), Client()
+        self.scheduler.add_client(cheap, 100, "cheap")
+        self.scheduler.add_client(costly, 100, "costly")
+        costs = {cheap: 0.001, costly: 0.008}
+
+        # the first step slows down the dock that takes the most time
+        self.run_ticks(WINDOW_TICKS, 0.015, costs)
+        self.assertEqual(self.scheduler.clients[costly].divider, 2)
+        self.assertEqual(self.scheduler.clients[cheap].divider, 1)
+        self.assertEqual(self.scheduler.overlap, OVERLAPS[0])
+
+        # then the rates go down to the minimum before the overlap is coarsened
+        while self.scheduler.overlap == OVERLAPS[0]:
+            self.run_ticks(WINDOW_TICKS, 0.015, costs)
+        for scheduled in self.scheduler.clients.values():
+            self.assertFalse(scheduled.can_slow_down())
+            self.assertGreaterEqual(scheduled.rate(), MIN_UPDATE_RATE)
+        self.assertEqual(costly.overlaps, [OVERLAPS[1]])
+
+        # back within the budget, the overlap is refined first
+        self.run_ticks(RECOVERY_WINDOWS * WINDOW_TICKS, 0.002, costs)
+        self.assertEqual(self.scheduler.overlap, OVERLAPS[0])
+        self.assertEqual(costly.overlaps, [OVERLAPS[1], OVERLAPS[0]])
+        self.assertGreater(self.scheduler.clients[cheap].divider, 1)
+
+        self.run_ticks(100 * RECOVERY_WINDOWS * WINDOW_TICKS, 0.002, costs)
+        self.assertEqual([scheduled.divider for scheduled in self.scheduler.clients.values()], [1, 1])
+
+    def test_isolated_overruns_are_ignored(self):
+        client = Client()
+        self.scheduler.add_client(client, 100, "client")
+        for _ in range(10):
+            self.run_ticks(WINDOW_TICKS - DEGRADE_OVERRUNS + 1, 0.002, {client: 0.001})
+            self.run_ticks(DEGRADE_OVERRUNS - 1, 0.020, {client: 0.001})
+        self.assertEqual(self.scheduler.clients[client].divider, 1)
+        self.assertEqual(self.scheduler.overruns, 10 * (DEGRADE_OVERRUNS - 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
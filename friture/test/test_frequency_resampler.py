@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+import friture.plotting.frequency_scales as fscales
+from friture.signal.frequency_resampler import Frequency_Resampler
+
+
+class FrequencyResamplerTest(unittest.TestCase):
+    def reference(self, resampler, data):
+        return np.array([np.interp(resampler.xscaled, resampler.freq, data[:, j]) for j in range(data.shape[1])]).T
+
+    def test_matches_interp(self):
+        rng = np.random.default_rng(0)
+        resampler = Frequency_Resampler(minfreq=20., maxfreq=22000.)
+
+        for scale in [fscales.Linear, fscales.Logarithmic, fscales.Mel, fscales.Erb, fscales.Octave]:
+            for fft_size, nsamples in [(256, 300), (4096, 700), (32768, 450)]:
+                resampler.setfreqscale(scale)
+                resampler.setfreq(np.linspace(0, 24000, fft_size // 2 + 1))
+                resampler.setnsamples(nsamples)
+
+                data = rng.random((fft_size // 2 + 1, 5))
+                npt.assert_allclose(resampler.push(data), self.reference(resampler, data), rtol=1e-12, atol=1e-12)
+
+    def test_table_follows_the_settings(self):
+        resampler = Frequency_Resampler(minfreq=100., maxfreq=1000., nsamples=10)
+        resampler.setfreq(np.linspace(0, 24000, 1025))
+        data = np.tile(np.linspace(0, 24000, 1025)[:, None], (1, 2))
+        # a linear ramp is interpolated exactly
+        npt.assert_allclose(resampler.push(data)[:, 0], resampler.xscaled)
+
+        resampler.setfreqrange(200., 2000.)
+        npt.assert_allclose(resampler.push(data)[:, 1], resampler.xscaled)
+        self.assertAlmostEqual(resampler.xscaled[-1], 2000.)
+
+        resampler.setnsamples(20)
+        self.assertEqual(resampler.push(data).shape, (20, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.iec import dB_to_IEC
+from friture.signal.exp_smoothing import exp_smoothed_value
+from friture.signal.level_meter import LevelMeter, PEAK_DECAY_RATE, PEAK_FALLOFF
+
+
+class ChannelLevelsReference:
+    # the scalar code that Levels_Widget and BallisticPeak used to run
+    # for each channel
+    def __init__(self, meter):
+        self.meter = meter
+        self.old_rms = 1e-30
+        self.old_max = 1e-30
+        self.peak_iec = 0
+        self.peak_hold_counter = 0
+        self.peak_decay_factor = PEAK_DECAY_RATE
+
+    def push(self, y):
+        if len(y) > 0:
+            value_max = np.abs(y).max()
+            if value_max > self.old_max * (1. - self.meter.peak_alpha):
+                self.old_max = value_max
+            else:
+                self.old_max *= (1. - self.meter.peak_alpha)
+
+        self.old_rms = exp_smoothed_value(self.meter.kernel, self.meter.alpha, y ** 2, self.old_rms)
+
+        level_rms = 10. * np.log10(self.old_rms)
+        level_max = 20. * np.log10(self.old_max)
+        peak_iec = dB_to_IEC(max(level_max, level_rms))
+
+        if peak_iec > self.peak_iec:
+            self.peak_iec = peak_iec
+            self.peak_hold_counter = 0
+            self.peak_decay_factor = PEAK_DECAY_RATE
+        elif self.peak_hold_counter + 1 <= PEAK_FALLOFF:
+            self.peak_hold_counter += 1
+        else:
+            new_peak_iec = self.peak_decay_factor * float(self.peak_iec)
+            if new_peak_iec < peak_iec:
+                new_peak_iec = peak_iec
+                self.peak_hold_counter = 0
+                self.peak_decay_factor = PEAK_DECAY_RATE
+            else:
+                self.peak_decay_factor *= self.peak_decay_factor
+            self.peak_iec = new_peak_iec
+
+        return level_rms, level_max, self.peak_iec
+
+
+class LevelMeterTest(unittest.TestCase):
+    def test_matches_per_channel_reference(self):
+        meter = LevelMeter(48000)
+        references = []
+        rng = np.random.default_rng(4)
+
+        # bursts and silences, so that the peaks rise, hold and fall off,
+        # and a channel count that changes along the way
+        for block in range(200):
+            channels = 3 if block < 120 else 5
+            length = [512, 1024, 0, 37][block % 4]
+            gain = np.where(np.arange(channels) % 2 == 0, 1., 1e-3) if (block // 40) % 2 == 0 else np.full(channels, 1e-2)
+            data = gain[:, np.newaxis] * rng.standard_normal((channels, length))
+
+            references = references[:channels] + [ChannelLevelsReference(meter) for _ in range(len(references), channels)]
+            expected = np.array([reference.push(y) for reference, y in zip(references, data)])
+
+            meter.push(data)
+
+            npt.assert_allclose(meter.levels_rms, expected[:, 0], rtol=1e-9)
+            npt.assert_allclose(meter.levels_max, expected[:, 1], rtol=1e-12)
+            npt.assert_allclose(meter.peak_iec, expected[:, 2], rtol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import tracemalloc
 import unittest
 import numpy as np
 
@@ -99,6 +100,71 @@ class OctaveFilterTest(unittest.TestCase):
                         msg=f"bpo={bpo} band {i}: rel_err={rel_err:.4f}, energy_ratio={energy_ratio:.4f}"
                     )
 
+    def test_multichannel_matches_single_channel(self):
+        """Each channel of a (channels, samples) block should be filtered
+        as if it were alone, with its own state across blocks."""
+        rng = np.random.default_rng(7)
+        x = rng.standard_normal((3, self.block_size * 3))
+        # uneven blocks, shorter and longer than the FIR
+        bounds = [0, 100, 1200, x.shape[1]]
+        for bpo in [1, 3]:
+            ofs = Octave_Filters(bpo)
+            y = [[band.copy() for band in ofs.filter(x[:, start:stop])[0]]
+                 for start, stop in zip(bounds[:-1], bounds[1:])]
+
+            for channel in range(x.shape[0]):
+                ofs_channel = Octave_Filters(bpo)
+                for yb, start, stop in zip(y, bounds[:-1], bounds[1:]):
+                    yb_channel, _ = ofs_channel.filter(x[channel, start:stop])
+                    for band, band_channel in zip(yb, yb_channel):
+                        np.testing.assert_allclose(band[channel], band_channel, rtol=1e-12, atol=1e-12)
+
+    def test_blocks_match_single_block(self):
+        """Blocks of any length, odd or longer than the planned capacity,
+        should give the same outputs as one long block."""
+        rng = np.random.default_rng(11)
+        x = rng.standard_normal((2, 5000))
+        bounds = [0, 1, 480, 1503, 4000, x.shape[1]]
+        for bpo in [1, 3]:
+            y_single, _ = Octave_Filters(bpo).filter(x)
+
+            ofs = Octave_Filters(bpo)
+            y_blocks = [[] for _ in range(NOCTAVE * bpo)]
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                yb, _ = ofs.filter(x[:, start:stop])
+                for band, band_blocks in zip(yb, y_blocks):
+                    band_blocks.append(band.copy())
+
+            for band, band_blocks in zip(y_single, y_blocks):
+                np.testing.assert_allclose(np.concatenate(band_blocks, axis=-1), band, rtol=1e-10, atol=1e-10)
+
+    def test_no_steady_state_allocation(self):
+        """Once planned, filtering should not allocate any array: the
+        traced memory peak must not depend on the size of the workspaces."""
+        rng = np.random.default_rng(5)
+        blocks = [rng.standard_normal((2, n)).astype(np.float32) for n in (480, 512, 479, 1024)]
+
+        peaks = []
+        for bpo in [1, 24]:
+            ofs = Octave_Filters(bpo)
+            for block in blocks:
+                ofs.filter_bank.filter(block)
+
+            tracemalloc.start()
+            try:
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                for block in blocks:
+                    ofs.filter_bank.filter(block)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            peaks.append(peak - current)
+
+        # a single (frequencies, channels, bands) temporary of the first
+        # stage would take 590 kB with 24 bands per octave
+        self.assertLess(max(peaks), 16 * 1024, msg=f"peaks: {peaks}")
+
 
 if __name__ == "__main__":
     unittest.main()
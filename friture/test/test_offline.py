@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+import numpy.testing as npt
+
+from friture.audio_format import SAMPLING_RATE
+from friture.offline import ANALYSES, METADATA_FILE_NAME, OfflineAnalyzer, decode_pcm, period_length
+
+
+def write_wav(path, samples, sample_width=2, sample_rate=SAMPLING_RATE):
+    # samples: (channels, frames) in [-1, 1)
+    scale = 2 ** (8 * sample_width - 1)
+    ints = np.ascontiguousarray(np.round(samples.T * scale).astype(np.int64).clip(-scale, scale - 1))
+    data = ints.astype("<i4").view(np.uint8).reshape(ints.shape + (4,))[..., :sample_width]
+    with wave.open(path, "wb") as f:
+        f.setnchannels(samples.shape[0])
+        f.setsampwidth(sample_width)
+        f.setframerate(sample_rate)
+        f.writeframes(data.tobytes())
+
+
+class OfflineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "input.wav")
+
+        # 2.3 seconds: the end of the file is an incomplete period
+        t = np.arange(int(2.3 * SAMPLING_RATE)) / SAMPLING_RATE
+        rng = np.random.default_rng(2)
+        self.samples = np.stack([
+            0.5 * np.sin(2 * np.pi * 220. * t),
+            0.1 * rng.standard_normal(t.size).clip(-0.9, 0.9)])
+        write_wav(self.path, self.samples)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def analyze(self, name, **kwargs):
+        output_dir = os.path.join(self.directory.name, name)
+        metadata = OfflineAnalyzer(**kwargs).run(self.path, output_dir)
+        with open(os.path.join(output_dir, METADATA_FILE_NAME)) as f:
+            self.assertEqual(json.load(f), metadata)
+        return {name: np.load(os.path.join(output_dir, output["file"]))
+                for name, output in metadata["outputs"].items()}, metadata
+
+    def test_results(self):
+        results, metadata = self.analyze("all")
+
+        period = period_length(0.1)
+        periods = self.samples.shape[1] // period
+        self.assertEqual(metadata["period"], period)
+        self.assertEqual(sorted(results), sorted(ANALYSES))
+        for name, output in metadata["outputs"].items():
+            self.assertEqual(list(results[name].shape), output["shape"])
+        self.assertEqual(results["levels"].shape, (periods, 2, 2))
+        self.assertEqual(results["octave"].shape[:2], (periods, 2))
+
+        # RMS and peak of each period, up to the 16-bit quantization
+        x = self.samples[:, :periods * period].reshape(2, periods, period)
+        npt.assert_allclose(results["levels"][..., 0], 10 * np.log10(np.mean(x ** 2, axis=-1)).T, atol=0.01)
+        npt.assert_allclose(results["levels"][..., 1], 20 * np.log10(np.max(np.abs(x), axis=-1)).T, atol=0.01)
+
+        # the first frame ends in the first period, at the FFT size
+        spectrum = results["spectrum"]
+        self.assertFalse(np.isnan(spectrum).any())
+        peak = np.nanargmax(spectrum[-1, 0]) * metadata["outputs"]["spectrum"]["frequency_step"]
+        self.assertLess(abs(peak - 220.), 12.)
+
+        frequencies = np.array(metadata["outputs"]["octave"]["frequencies"])
+        self.assertLess(abs(np.log2(frequencies[np.argmax(results["octave"][-1, 0])] / 220.)), 1. / 6)
+
+        npt.assert_allclose(results["pitch"], 220., rtol=0.01)
+
+    def test_block_length_does_not_change_results(self):
+        reference, _ = self.analyze("reference")
+        # one period per block, on the second channel only
+        results, metadata = self.analyze("small_blocks", block_periods=1, channel_map=[1])
+
+        self.assertEqual(metadata["channels"], [1])
+        for name in ("levels", "octave", "spectrum"):
+            npt.assert_allclose(results[name][:, 0], reference[name][:, 1], atol=1e-3)
+
+    def test_decode_pcm(self):
+        samples = np.array([[-1., -0.5, 0., 0.25, 0.5 - 2 ** -15]])
+        for width in (2, 3, 4):
+            write_wav(self.path, samples, sample_width=width)
+            with wave.open(self.path, "rb") as f:
+                data = f.readframes(f.getnframes())
+            npt.assert_array_equal(decode_pcm(data, width, 1), samples)
+
+        unsigned = bytes([0, 64, 128, 160, 255])
+        npt.assert_array_equal(decode_pcm(unsigned, 1, 1), [[-1., -0.5, 0., 0.25, 127. / 128.]])
+
+    def test_unsupported_sample_rate(self):
+        write_wav(self.path, self.samples, sample_rate=44100)
+        with self.assertRaises(ValueError):
+            OfflineAnalyzer().run(self.path, os.path.join(self.directory.name, "output"))
+
+
+if __name__ == '__main__':
+    unittest.main()
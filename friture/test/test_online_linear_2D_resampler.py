@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.signal.linear_interp import linear_interp_2D
+from friture.signal.online_linear_2D_resampler import Online_Linear_2D_resampler
+
+
+class ColumnByColumnResampler(Online_Linear_2D_resampler):
+    """The previous implementation, one input column at a time.
+
+    The output columns are collected in a list: the preallocated output of
+    the original code could be one column too short because of rounding."""
+
+    def push(self, data):
+        self.set_height(data.shape[0])
+
+        time_sample_count = data.shape[1]
+        output_data = [np.zeros((self.height, 0))]
+        resampled_data = np.zeros((self.height, 1))
+
+        for j in range(time_sample_count):
+            self.orig_index += 1.
+            n = self.processable(0)
+            if n <= 0:
+                self.old_data = data[:, j]
+                continue
+
+            if resampled_data.shape[1] < n:
+                resampled_data = np.zeros((self.height, n))
+
+            self.resampled_index = linear_interp_2D(
+                resampled_data, data[:, j], self.old_data,
+                self.orig_index, self.resampled_index, self.resampling_ratio, n)
+
+            self.old_data = data[:, j]
+
+            output_data.append(resampled_data[:, :n].copy())
+
+        return np.concatenate(output_data, axis=1)
+
+
+class OnlineLinear2DResamplerTest(unittest.TestCase):
+    def assert_same_stream(self, results, expected):
+        # when an output sample falls exactly on an input column, the rounding
+        # errors decide whether it is emitted at the end of one push or at the
+        # start of the next one. Its value is the same, so compare the streams
+        result = np.concatenate(results, axis=1)
+        expected = np.concatenate(expected, axis=1)
+        self.assertLessEqual(abs(result.shape[1] - expected.shape[1]), 1)
+        n = min(result.shape[1], expected.shape[1])
+        npt.assert_allclose(result[:, :n], expected[:, :n], rtol=1e-12, atol=1e-12)
+
+    def check(self, L, M, block_sizes, height=7):
+        rng = np.random.default_rng(L * 1000 + M)
+        vectorized = Online_Linear_2D_resampler(L, M, height)
+        reference = ColumnByColumnResampler(L, M, height)
+
+        results = []
+        expected = []
+        for block_size in block_sizes:
+            data = rng.random((height, block_size))
+            expected.append(reference.push(data))
+            results.append(vectorized.push(data))
+            self.assertLessEqual(abs(results[-1].shape[1] - expected[-1].shape[1]), 1)
+            self.assertEqual(vectorized.orig_index, reference.orig_index)
+
+        self.assert_same_stream(results, expected)
+
+    def test_upsampling(self):
+        # fewer spectrogram columns than screen pixels
+        self.check(7, 3, [1, 5, 2, 0, 17, 3, 30, 1, 1, 1])
+
+    def test_downsampling(self):
+        self.check(3, 8, [1, 5, 2, 0, 17, 3, 40])
+
+    def test_unit_ratio(self):
+        self.check(1, 1, [4, 1, 9])
+
+    def test_ratio_and_height_changes(self):
+        rng = np.random.default_rng(0)
+        vectorized = Online_Linear_2D_resampler(5, 2, 4)
+        reference = ColumnByColumnResampler(5, 2, 4)
+
+        for L, M, height in [(5, 2, 4), (2, 9, 4), (2, 9, 6), (11, 4, 3)]:
+            vectorized.set_ratio(L, M)
+            reference.set_ratio(L, M)
+            results = []
+            expected = []
+            for block_size in [3, 1, 8]:
+                data = rng.random((height, block_size))
+                expected.append(reference.push(data))
+                results.append(vectorized.push(data))
+            self.assert_same_stream(results, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,12 +17,91 @@
 # along with Friture.  If not, see <http://www.gnu.org/licenses/>.
 
 import unittest
+from typing import Optional, Tuple
+
 import numpy as np
 import numpy.testing as npt
 
 from friture.pitch_tracker import *
 from friture.ringbuffer import RingBuffer
 
+def dense_kernels(tracker: PitchTracker) -> np.ndarray:
+    # the (candidates, log-spaced freqs) kernel matrix that PitchTracker used to keep
+    return np.stack([calcCosineKernel(freq, tracker.logSpacedFreqs) for freq in tracker.pitchCandidates])
+
+
+def calcCosineKernel_reference(f: float, freqList: np.ndarray) -> np.ndarray:
+    # the harmonic by harmonic construction that calcCosineKernel used to be
+    harmonics = np.array([1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 13, 17, 19, 23])
+    peakWidth = 0.15
+    valleyWidth = 1 - peakWidth
+    valleyDivisor = 2
+    decayStartHarmonic = 2
+    maxPossibleHarmonics = min(int(freqList[-1] / f), len(harmonics))
+    selectedHarmonics = harmonics[:maxPossibleHarmonics]
+    ratio = freqList / f
+    k = np.zeros_like(freqList)
+    for i in np.arange(1, harmonics[-1] + 1):
+        a = ratio - i
+        if i in selectedHarmonics:
+            valleyMask = np.logical_and(-valleyWidth < a, a < -peakWidth)
+            k[valleyMask] = -np.cos((a[valleyMask] + 0.5) / ((valleyWidth - peakWidth) / 2) * (np.pi / 2)) / valleyDivisor
+            peakMask = np.abs(a) < peakWidth
+            k[peakMask] = np.cos(a[peakMask] / peakWidth * (np.pi / 2))
+        else:
+            valleyMask = np.logical_and(-valleyWidth < a, a < peakWidth)
+            k[valleyMask] = -np.cos((a[valleyMask] + 0.5) / ((valleyWidth - peakWidth) / 2) * (np.pi / 2)) / valleyDivisor
+            peakMask = np.abs(a) < peakWidth
+            k[peakMask] = np.cos(a[peakMask] / peakWidth * (np.pi / 2)) / 4
+    decay = np.where(freqList <= f*(decayStartHarmonic + peakWidth), np.sqrt(1.0 / (f*(decayStartHarmonic + peakWidth))), np.sqrt(1.0 / freqList)) /  np.sqrt(1.0/(f*(decayStartHarmonic + peakWidth)))
+    k *= decay
+    k /= np.sum(k[k >0])
+    k /= maxPossibleHarmonics / len(harmonics)
+    return k
+
+
+def estimate_pitch_reference(tracker: PitchTracker, frame: np.ndarray, spectrum: np.ndarray,
+                             kernels: Optional[np.ndarray] = None) -> float:
+    # the frame by frame estimator that PitchTracker.update used to call
+    freqLin = np.arange(len(spectrum), dtype='float64')
+    freqLin *= float(tracker.sample_rate) / float(tracker.fft_size)
+    specLog = np.interp(tracker.logSpacedFreqs, freqLin, spectrum)
+    specLogNorm = specLog / np.sqrt(np.mean(specLog**2))
+    if kernels is None:
+        kernels = dense_kernels(tracker)
+    pitchStrengths = np.matmul(kernels, specLogNorm)
+    idxMax = np.argmax(pitchStrengths)
+    idxShift = 0.
+    if 0 < idxMax < len(pitchStrengths) - 1:
+        idxShift = float(fastParabolicInterp(*pitchStrengths[idxMax - 1:idxMax + 2])[0])
+    f0 = np.interp(idxMax + idxShift, np.arange(len(tracker.logSpacedFreqs)), tracker.logSpacedFreqs)
+    dBFS = 20 * np.log10(np.sqrt(np.mean(frame**2)) + np.finfo(np.float64).eps)
+    if tracker.prev_f0 is not None:
+        semitoneDiff = 12 * np.abs(np.log2(f0 / tracker.prev_f0))
+    else:
+        semitoneDiff = 0
+    pitchConf = pitchStrengths[idxMax] / 2.56
+    if (dBFS < tracker.min_db) or (pitchConf < tracker.conf) or (semitoneDiff > tracker.p_delta):
+        tracker.prev_f0 = None
+        return np.nan
+    tracker.prev_f0 = f0
+    return f0
+
+
+def voice_like_frames(tracker: PitchTracker, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    # harmonic tones with a gliding pitch, a jump, and a silent gap
+    rng = np.random.default_rng(8)
+    hop = tracker.hop_size()
+    n = np.arange(tracker.fft_size + (count - 1) * hop)
+    f = np.where(n < n.size // 2, 150. + 50. * n / n.size, 400.)
+    phase = 2 * np.pi * np.cumsum(f) / tracker.sample_rate
+    x = sum(np.sin(h * phase) / h for h in range(1, 6)) + 0.01 * rng.standard_normal(n.size)
+    x[(n > 0.6 * n.size) & (n < 0.7 * n.size)] = 0.
+    frames = np.stack([x[k * hop:k * hop + tracker.fft_size] for k in range(count)])[:, np.newaxis, :]
+    spectra = np.abs(np.fft.rfft(frames[:, 0, :] * tracker.proc.window, axis=-1))
+    return frames, spectra
+
+
 class PitchTrackerTest(unittest.TestCase):
     def test_new_frames(self) -> None:
         buf = RingBuffer()
@@ -69,3 +148,54 @@ class PitchTrackerTest(unittest.TestCase):
         npt.assert_array_equal(
             tracker.get_estimates(2.0), [0, 0, 1500, 1500, 1500]
         )
+
+    def test_skip_new_frames(self) -> None:
+        buf = RingBuffer()
+        tracker = PitchTracker(buf, fft_size=4, overlap=0.5)
+
+        buf.push(np.array([np.arange(8)]))
+        tracker.skip_new_frames()
+        # three skipped frames, ending at 4, 6 and 8
+        estimates = tracker.out_buf.data(5)[0]
+        self.assertTrue(np.isnan(estimates[-3:]).all())
+        self.assertFalse(np.isnan(estimates[:-3]).any())
+        self.assertEqual(len(tracker.new_frames()), 0)
+
+        buf.push(np.array([np.arange(8, 10)]))
+        npt.assert_array_equal(tracker.new_frames(), [np.array([np.arange(6, 10)])])
+
+    def test_batched_matches_frame_by_frame(self) -> None:
+        tracker = PitchTracker(RingBuffer(), fft_size=2048)
+        reference = PitchTracker(RingBuffer(), fft_size=2048)
+        frames, spectra = voice_like_frames(tracker, 60)
+
+        kernels = dense_kernels(reference)
+        expected = [estimate_pitch_reference(reference, f, s, kernels) for f, s in zip(frames, spectra)]
+        # in uneven batches, the jump rule carries over from batch to batch
+        pitches = np.concatenate([
+            tracker.estimate_pitches(frames[start:stop], spectra[start:stop])
+            for start, stop in ((0, 1), (1, 25), (25, 25), (25, 60))])
+
+        self.assertTrue(np.isnan(expected).any() and not np.isnan(expected).all())
+        npt.assert_allclose(pitches, expected, rtol=1e-9)
+
+    def test_cosine_kernel_matches_reference(self) -> None:
+        tracker = PitchTracker(RingBuffer(), fft_size=2048)
+        for f in tracker.pitchCandidates[::37]:
+            npt.assert_allclose(
+                calcCosineKernel(f, tracker.logSpacedFreqs),
+                calcCosineKernel_reference(f, tracker.logSpacedFreqs),
+                rtol=1e-12, atol=1e-15)
+
+    def test_kernel_groups_match_dense_kernels(self) -> None:
+        # above a fifth of Nyquist, some candidates drop harmonics whose peak
+        # still reaches the grid, and need their own lag profiles
+        for cres, max_freq in ((10, 1000), (20, 12000)):
+            tracker = PitchTracker(RingBuffer(), fft_size=2048, cres=cres, max_freq=max_freq)
+            self.assertEqual(len(tracker.kernelGroups) > 1, max_freq > 5000)
+
+            rng = np.random.default_rng(5)
+            specLog = rng.random((3, len(tracker.logSpacedFreqs)))
+            strengths = tracker.correlate_kernels(specLog)
+
+            npt.assert_allclose(strengths, specLog @ dense_kernels(tracker).T, rtol=0, atol=1e-12)
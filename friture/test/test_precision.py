@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.audioproc import audioproc
+from friture.precision import set_single_precision
+from friture.ringbuffer import RingBuffer
+from friture.signal.exp_smoothing import exp_smoothed_value_2d
+from friture.stft_cache import STFTCache
+
+
+def microphone_signal(length):
+    # a tone and a low-level noise floor, like a microphone input
+    rng = np.random.default_rng(1)
+    t = np.arange(length) / 48000.
+    x = 0.5 * np.sin(2 * np.pi * 1000.3 * t) + 1e-3 * rng.standard_normal(length)
+    return np.vstack((x, 0.25 * x))
+
+
+def to_dB(power):
+    return 10. * np.log10(power + 1e-30)
+
+
+class PrecisionTest(unittest.TestCase):
+    """Compare the single precision mode with the double precision reference."""
+
+    fft_size = 4096
+
+    def test_window_and_spectra_dtype(self):
+        proc = audioproc(np.float32)
+        proc.set_fftsize(self.fft_size)
+        self.assertEqual(proc.window.dtype, np.float32)
+
+        frames = microphone_signal(self.fft_size).astype(np.float32)[:, None, :]
+        self.assertEqual(proc.analyze_frames(frames).dtype, np.float32)
+
+    def test_spectra_match(self):
+        x = microphone_signal(8 * self.fft_size)
+        hop = self.fft_size // 4
+
+        spectra = {}
+        for dtype in (np.float64, np.float32):
+            set_single_precision(dtype == np.float32)
+            try:
+                buffer = RingBuffer(history=self.fft_size + 15 * hop)
+                buffer.push(x.astype(dtype), 0.)
+                self.assertEqual(buffer.buffer.dtype, dtype)
+
+                cache = STFTCache()
+                spectra[dtype] = cache.power_spectra(buffer, 1, self.fft_size, hop, buffer.offset, 16)
+                self.assertEqual(spectra[dtype].dtype, dtype)
+            finally:
+                set_single_precision(False)
+
+        # in dB, over the whole dynamic range of the signal (tone to noise floor)
+        npt.assert_allclose(to_dB(spectra[np.float32]), to_dB(spectra[np.float64]), atol=0.05)
+
+    def test_smoothing_state_stays_close(self):
+        rng = np.random.default_rng(2)
+        alpha = 0.05
+        kernel = (1. - alpha) ** np.arange(8191, -1, -1)
+
+        state64 = np.zeros(513)
+        state32 = np.zeros(513, dtype=np.float32)
+        for _ in range(500):
+            data = rng.random((513, 4))
+            state64 = exp_smoothed_value_2d(kernel, alpha, data, state64)
+            state32 = exp_smoothed_value_2d(kernel.astype(np.float32), alpha, data.astype(np.float32), state32)
+
+        self.assertEqual(state32.dtype, np.float32)
+        npt.assert_allclose(state32, state64, rtol=1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
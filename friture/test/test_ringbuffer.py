@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.ringbuffer import RingBuffer, WRITE_HEADROOM
+
+
+def ramp(start, length, channels=2):
+    return np.tile(np.arange(start, start + length, dtype=np.float64), (channels, 1))
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_capacity_is_a_power_of_two(self):
+        buffer = RingBuffer(history=1000)
+        self.assertEqual(buffer.capacity & (buffer.capacity - 1), 0)
+        self.assertGreaterEqual(buffer.readable_length(), 1000)
+
+    def test_wraps_around_contiguously(self):
+        buffer = RingBuffer(history=1000)
+        position = 0
+        for length in [1000, 3000, 5000, 9000, 1, 12345, 700] * 4:
+            buffer.push(ramp(position, length), 0.)
+            position += length
+            npt.assert_array_equal(buffer.data(1000), ramp(position - 1000, 1000))
+            npt.assert_array_equal(buffer.data_indexed(position - 300, 700), ramp(position - 1000, 700))
+        self.assertEqual(buffer.offset, position)
+
+    def test_reads_never_grow(self):
+        buffer = RingBuffer(history=1000)
+        buffer.push(ramp(0, 5000), 0.)
+        storage = buffer.buffer
+        buffer.push(ramp(5000, 5000), 0.)
+        buffer.data(buffer.capacity)
+        self.assertIs(buffer.buffer, storage)
+        with self.assertRaises(ArithmeticError):
+            buffer.data(buffer.capacity + 1)
+
+    def test_reserve_keeps_the_history(self):
+        buffer = RingBuffer(history=1000)
+        buffer.push(ramp(0, 20000), 0.)
+        kept = buffer.capacity
+        buffer.reserve(100000)
+        self.assertGreaterEqual(buffer.readable_length(), 100000)
+        npt.assert_array_equal(buffer.data(kept), ramp(20000 - kept, kept))
+
+    def test_large_offsets(self):
+        buffer = RingBuffer(history=1000)
+        buffer.offset = 2 ** 64 - 500
+        buffer.push(ramp(0, 1000), 0.)
+        self.assertEqual(buffer.offset, 2 ** 64 + 500)
+        npt.assert_array_equal(buffer.data(1000), ramp(0, 1000))
+
+    def test_push_longer_than_capacity(self):
+        buffer = RingBuffer(history=1000)
+        length = 3 * buffer.capacity + 17
+        buffer.push(ramp(0, length), 0.)
+        npt.assert_array_equal(buffer.data(buffer.capacity), ramp(length - buffer.capacity, buffer.capacity))
+
+    def test_cursors_are_independent(self):
+        buffer = RingBuffer(history=1000)
+        first = buffer.cursor(256)
+        second = buffer.cursor(256)
+        buffer.push(ramp(0, 1000), 0.)
+
+        self.assertEqual(first.available(), 1000)
+        first.advance(600)
+        self.assertEqual(first.available(), 400)
+        self.assertEqual(second.available(), 1000)
+
+    def test_cursor_alignment_and_overrun(self):
+        buffer = RingBuffer(history=1000)
+        cursor = buffer.cursor(1024)
+        cursor.advance(1000)
+        cursor.align(256)
+        self.assertEqual(cursor.position, 768)
+
+        # the reader falls behind by more than the buffer can hold
+        buffer.push(ramp(0, 10 * buffer.capacity), 0.)
+        available = cursor.available()
+        self.assertEqual(cursor.overruns, 1)
+        self.assertEqual(cursor.position % 256, 0)
+        self.assertLessEqual(available + cursor.history, buffer.capacity)
+        # the history of the new position is still there
+        npt.assert_array_equal(buffer.data_indexed(cursor.position, 1024), ramp(cursor.position - 1024, 1024))
+
+    def test_headroom_protects_readers(self):
+        buffer = RingBuffer(history=1000)
+        buffer.push(ramp(-1000, 1000), 0.)
+        view = buffer.data(1000).copy()
+        frozen = buffer.data(1000)
+        # a block of at most WRITE_HEADROOM samples does not overwrite the reserved history
+        buffer.push(ramp(0, WRITE_HEADROOM), 0.)
+        npt.assert_array_equal(frozen, view)
+
+    def test_frame_cursor_takes_all_new_frames(self):
+        buffer = RingBuffer(history=1000)
+        frames = buffer.frame_cursor(256, 64)
+
+        buffer.push(ramp(0, 300), 1.)
+        block = frames.take()
+        self.assertEqual(block.frames.shape, (1, 2, 256))
+        self.assertEqual(block.stop, 256)
+        npt.assert_array_equal(block.frames[0], ramp(0, 256))
+
+        buffer.push(ramp(300, 500), 2.)
+        block = frames.take()
+        self.assertEqual(block.frame_count, 8)
+        self.assertEqual(block.stop, 768)
+        for i in range(block.frame_count):
+            npt.assert_array_equal(block.frames[i], ramp(320 + 64 * i - 256, 256))
+        # the stream time at the end of each frame, from the time of the last push
+        npt.assert_allclose(block.times, 2. + (320 + 64 * np.arange(8) - 800) / 48000.)
+
+        self.assertEqual(frames.take().frame_count, 0)
+
+    def test_frame_cursor_skips_frames_out_of_history(self):
+        buffer = RingBuffer(history=1000)
+        frames = buffer.frame_cursor(256, 64)
+
+        # far more than the buffer can hold
+        buffer.push(ramp(0, 10 * buffer.capacity + 100), 1.)
+        self.assertEqual(frames.skip(), (10 * buffer.capacity + 100 - 256) // 64 + 1)
+        self.assertEqual(frames.cursor.overruns, 0)
+
+        # the next frame ends one hop after the last skipped one
+        buffer.push(ramp(10 * buffer.capacity + 100, 100), 2.)
+        block = frames.take()
+        self.assertEqual(block.frame_count, 2)
+        self.assertEqual(block.stop % 64, 0)
+        npt.assert_array_equal(block.frames[-1], ramp(block.stop - 256, 256))
+        self.assertEqual(frames.skip(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.spectrogram_image import CanvasScaledSpectrogram
+
+
+def columns(start, count, height):
+    # one distinct opaque color per column
+    return np.tile(0xff000000 + np.arange(start, start + count, dtype=np.uint32), (height, 1))
+
+
+class CanvasScaledSpectrogramTest(unittest.TestCase):
+    def visible(self, canvas):
+        # the last canvas_width columns, in the order they were written
+        start = canvas.write_offset % canvas.canvas_width + canvas.canvas_width
+        return canvas.image_data[:, start - canvas.canvas_width:start]
+
+    def test_columns_are_written_in_place(self):
+        canvas = CanvasScaledSpectrogram(canvas_height=4, canvas_width=10)
+        image = canvas.getimage()
+
+        written = 0
+        for count in [3, 4, 7, 1, 25, 2]:
+            canvas.addData(columns(written, count, 4), 0.)
+            written += count
+
+        # the QImage is a view of the array, it was not replaced
+        self.assertIs(canvas.getimage(), image)
+        npt.assert_array_equal(self.visible(canvas), columns(written - 10, 10, 4))
+        self.assertEqual(image.pixel(9, 0), canvas.image_data[0, 9])
+
+    def test_frequency_axis_is_reversed(self):
+        canvas = CanvasScaledSpectrogram(canvas_height=3, canvas_width=5)
+        data = np.array([[0xff000001], [0xff000002], [0xff000003]], dtype=np.uint32)
+        canvas.addData(data, 0.)
+        npt.assert_array_equal(self.visible(canvas)[:, -1], data[::-1, 0])
+
+    def test_resize_keeps_the_ring_layout(self):
+        canvas = CanvasScaledSpectrogram(canvas_height=4, canvas_width=10)
+        canvas.addData(columns(0, 13, 4), 0.)
+        canvas.setcanvas_width(20)
+        canvas.setcanvas_height(6)
+        self.assertEqual(canvas.image_data.shape, (6, 40))
+        self.assertEqual(canvas.getimage().width(), 40)
+
+        canvas.addData(columns(100, 20, 6), 0.)
+        npt.assert_array_equal(self.visible(canvas), columns(100, 20, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
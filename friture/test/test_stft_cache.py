@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+from friture.audioproc import audioproc
+from friture.ringbuffer import RingBuffer
+from friture.stft_cache import STFTCache
+
+
+class STFTCacheTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.buffer = RingBuffer()
+        self.buffer.push(rng.standard_normal((2, 4096)), 0.)
+
+        self.proc = audioproc()
+        self.proc.set_fftsize(256)
+
+    def reference(self, channel, stop, hop, count):
+        return np.array([self.proc.analyzelive(self.buffer.data_indexed(stop - (count - 1 - i) * hop, 256)[channel])
+                         for i in range(count)])
+
+    def test_matches_direct_analysis(self):
+        cache = STFTCache()
+        spectra = cache.power_spectra(self.buffer, 1, 256, 64, 2048, 5)
+        npt.assert_allclose(spectra, self.reference(1, 2048, 64, 5))
+
+    def test_frames_are_shared(self):
+        cache = STFTCache()
+        first = cache.power_spectra(self.buffer, 0, 256, 64, 2048, 4)
+        # a second subscriber asking for the same frames gets the same memory
+        second = cache.power_spectra(self.buffer, 0, 256, 64, 2048, 4)
+        self.assertTrue(np.shares_memory(first, second))
+        self.assertFalse(second.flags.writeable)
+
+        # and a subset of them
+        third = cache.power_spectra(self.buffer, 0, 256, 64, 2048 - 64, 2)
+        self.assertTrue(np.shares_memory(first, third))
+        npt.assert_array_equal(third, first[1:3])
+
+    def test_new_frames_only_are_computed(self):
+        cache = STFTCache()
+        cache.power_spectra(self.buffer, 0, 256, 64, 2048, 4)
+        entry = next(iter(cache.entries.values()))
+        old = entry.spectra
+
+        cache.power_spectra(self.buffer, 0, 256, 64, 2048 + 64, 4)
+        npt.assert_array_equal(entry.spectra[:-1], old[1:])
+        npt.assert_allclose(entry.spectra, self.reference(0, 2048 + 64, 64, 4))
+
+    def test_lru_eviction(self):
+        cache = STFTCache(max_configurations=2)
+        cache.power_spectra(self.buffer, 0, 256, 64, 2048, 1)
+        cache.power_spectra(self.buffer, 0, 256, 128, 2048, 1)
+        cache.power_spectra(self.buffer, 0, 256, 64, 2048, 1)
+        cache.power_spectra(self.buffer, 1, 256, 64, 2048, 1)
+
+        hops_and_channels = [(key[1], key[4]) for key in cache.entries]
+        self.assertEqual(hops_and_channels, [(0, 64), (1, 64)])
+
+
+if __name__ == '__main__':
+    unittest.main()
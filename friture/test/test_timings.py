@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from friture.timings import DISPLAY_TICK, NULL_STAGE, RollingWindow, Timings, format_timings
+
+
+class TimingsTest(unittest.TestCase):
+    def test_disabled(self):
+        timings = Timings()
+        self.assertIs(timings.stage("stage"), NULL_STAGE)
+        with timings.stage("stage"):
+            pass
+        timings.record_backlog(512)
+        timings.tick_begin()
+        timings.tick_end()
+
+        summary = timings.summary()
+        self.assertEqual(summary["stages"], {})
+        self.assertEqual(summary["tick"]["count"], 0)
+        self.assertEqual(summary["backlog"]["count"], 0)
+
+    def test_percentiles(self):
+        timings = Timings()
+        timings.set_enabled(True)
+        # 1 to 100 ms
+        for k in range(1, 101):
+            timings.record("stage", 0., k * 1e-3)
+        for frames in (512, 1024):
+            timings.record_backlog(frames)
+
+        summary = timings.summary()
+        stage = summary["stages"]["stage"]
+        self.assertEqual(stage["count"], 100)
+        self.assertAlmostEqual(stage["p50"], 50.5)
+        self.assertAlmostEqual(stage["p99"], 99.01)
+        self.assertAlmostEqual(stage["max"], 100.)
+        self.assertEqual(summary["backlog"]["max"], 1024)
+
+    def test_rolling_window(self):
+        window = RollingWindow(length=4)
+        for value in range(10):
+            window.push(value)
+        self.assertEqual(sorted(window.recent()), [6, 7, 8, 9])
+        self.assertEqual(window.summary()["count"], 10)
+
+    def test_tick_budget(self):
+        timings = Timings()
+        timings.set_enabled(True)
+        timings.set_tick_period(0.010)
+
+        with timings.stage("stage"):
+            pass
+        timings.tick_begin()
+        timings.tick_end()
+        # a tick that started 20 ms ago overruns the budget
+        timings.tick_begin()
+        timings.tick_start -= 0.020
+        timings.tick_end()
+
+        tick = timings.summary()["tick"]
+        self.assertEqual(tick["count"], 2)
+        self.assertEqual(tick["overruns"], 1)
+        self.assertEqual(tick["budget"], 10.)
+        self.assertGreater(tick["utilisation"], 1.)
+        self.assertNotIn(DISPLAY_TICK, timings.summary()["stages"])
+
+        text = format_timings(timings.summary())
+        self.assertIn("1 overruns", text)
+        self.assertIn("stage", text)
+
+    def test_exports(self):
+        timings = Timings()
+        timings.set_enabled(True)
+        timings.begin("pair")
+        with timings.stage("stage"):
+            time.sleep(0.001)
+        timings.end("pair")
+        timings.record_backlog(256)
+
+        trace = timings.chrome_trace()["traceEvents"]
+        durations = {event["name"]: event["dur"] for event in trace if event["ph"] == "X"}
+        self.assertGreaterEqual(durations["stage"], 1e3)
+        self.assertGreaterEqual(durations["pair"], durations["stage"])
+        self.assertEqual([event["args"] for event in trace if event["ph"] == "C"], [{"frames": 256}])
+        self.assertEqual(len([event for event in trace if event["ph"] == "M"]), 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "timings.json")
+            timings.export_json(path)
+            with open(path) as f:
+                self.assertEqual(sorted(json.load(f)["stages"]), ["pair", "stage"])
+
+            path = os.path.join(directory, "trace.json")
+            timings.export_chrome_trace(path)
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)["traceEvents"]), len(trace))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Timothée Lecomte
+
+# This file is part of Friture.
+#
+# Friture is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as published by
+# the Free Software Foundation.
+#
+# Friture is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Friture.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Process-wide timing of the processing stages, for the statistics tab.
+
+The stages are the audio fetch, the analysis and the drawing of each
+dock, and the QML synchronization and rendering. For each stage, the
+durations of the most recent calls are kept in a rolling window, from
+which the median and the 99th percentile are computed when they are
+displayed. The duration of the display timer ticks is compared with the
+timer period (the tick budget), and the backlog of the audio input ring
+buffer is sampled on each fetch.
+
+The most recent calls are also kept as events, which can be exported in
+the Chrome trace format (chrome://tracing, https://ui.perfetto.dev).
+
+The timings are disabled by default. When disabled, stage() returns a
+shared no-op context manager and the other methods return immediately.
+The stages can be timed from any thread, a stage being timed from a
+single thread at a time.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from friture.audio_format import SAMPLING_RATE
+
+# durations kept per stage for the percentiles
+WINDOW_LENGTH = 1000
+# events kept for the Chrome trace
+TRACE_LENGTH = 50000
+
+DISPLAY_TICK = "display tick"
+
+__timingsInstance = None
+
+
+def GetTimings():
+    global __timingsInstance
+    if __timingsInstance is None:
+        __timingsInstance = Timings()
+    return __timingsInstance
+
+
+class RollingWindow:
+    """The most recent values of a quantity, with their percentiles."""
+
+    def __init__(self, length=WINDOW_LENGTH):
+        self.values = np.zeros(length)
+        # total number of values pushed
+        self.count = 0
+
+    def push(self, value):
+        self.values[self.count % self.values.shape[0]] = value
+        self.count += 1
+
+    def recent(self):
+        return self.values[:min(self.count, self.values.shape[0])]
+
+    def summary(self, scale=1.):
+        values = self.recent()
+        if values.shape[0] == 0:
+            return {"count": 0}
+        p50, p99 = np.percentile(values, [50., 99.])
+        return {
+            "count": self.count,
+            "mean": scale * float(values.mean()),
+            "p50": scale * float(p50),
+            "p99": scale * float(p99),
+            "max": scale * float(values.max()),
+        }
+
+
+class _NullStage:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class Timings:
+
+    def __init__(self):
+        self.enabled = False
+        # period of the display timer, the budget of a tick, in seconds
+        self.tick_period = 0.010
+        # serializes the creation of the windows, and the exports
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.origin = time.perf_counter()
+            self.stages = {}
+            self.backlog = RollingWindow()
+            self.overruns = 0
+            self.tick_start = None
+            # (name, thread id, start, duration) of the calls
+            self.events = deque(maxlen=TRACE_LENGTH)
+            # (time, frames) of the backlog samples
+            self.backlog_events = deque(maxlen=TRACE_LENGTH)
+            # start of the 'begin' stages, by name
+            self.pending = {}
+
+    def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def set_tick_period(self, period):
+        self.tick_period = period
+
+    def stage(self, name):
+        """A context manager that times the code that it runs."""
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def begin(self, name):
+        """Start a stage that ends with end(name), for signal pairs."""
+        if self.enabled:
+            self.pending[name] = time.perf_counter()
+
+    def end(self, name):
+        start = self.pending.pop(name, None)
+        if self.enabled and start is not None:
+            self.record(name, start, time.perf_counter() - start)
+
+    # slot, connected first to the display timer
+    def tick_begin(self):
+        if self.enabled:
+            self.tick_start = time.perf_counter()
+
+    # slot, connected last to the display timer
+    def tick_end(self):
+        if self.enabled and self.tick_start is not None:
+            duration = time.perf_counter() - self.tick_start
+            if duration > self.tick_period:
+                self.overruns += 1
+            self.record(DISPLAY_TICK, self.tick_start, duration)
+            self.tick_start = None
+
+    def record(self, name, start, duration):
+        window = self.stages.get(name)
+        if window is None:
+            with self.lock:
+                window = self.stages.setdefault(name, RollingWindow())
+        window.push(duration)
+        self.events.append((name, threading.get_ident(), start, duration))
+
+    def record_backlog(self, frames):
+        """Sample the number of frames waiting in the audio input ring buffer."""
+        if self.enabled:
+            self.backlog.push(frames)
+            self.backlog_events.append((time.perf_counter(), frames))
+
+    def summary(self):
+        """The percentiles of the stages, in milliseconds, the tick budget
+        use and the audio backlog in frames."""
+        with self.lock:
+            stages = dict(self.stages)
+
+        tick = stages.get(DISPLAY_TICK, RollingWindow()).summary(1e3)
+        tick["budget"] = 1e3 * self.tick_period
+        tick["overruns"] = self.overruns
+        if tick["count"] > 0:
+            tick["utilisation"] = tick["mean"] / tick["budget"]
+
+        return {
+            "enabled": self.enabled,
+            "duration": time.perf_counter() - self.origin,
+            "tick": tick,
+            "backlog": self.backlog.summary(),
+            "stages": {name: window.summary(1e3) for name, window in sorted(stages.items()) if name != DISPLAY_TICK},
+        }
+
+    def chrome_trace(self):
+        """The recent events, in the Chrome trace event format."""
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            backlog_events = list(self.backlog_events)
+            origin = self.origin
+
+        trace = [{"name": name, "cat": "friture", "ph": "X", "ts": 1e6 * (start - origin), "dur": 1e6 * duration,
+                  "pid": pid, "tid": tid}
+                 for name, tid, start, duration in events]
+        trace += [{"name": "audio backlog", "ph": "C", "ts": 1e6 * (start - origin), "pid": pid,
+                   "args": {"frames": frames}}
+                  for start, frames in backlog_events]
+
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        for tid in sorted({event[1] for event in events}):
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                          "args": {"name": threads.get(tid, "thread %d" % (tid))}})
+
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def format_timings(summary):
+    """The timings summary as a plain-text table."""
+    lines = []
+
+    tick = summary["tick"]
+    if tick["count"] > 0:
+        lines.append("Display tick (%.0f ms budget): p50 %.2f ms, p99 %.2f ms, %.0f %% of the budget, %d overruns" % (
+            tick["budget"], tick["p50"], tick["p99"], 100. * tick["utilisation"], tick["overruns"]))
+
+    backlog = summary["backlog"]
+    if backlog["count"] > 0:
+        lines.append("Audio backlog: p50 %.0f frames (%.1f ms), p99 %.0f frames (%.1f ms), max %.0f frames" % (
+            backlog["p50"], 1e3 * backlog["p50"] / SAMPLING_RATE,
+            backlog["p99"], 1e3 * backlog["p99"] / SAMPLING_RATE, backlog["max"]))
+
+    stages = summary["stages"]
+    if stages:
+        width = max(len(name) for name in stages)
+        lines.append("")
+        lines.append("%-*s %8s %9s %9s %9s" % (width, "Stage", "calls", "p50 (ms)", "p99 (ms)", "max (ms)"))
+        for name, stage in stages.items():
+            lines.append("%-*s %8d %9.3f %9.3f %9.3f" % (
+                width, name, stage["count"], stage["p50"], stage["p99"], stage["max"]))
+
+    return "\n".join(lines)
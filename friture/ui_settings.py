@@ -48,6 +48,10 @@ class Ui_Settings_Dialog(object):
         self.radioButton_duo.setObjectName("radioButton_duo")
         self.inputTypeButtonGroup.addButton(self.radioButton_duo)
         self.verticalLayout_3.addWidget(self.radioButton_duo)
+        self.radioButton_all = QtWidgets.QRadioButton(parent=self.inputGroup)
+        self.radioButton_all.setObjectName("radioButton_all")
+        self.inputTypeButtonGroup.addButton(self.radioButton_all)
+        self.verticalLayout_3.addWidget(self.radioButton_all)
         spacerItem1 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Expanding)
         self.verticalLayout_3.addItem(spacerItem1)
         self.horizontalLayout.addLayout(self.verticalLayout_3)
@@ -129,6 +133,7 @@ class Ui_Settings_Dialog(object):
         self.label_inputType.setText(_translate("Settings_Dialog", "Select the type of input :"))
         self.radioButton_single.setText(_translate("Settings_Dialog", "Single channel"))
         self.radioButton_duo.setText(_translate("Settings_Dialog", "Two channels"))
+        self.radioButton_all.setText(_translate("Settings_Dialog", "All channels"))
         self.groupBox_first.setTitle(_translate("Settings_Dialog", "First channel"))
         self.groupBox_second.setTitle(_translate("Settings_Dialog", "Second channel"))
         self.playbackGroup.setTitle(_translate("Settings_Dialog", "Playback"))
@@ -26,15 +26,16 @@ from friture.delay_estimator import Delay_Estimator_Widget
 from friture.longlevels import LongLevelWidget
 from friture.pitch_tracker import PitchTrackerWidget
 
+# "UpdateRate" is the preferred rate of the dock updates, in Hz, see frame_scheduler
 widgets = [
-    {'Id': 1, "Class": Scope_Widget, "Name": "Scope"},
-    {'Id': 2, "Class": Spectrum_Widget, "Name": "FFT Spectrum"},
-    {'Id': 3, "Class": Spectrogram_Widget, "Name": "2D Spectrogram"},
-    {'Id': 4, "Class": OctaveSpectrum_Widget, "Name": "Octave Spectrum"},
-    {'Id': 5, "Class": Generator_Widget, "Name": "Generator"},
-    {'Id': 6, "Class": Delay_Estimator_Widget, "Name": "Delay Estimator"},
-    {'Id': 7, "Class": LongLevelWidget, "Name": "Long-time levels"},
-    {'Id': 8, "Class": PitchTrackerWidget, "Name": "Pitch Tracker"},
+    {'Id': 1, "Class": Scope_Widget, "Name": "Scope", "UpdateRate": 100},
+    {'Id': 2, "Class": Spectrum_Widget, "Name": "FFT Spectrum", "UpdateRate": 100},
+    {'Id': 3, "Class": Spectrogram_Widget, "Name": "2D Spectrogram", "UpdateRate": 100},
+    {'Id': 4, "Class": OctaveSpectrum_Widget, "Name": "Octave Spectrum", "UpdateRate": 40},
+    {'Id': 5, "Class": Generator_Widget, "Name": "Generator", "UpdateRate": 10},
+    {'Id': 6, "Class": Delay_Estimator_Widget, "Name": "Delay Estimator", "UpdateRate": 10},
+    {'Id': 7, "Class": LongLevelWidget, "Name": "Long-time levels", "UpdateRate": 10},
+    {'Id': 8, "Class": PitchTrackerWidget, "Name": "Pitch Tracker", "UpdateRate": 50},
 ]
 
 